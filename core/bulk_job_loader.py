@@ -0,0 +1,133 @@
+"""
+Bulk job loading for the IntegratedScheduler
+Streams every enabled job in one query and parses their YAML in a process pool at startup
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from utils.logger import get_logger
+
+
+# libyaml's loader when PyYAML was built with it, same safe semantics and several times faster
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def parse_job_rows(rows: List[Tuple]) -> List[Dict[str, Any]]:
+    """
+    Parse a chunk of job rows (runs in pool workers, so it must stay a module-level function)
+    
+    Args:
+        rows: (job_id, name, yaml_configuration, modified_date, next_scheduled_time) tuples
+    
+    Returns:
+        Dicts with job_id, name, schedule (None if the job has none) and the ISO-formatted dates
+    """
+    parsed = []
+    for job_id, name, yaml_configuration, modified_date, next_scheduled_time in rows:
+        try:
+            config = yaml.load(yaml_configuration, Loader=_SafeLoader) if yaml_configuration else {}
+        except yaml.YAMLError:
+            config = {}
+        
+        schedule = config.get('schedule') if isinstance(config, dict) else None
+        parsed.append({
+            'job_id': job_id,
+            'name': name,
+            'schedule': schedule if isinstance(schedule, dict) and schedule else None,
+            'modified_date': modified_date.isoformat() if modified_date else None,
+            'next_scheduled_time': next_scheduled_time.isoformat() if next_scheduled_time else None
+        })
+    return parsed
+
+
+class BulkJobLoader:
+    """
+    Loads all enabled jobs for scheduling at startup
+    
+    Rows come from a single streamed query in chunks. Small job sets are
+    parsed inline; once the row count passes process_threshold the chunks
+    are handed to a process pool as they arrive, so YAML parsing overlaps
+    with fetching and spreads over all cores (single-core hosts always
+    parse inline).
+    """
+    
+    def __init__(self, job_manager, chunk_size: int = 1000, process_threshold: int = 2000,
+                 max_workers: Optional[int] = None):
+        self.job_manager = job_manager
+        self.chunk_size = max(chunk_size, 1)
+        self.process_threshold = process_threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = get_logger(__name__)
+        
+        # Metrics of the last load
+        self.stats: Dict[str, Any] = {}
+    
+    @classmethod
+    def from_config(cls, job_manager, config: Dict[str, Any]) -> "BulkJobLoader":
+        """Create a loader from the scheduler.bulk_load configuration"""
+        return cls(
+            job_manager,
+            chunk_size=int(config.get('chunk_size', 1000)),
+            process_threshold=int(config.get('process_threshold', 2000)),
+            max_workers=int(config.get('max_workers', 0)) or None
+        )
+    
+    def load(self, job_filter: Optional[Callable[[str], bool]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch and parse every enabled job, see parse_job_rows for the result format
+        
+        Args:
+            job_filter: Keeps only rows whose job_id it accepts, applied before parsing
+        """
+        started = time.perf_counter()
+        chunks = self.job_manager.iter_enabled_job_rows(self.chunk_size)
+        if job_filter is not None:
+            chunks = ([row for row in chunk if job_filter(row[0])] for chunk in chunks)
+        return self.parse_chunks(chunks, started)
+    
+    def parse_chunks(self, chunks: Iterable[List[Tuple]], started: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Parse streamed row chunks, switching to the process pool once the threshold is passed"""
+        started = started if started is not None else time.perf_counter()
+        pending_chunks: List[List[Tuple]] = []
+        pending_rows = 0
+        pool: Optional[ProcessPoolExecutor] = None
+        futures = []
+        
+        try:
+            for chunk in chunks:
+                if pool is None:
+                    pending_chunks.append(chunk)
+                    pending_rows += len(chunk)
+                    if pending_rows < self.process_threshold or self.max_workers < 2:
+                        continue
+                    pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    futures = [pool.submit(parse_job_rows, pending_chunk) for pending_chunk in pending_chunks]
+                    pending_chunks = []
+                else:
+                    futures.append(pool.submit(parse_job_rows, chunk))
+            
+            if pool is None:
+                results = [parse_job_rows(chunk) for chunk in pending_chunks]
+            else:
+                results = [future.result() for future in futures]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        jobs = [job for chunk_jobs in results for job in chunk_jobs]
+        self.stats = {
+            'jobs': len(jobs),
+            'chunks': len(results),
+            'process_pool': pool is not None,
+            'seconds': time.perf_counter() - started
+        }
+        self.logger.info(
+            f"[BULK_LOADER] Loaded {len(jobs)} enabled jobs in {self.stats['seconds']:.2f}s "
+            f"({'process pool' if pool is not None else 'inline'} parsing, {len(results)} chunks)"
+        )
+        return jobs
@@ -2,22 +2,35 @@
 Integrated Scheduler that bridges JobManager (database) and APScheduler
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta
 import json
+import threading
+import time
+import uuid
 import pytz
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.date import DateTrigger
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.base import JobLookupError
 
 from utils.logger import get_logger
 from .job_manager import JobManager
 from .job_executor import JobExecutor
+from .rate_limiter import get_dispatch_rate_limiter, get_job_config_dimensions
+from .trigger_jitter import JitteredTrigger, apply_jitter, build_fire_density_report
+from .job_store import DatabaseJobStore, from_db_time, is_stored_fire_time_valid, load_scheduler_config_section, to_db_time
+from .bulk_job_loader import BulkJobLoader
+from .scheduler_cluster import ShardLeaseManager
+from .trigger_cache import compute_next_fire_times, get_cron_trigger, get_timezone, get_trigger_cache_stats
+
+
+# Grace period for missed fires, a fire recovered after downtime gets recovery_grace_seconds once
+DEFAULT_MISFIRE_GRACE_SECONDS = 30
 
 
 class IntegratedScheduler:
@@ -46,9 +59,30 @@ class IntegratedScheduler:
             self.job_executor = JobExecutor(job_manager=self.job_manager)
             self.disconnected_mode = False
         
+        # Dispatch rate limits per connection, agent pool and job type (config.yaml rate_limits)
+        self.rate_limiter = get_dispatch_rate_limiter()
+        self._deferred_runs: Dict[str, str] = {}  # job_id -> APScheduler id of its pending or running deferred run
+        self._deferred_lock = threading.Lock()
+        self._recovering_jobs: Set[str] = set()  # Jobs whose next fire is one missed while down, with the recovery grace
+        
+        # Next fire times persist in job_configurations_v2 (config.yaml scheduler.persistent_job_store)
+        self.job_store_config = load_scheduler_config_section('persistent_job_store')
+        self.persistent_store = self.job_store_config.get('enabled', True)
+        self._synced_versions: Dict[str, Optional[str]] = {}  # job_id -> modified_date last synced
+        self._sync_watermark: Optional[datetime] = None  # Newest modified_date seen
+        
+        # Multi-node scheduling by job_id shard leases (config.yaml scheduler.cluster), None runs every job here
+        self.cluster_config = load_scheduler_config_section('cluster')
+        self.cluster = ShardLeaseManager.from_config(self.cluster_config) if self.cluster_config.get('enabled', False) else None
+        
         # Initialize APScheduler
         self._init_scheduler()
         
+        # Take this node's shards first so only their jobs are loaded
+        if self.cluster:
+            self.cluster.on_change = self._on_shards_changed
+            self.cluster.join()
+        
         # Load existing scheduled jobs from database
         self._load_scheduled_jobs()
         
@@ -57,12 +91,17 @@ class IntegratedScheduler:
     
     def _init_scheduler(self):
         """Initialize APScheduler"""
-        jobstores = {'default': MemoryJobStore()}
+        # Jobs backed by configuration rows go in 'default', one-off internal jobs in 'transient'
+        self.job_store = DatabaseJobStore.from_config(self.job_store_config) if self.persistent_store else MemoryJobStore()
+        jobstores = {
+            'default': self.job_store,
+            'transient': MemoryJobStore()
+        }
         executors = {'default': ThreadPoolExecutor(max_workers=10)}
         job_defaults = {
             'coalesce': True,  # Combine multiple pending executions
             'max_instances': 1,  # Only one instance of job can run at a time
-            'misfire_grace_time': 30  # Grace period for missed jobs
+            'misfire_grace_time': DEFAULT_MISFIRE_GRACE_SECONDS  # Grace period for missed jobs
         }
         
         # Don't set global timezone - let individual jobs use their configured timezones
@@ -76,14 +115,35 @@ class IntegratedScheduler:
         self.scheduler.add_listener(self._on_job_executed, EVENT_JOB_EXECUTED)
         self.scheduler.add_listener(self._on_job_error, EVENT_JOB_ERROR)
         self.scheduler.add_listener(self._on_job_missed, EVENT_JOB_MISSED)
+        self.scheduler.add_listener(self._on_job_submitted, EVENT_JOB_SUBMITTED)
+        
+        # Pick up jobs changed outside this scheduler (other processes, direct edits)
+        sync_interval = int(self.job_store_config.get('sync_interval_seconds', 60))
+        if sync_interval > 0:
+            self.scheduler.add_job(
+                func=self._sync_changed_jobs,
+                trigger=IntervalTrigger(seconds=sync_interval),
+                id='__job_config_sync__',
+                name='Job configuration sync',
+                jobstore='transient'
+            )
         
-        self.logger.info("[INTEGRATED_SCHEDULER] APScheduler configured")
+        self.logger.info(f"[INTEGRATED_SCHEDULER] APScheduler configured (persistent job store: {self.persistent_store})")
     
     def start(self):
         """Start the scheduler"""
         try:
             if not self.scheduler.running:
-                self.scheduler.start()
+                # Jobs loaded before start are added to the store now, write their fire times in one batch
+                if isinstance(self.job_store, DatabaseJobStore):
+                    self.job_store.begin_batch()
+                try:
+                    self.scheduler.start()
+                finally:
+                    if isinstance(self.job_store, DatabaseJobStore):
+                        self.job_store.flush_batch()
+                if self.cluster:
+                    self.cluster.start()
                 self.logger.info("[INTEGRATED_SCHEDULER] Scheduler started successfully")
         except Exception as e:
             self.logger.error(f"[INTEGRATED_SCHEDULER] Failed to start scheduler: {e}")
@@ -98,6 +158,14 @@ class IntegratedScheduler:
                 self.logger.info("[INTEGRATED_SCHEDULER] Scheduler stopped successfully")
             else:
                 self.logger.debug("[INTEGRATED_SCHEDULER] Scheduler was not running or not initialized")
+            
+            # Write fire times still buffered by the job store before the shards are released
+            if isinstance(getattr(self, 'job_store', None), DatabaseJobStore):
+                self.job_store.close()
+            
+            # Release this node's shards only after its jobs stopped firing
+            if getattr(self, 'cluster', None):
+                self.cluster.stop()
         except Exception as e:
             self.logger.error(f"[INTEGRATED_SCHEDULER] Error stopping scheduler: {e}")
             # Don't re-raise - continue with shutdown
@@ -154,6 +222,13 @@ class IntegratedScheduler:
             Dict with success status
         """
         try:
+            # Jobs in shards of other nodes are picked up by their owner's sync
+            if self.cluster and not self.cluster.is_local_job(job_id):
+                return {
+                    'success': True,
+                    'message': f'Job {job_id} is scheduled by the node owning shard {self.cluster.get_shard(job_id)}'
+                }
+            
             # Get job from database
             job_config = self.job_manager.get_job(job_id)
             if not job_config:
@@ -162,6 +237,30 @@ class IntegratedScheduler:
                     'error': f'Job {job_id} not found'
                 }
             
+            return self._add_scheduled_job(job_id, job_config, schedule_config)
+            
+        except Exception as e:
+            self.logger.error(f"[INTEGRATED_SCHEDULER] Error scheduling job {job_id}: {e}")
+            return {
+                'success': False,
+                'error': f'Error scheduling job: {str(e)}'
+            }
+    
+    def _add_scheduled_job(self, job_id: str, job_config: Dict[str, Any], schedule_config: Dict[str, Any],
+                           stored_next_run_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Register a job's trigger with APScheduler
+        
+        Args:
+            job_id: Job ID to schedule
+            job_config: Job configuration from JobManager
+            schedule_config: Schedule configuration (cron, interval, or date)
+            stored_next_run_time: Next fire time persisted before a restart, resumed if the trigger still fires then
+            
+        Returns:
+            Dict with success status
+        """
+        try:
             # Only schedule enabled jobs
             if not job_config.get('enabled', True):
                 return {
@@ -182,15 +281,13 @@ class IntegratedScheduler:
                     'error': 'Invalid schedule configuration'
                 }
             
-            # Add job to scheduler
-            self.scheduler.add_job(
-                func=self._execute_scheduled_job,
-                args=[job_id],
-                trigger=trigger,
-                id=job_id,
-                name=job_config.get('name', f'Job {job_id}'),
-                replace_existing=True
-            )
+            # Opt-in start smoothing: shift by a stable offset hashed from the job ID
+            jitter_window = int(schedule_config.get('jitter_window') or 0)
+            trigger = apply_jitter(job_id, trigger, jitter_window)
+            if isinstance(trigger, JitteredTrigger):
+                self.logger.info(f"[INTEGRATED_SCHEDULER] Job {job_id} offset {trigger.offset_seconds}s within {jitter_window}s jitter window")
+            
+            self._register_trigger(job_id, job_config.get('name', f'Job {job_id}'), trigger, stored_next_run_time)
             
             self.logger.info(f"[INTEGRATED_SCHEDULER] Scheduled job {job_id} with {schedule_config.get('type', 'unknown')} trigger")
             return {
@@ -205,6 +302,28 @@ class IntegratedScheduler:
                 'error': f'Error scheduling job: {str(e)}'
             }
     
+    def _register_trigger(self, job_id: str, name: str, trigger, stored_next_run_time: Optional[datetime] = None):
+        """Add a job's trigger to APScheduler, resuming a persisted fire time if the trigger still fires then"""
+        resume_kwargs = {}
+        self._recovering_jobs.discard(job_id)
+        if is_stored_fire_time_valid(trigger, stored_next_run_time):
+            resume_kwargs['next_run_time'] = stored_next_run_time
+            if stored_next_run_time < datetime.now(pytz.UTC):
+                # Fell due while down, runs once on start; later fires get the default grace back
+                resume_kwargs['misfire_grace_time'] = int(self.job_store_config.get('recovery_grace_seconds', 3600))
+                self._recovering_jobs.add(job_id)
+                self.logger.info(f"[INTEGRATED_SCHEDULER] Job {job_id} missed a fire at {stored_next_run_time.isoformat()} while down, recovering it")
+        
+        self.scheduler.add_job(
+            func=self._execute_scheduled_job,
+            args=[job_id],
+            trigger=trigger,
+            id=job_id,
+            name=name,
+            replace_existing=True,
+            **resume_kwargs
+        )
+    
     def unschedule_job(self, job_id: str) -> Dict[str, Any]:
         """Remove job from scheduler (but keep in database)"""
         try:
@@ -227,29 +346,26 @@ class IntegratedScheduler:
                 'error': f'Error unscheduling job: {str(e)}'
             }
     
-    def _create_trigger(self, schedule_config: Dict[str, Any]):
+    def _create_trigger(self, schedule_config: Dict[str, Any], verbose: bool = True):
         """Create APScheduler trigger from schedule configuration with precise timezone support"""
         try:
             schedule_type = schedule_config.get('type', '').lower()
             timezone = schedule_config.get('timezone', 'UTC')
+            log = self.logger.info if verbose else self.logger.debug
             
-            self.logger.info(f"[INTEGRATED_SCHEDULER] Creating trigger for timezone: {timezone}")
+            log(f"[INTEGRATED_SCHEDULER] Creating trigger for timezone: {timezone}")
             
-            # Import timezone handling
-            import pytz
-            from pytz import timezone as pytz_timezone
-            
-            # Always create timezone object for precise scheduling
+            # Always create timezone object for precise scheduling (cached per name)
             if timezone == 'UTC':
                 tz = pytz.UTC
             else:
                 try:
-                    tz = pytz_timezone(timezone)
+                    tz = get_timezone(timezone)
                 except pytz.exceptions.UnknownTimeZoneError:
                     self.logger.error(f"[INTEGRATED_SCHEDULER] Unknown timezone: {timezone}, falling back to UTC")
                     tz = pytz.UTC
             
-            self.logger.info(f"[INTEGRATED_SCHEDULER] Using timezone object: {tz}")
+            log(f"[INTEGRATED_SCHEDULER] Using timezone object: {tz}")
             
             if schedule_type == 'cron':
                 cron_expr = schedule_config.get('cron', '')
@@ -257,18 +373,11 @@ class IntegratedScheduler:
                     # Parse cron expression (6 parts: second minute hour day month day_of_week)
                     parts = cron_expr.split()
                     if len(parts) == 6:
-                        trigger_kwargs = {
-                            'second': parts[0],
-                            'minute': parts[1], 
-                            'hour': parts[2],
-                            'day': parts[3],
-                            'month': parts[4],
-                            'day_of_week': parts[5],
-                            'timezone': tz  # Always set timezone for precise scheduling
-                        }
-                        
-                        self.logger.info(f"[INTEGRATED_SCHEDULER] Creating CronTrigger with args: {trigger_kwargs}")
-                        trigger = CronTrigger(**trigger_kwargs)
+                        # Jobs with the same expression and timezone share one compiled trigger
+                        log(f"[INTEGRATED_SCHEDULER] Getting CronTrigger for '{cron_expr}' in {tz}")
+                        trigger = get_cron_trigger(cron_expr, tz.zone)
+                        if not verbose:
+                            return trigger
                         
                         # Log next run time for verification  
                         from datetime import datetime
@@ -300,8 +409,10 @@ class IntegratedScheduler:
                     'timezone': tz  # Always set timezone
                 }
                 
-                self.logger.info(f"[INTEGRATED_SCHEDULER] Creating IntervalTrigger with args: {trigger_kwargs}")
+                log(f"[INTEGRATED_SCHEDULER] Creating IntervalTrigger with args: {trigger_kwargs}")
                 trigger = IntervalTrigger(**trigger_kwargs)
+                if not verbose:
+                    return trigger
                 
                 # Log next run time for verification
                 current_time_in_tz = datetime.now(tz)
@@ -345,8 +456,10 @@ class IntegratedScheduler:
                     'timezone': tz  # Always set timezone
                 }
                 
-                self.logger.info(f"[INTEGRATED_SCHEDULER] Creating DateTrigger with args: {trigger_kwargs}")
+                log(f"[INTEGRATED_SCHEDULER] Creating DateTrigger with args: {trigger_kwargs}")
                 trigger = DateTrigger(**trigger_kwargs)
+                if not verbose:
+                    return trigger
                 
                 # Log scheduled time for verification
                 if run_date.tzinfo:
@@ -370,13 +483,42 @@ class IntegratedScheduler:
             self.logger.error(f"[INTEGRATED_SCHEDULER] Trigger creation traceback: {traceback.format_exc()}")
             return None
     
-    def _execute_scheduled_job(self, job_id: str):
+    def _execute_scheduled_job(self, job_id: str, rate_limit_reserved: bool = False):
         """Execute a scheduled job using JobExecutor with timezone logging"""
         try:
+            # A deferred run stands in for every fire until it has finished, like max_instances=1
+            if not rate_limit_reserved and self._has_deferred_run(job_id):
+                self.logger.info(f"[INTEGRATED_SCHEDULER] Job {job_id} already has a rate limited run pending, coalescing this fire into it")
+                return
+            
+            # Another node may own the shard by now if our leases could not be renewed
+            if self.cluster and not self.cluster.can_run_job(job_id):
+                self.logger.warning(f"[INTEGRATED_SCHEDULER] Skipping job {job_id}: node {self.cluster.node_id} does not hold a valid lease for its shard")
+                return
+            
             # Get job configuration to determine timezone
             job_config = self.job_manager.get_job(job_id)
             job_timezone = 'UTC'  # Default
             
+            if job_config is None:
+                # get_job() also returns None when the lookup fails, only unschedule a confirmed deletion
+                try:
+                    job_exists = self.job_manager.job_exists(job_id)
+                except Exception as e:
+                    self.logger.error(f"[INTEGRATED_SCHEDULER] Could not look up job {job_id}, skipping this run: {e}")
+                    return
+                if job_exists:
+                    self.logger.error(f"[INTEGRATED_SCHEDULER] Could not load job {job_id}, skipping this run")
+                    return
+                # Deleted since it was scheduled, deletions carry no modified_date for the sync to see
+                self.logger.warning(f"[INTEGRATED_SCHEDULER] Job {job_id} no longer exists, unscheduling it")
+                self.unschedule_job(job_id)
+                return
+            
+            # Defer the run if it would exceed a dispatch rate limit
+            if job_config and not rate_limit_reserved and self._defer_if_rate_limited(job_id, job_config):
+                return
+            
             if job_config:
                 configuration = job_config.get('configuration', {})
                 schedule_config = configuration.get('schedule', {})
@@ -390,7 +532,7 @@ class IntegratedScheduler:
                 tz = pytz.UTC
             else:
                 try:
-                    tz = pytz.timezone(job_timezone)
+                    tz = get_timezone(job_timezone)
                 except:
                     tz = pytz.UTC
                     job_timezone = 'UTC'
@@ -411,42 +553,168 @@ class IntegratedScheduler:
                 
         except Exception as e:
             self.logger.error(f"[INTEGRATED_SCHEDULER] Error executing scheduled job {job_id}: {e}")
+        finally:
+            if rate_limit_reserved:
+                with self._deferred_lock:
+                    self._deferred_runs.pop(job_id, None)
+    
+    def _has_deferred_run(self, job_id: str) -> bool:
+        """Check if a rate limited run of the job is pending or running"""
+        with self._deferred_lock:
+            return job_id in self._deferred_runs
+    
+    def _defer_if_rate_limited(self, job_id: str, job_config: Dict[str, Any]) -> bool:
+        """Reserve a dispatch token, returns True if the run was rescheduled for when the token is available"""
+        delay = self.rate_limiter.reserve(get_job_config_dimensions(job_config))
+        if delay <= 0:
+            return False
+        
+        run_date = datetime.now(pytz.UTC) + timedelta(seconds=delay)
+        deferred_id = f"{job_id}_deferred_{uuid.uuid4().hex}"
+        with self._deferred_lock:
+            self._deferred_runs[job_id] = deferred_id
+        try:
+            self.scheduler.add_job(
+                func=self._execute_scheduled_job,
+                args=[job_id, True],
+                trigger=DateTrigger(run_date=run_date),
+                id=deferred_id,
+                name=f"{job_config.get('name', job_id)} (rate limited)",
+                misfire_grace_time=None,
+                jobstore='transient'
+            )
+        except Exception:
+            with self._deferred_lock:
+                self._deferred_runs.pop(job_id, None)
+            raise
+        self.logger.info(f"[INTEGRATED_SCHEDULER] Job {job_id} deferred {delay:.1f}s by dispatch rate limit")
+        return True
     
-    def _load_scheduled_jobs(self):
-        """Load jobs with schedules from database and schedule them"""
+    def _load_scheduled_jobs(self, shards: Optional[Set[int]] = None):
+        """Load jobs with schedules from database in bulk and schedule them (only those of the given shards if set)"""
         try:
-            jobs = self.job_manager.list_jobs(enabled_only=True)
-            scheduled_count = 0
+            started = time.perf_counter()
+            job_filter = None
+            if shards is not None:
+                job_filter = lambda job_id: self.cluster.get_shard(job_id) in shards
+            elif self.cluster:
+                job_filter = self.cluster.is_local_job
+            
+            loader = BulkJobLoader.from_config(self.job_manager, load_scheduler_config_section('bulk_load'))
+            jobs = loader.load(job_filter)
+            
+            if isinstance(self.job_store, DatabaseJobStore):
+                self.job_store.prime({
+                    job['job_id']: to_db_time(from_db_time(job['next_scheduled_time'])) for job in jobs
+                })
             
+            scheduled_count = 0
             for job in jobs:
                 job_id = job['job_id']
+                self._record_synced_version(job_id, job['modified_date'])
                 
-                # Get full job configuration
-                job_config = self.job_manager.get_job(job_id)
-                if not job_config:
+                schedule_config = job['schedule']
+                if not schedule_config:
                     continue
                 
-                # Check if job has schedule configuration
-                configuration = job_config.get('configuration', {})
-                schedule_config = configuration.get('schedule')
+                try:
+                    trigger = self._create_trigger(schedule_config, verbose=False)
+                    if not trigger:
+                        self.logger.warning(f"[INTEGRATED_SCHEDULER] Failed to schedule job {job_id}: Invalid schedule configuration")
+                        continue
+                    
+                    trigger = apply_jitter(job_id, trigger, int(schedule_config.get('jitter_window') or 0))
+                    stored_next_run_time = from_db_time(job['next_scheduled_time']) if self.persistent_store else None
+                    self._register_trigger(job_id, job['name'] or f'Job {job_id}', trigger, stored_next_run_time)
+                    scheduled_count += 1
+                except Exception as e:
+                    self.logger.warning(f"[INTEGRATED_SCHEDULER] Failed to schedule job {job_id}: {e}")
+            
+            self.logger.info(f"[INTEGRATED_SCHEDULER] Loaded and scheduled {scheduled_count} jobs from database in {time.perf_counter() - started:.2f}s "
+                             f"(fetch and parse {loader.stats.get('seconds', 0):.2f}s)")
+            
+        except Exception as e:
+            self.logger.error(f"[INTEGRATED_SCHEDULER] Error loading scheduled jobs: {e}")
+    
+    def _sync_changed_jobs(self):
+        """Reschedule or unschedule only the jobs whose modified_date changed since the last sync"""
+        try:
+            since = None
+            if self._sync_watermark is not None:
+                since = self._sync_watermark - timedelta(seconds=int(self.job_store_config.get('sync_overlap_seconds', 60)))
+            
+            synced_count = 0
+            for job in self.job_manager.list_jobs_modified_since(since):
+                job_id = job['job_id']
+                if job_id in self._synced_versions and self._synced_versions[job_id] == job.get('modified_date'):
+                    continue
                 
-                if schedule_config:
+                if self.cluster and not self.cluster.is_local_job(job_id):
+                    # Loaded with its shard if this node takes the shard over
+                    continue
+                
+                parsed_config = job.get('parsed_config')
+                schedule_config = parsed_config.get('schedule') if isinstance(parsed_config, dict) else None
+                if job.get('enabled') and schedule_config:
                     result = self.schedule_job(job_id, schedule_config)
-                    if result['success']:
-                        scheduled_count += 1
-                    else:
-                        self.logger.warning(f"[INTEGRATED_SCHEDULER] Failed to schedule job {job_id}: {result['error']}")
+                    if not result['success']:
+                        self.logger.warning(f"[INTEGRATED_SCHEDULER] Failed to sync job {job_id}: {result['error']}")
+                elif self.scheduler.get_job(job_id):
+                    self.unschedule_job(job_id)
+                
+                self._record_synced_version(job_id, job.get('modified_date'))
+                synced_count += 1
             
-            self.logger.info(f"[INTEGRATED_SCHEDULER] Loaded and scheduled {scheduled_count} jobs from database")
+            if synced_count:
+                self.logger.info(f"[INTEGRATED_SCHEDULER] Synced {synced_count} changed jobs from database")
             
         except Exception as e:
-            self.logger.error(f"[INTEGRATED_SCHEDULER] Error loading scheduled jobs: {e}")
+            self.logger.error(f"[INTEGRATED_SCHEDULER] Error syncing changed jobs: {e}")
+    
+    def _record_synced_version(self, job_id: str, modified_date: Optional[str]):
+        """Remember the modified_date a job was synced at and advance the sync watermark"""
+        self._synced_versions[job_id] = modified_date
+        if modified_date:
+            modified = datetime.fromisoformat(modified_date).replace(tzinfo=None)
+            if self._sync_watermark is None or modified > self._sync_watermark:
+                self._sync_watermark = modified
+    
+    def _on_shards_changed(self, gained: Set[int], lost: Set[int]):
+        """Unschedule the jobs of shards this node gave up and load the jobs of shards it took over"""
+        if lost:
+            job_ids = [job.id for job in self.scheduler.get_jobs(jobstore='default') if self.cluster.get_shard(job.id) in lost]
+            if isinstance(self.job_store, DatabaseJobStore):
+                # Their stored fire times stay for the new owner to resume from
+                with self.job_store.handing_off(job_ids):
+                    self._remove_jobs(job_ids)
+            else:
+                self._remove_jobs(job_ids)
+            for job_id in job_ids:
+                self._synced_versions.pop(job_id, None)
+            self.logger.info(f"[INTEGRATED_SCHEDULER] Handed off {len(job_ids)} jobs of {len(lost)} shards")
+        
+        if gained:
+            if isinstance(self.job_store, DatabaseJobStore):
+                self.job_store.begin_batch()
+            try:
+                self._load_scheduled_jobs(shards=gained)
+            finally:
+                if isinstance(self.job_store, DatabaseJobStore):
+                    self.job_store.flush_batch()
+    
+    def _remove_jobs(self, job_ids: List[str]):
+        """Remove jobs from APScheduler, ignoring ones already gone"""
+        for job_id in job_ids:
+            try:
+                self.scheduler.remove_job(job_id, jobstore='default')
+            except JobLookupError:
+                pass
     
     def get_scheduler_status(self) -> Dict[str, Any]:
         """Get comprehensive scheduler status"""
         try:
-            # Get scheduled jobs from APScheduler
-            scheduled_jobs = self.scheduler.get_jobs()
+            # Get scheduled jobs from APScheduler (internal and rate-limit deferred jobs live in 'transient')
+            scheduled_jobs = self.scheduler.get_jobs(jobstore='default')
             
             # Get all jobs from database
             all_jobs = self.job_manager.list_jobs()
@@ -460,6 +728,10 @@ class IntegratedScheduler:
                 'disabled_jobs': len(all_jobs) - len(enabled_jobs),
                 'job_types': self._get_job_type_counts(all_jobs),
                 'next_run_times': self._get_next_run_times(scheduled_jobs),
+                'rate_limits': self.rate_limiter.get_stats(),
+                'persistent_job_store': self.persistent_store,
+                'cluster': self.cluster.get_status() if self.cluster else None,
+                'trigger_cache': get_trigger_cache_stats(),
                 'status': 'running' if self.scheduler.running else 'stopped'
             }
             
@@ -467,6 +739,27 @@ class IntegratedScheduler:
             self.logger.error(f"[INTEGRATED_SCHEDULER] Error getting scheduler status: {e}")
             return {'error': str(e)}
     
+    def get_fire_density_report(self, horizon_seconds: int = 3600, top: int = 10) -> Dict[str, Any]:
+        """Get per-second fire density of scheduled jobs over the horizon, without and with jitter"""
+        try:
+            # Only configured jobs, the sync interval and deferred runs live in 'transient'
+            triggers = [(job.id, job.trigger) for job in self.scheduler.get_jobs(jobstore='default')]
+            report = build_fire_density_report(triggers, datetime.now(pytz.UTC), horizon_seconds, top)
+            report['jittered_job_ids'] = [job_id for job_id, trigger in triggers if isinstance(trigger, JitteredTrigger)]
+            return report
+            
+        except Exception as e:
+            self.logger.error(f"[INTEGRATED_SCHEDULER] Error building fire density report: {e}")
+            return {'error': str(e)}
+    
+    def get_upcoming_fire_times(self, count: int = 5, job_ids: Optional[Set[str]] = None) -> Dict[str, List[datetime]]:
+        """Get the next fire times (aware) of scheduled jobs, computed in one batch"""
+        triggers = [
+            (job.id, job.trigger) for job in self.scheduler.get_jobs(jobstore='default')
+            if job.next_run_time and (job_ids is None or job.id in job_ids)
+        ]
+        return compute_next_fire_times(triggers, datetime.now(pytz.UTC), count)
+    
     def _get_job_type_counts(self, jobs: List[Dict[str, Any]]) -> Dict[str, int]:
         """Get count of jobs by type"""
         counts = {}
@@ -529,4 +822,19 @@ class IntegratedScheduler:
     
     def _on_job_missed(self, event):
         """Handle missed job execution"""
-        self.logger.warning(f"[INTEGRATED_SCHEDULER] Job missed: {event.job_id}")
\ No newline at end of file
+        self.logger.warning(f"[INTEGRATED_SCHEDULER] Job missed: {event.job_id}")
+        self._end_recovery_grace(event.job_id)
+    
+    def _on_job_submitted(self, event):
+        """Handle a job submitted to its executor"""
+        self._end_recovery_grace(event.job_id)
+    
+    def _end_recovery_grace(self, job_id: str):
+        """Put a recovered job back on the default misfire grace once its recovered fire is decided"""
+        if job_id not in self._recovering_jobs:
+            return
+        self._recovering_jobs.discard(job_id)
+        try:
+            self.scheduler.modify_job(job_id, misfire_grace_time=DEFAULT_MISFIRE_GRACE_SECONDS)
+        except JobLookupError:
+            pass
\ No newline at end of file
@@ -8,13 +8,14 @@ Created: 2025-09-04 12:25
 import yaml
 import json
 import uuid
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from datetime import datetime
 from utils.logger import get_logger
 from database.sqlalchemy_models import (
     get_db_session, 
     JobConfigurationV2, 
-    JobExecutionHistoryV2
+    JobExecutionHistoryV2,
+    utc_now
 )
 
 
@@ -141,6 +142,98 @@ class JobManager:
             
             return result
     
+    def iter_enabled_job_rows(self, chunk_size: int = 1000) -> Iterator[List[Tuple]]:
+        """
+        Stream every enabled V2 job in one query, in chunks of raw rows
+        
+        Only the columns needed for scheduling are fetched and nothing is
+        parsed here, so callers can parse the YAML in bulk.
+        
+        Args:
+            chunk_size: Rows fetched from the cursor and yielded at a time
+            
+        Yields:
+            Lists of (job_id, name, yaml_configuration, modified_date, next_scheduled_time) tuples
+        """
+        with get_db_session() as session:
+            query = session.query(
+                JobConfigurationV2.job_id,
+                JobConfigurationV2.name,
+                JobConfigurationV2.yaml_configuration,
+                JobConfigurationV2.modified_date,
+                JobConfigurationV2.next_scheduled_time
+            ).filter(JobConfigurationV2.enabled == True).yield_per(chunk_size)
+            
+            chunk = []
+            for row in query:
+                chunk.append(tuple(row))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    
+    def list_jobs_modified_since(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        List V2 jobs (enabled or not) modified at or after a point in time
+        
+        Used by the scheduler to sync configuration changes incrementally.
+        
+        Args:
+            since: Lower bound on modified_date (None returns every job)
+            
+        Returns:
+            List of V2 job dictionaries with parsed_config, oldest change first
+        """
+        try:
+            with get_db_session() as session:
+                query = session.query(JobConfigurationV2)
+                if since is not None:
+                    query = query.filter(JobConfigurationV2.modified_date >= since)
+                query = query.order_by(JobConfigurationV2.modified_date)
+                
+                result = []
+                for job in query.all():
+                    job_dict = job.to_dict()
+                    try:
+                        job_dict['parsed_config'] = yaml.safe_load(job_dict['yaml_configuration']) or {}
+                    except yaml.YAMLError:
+                        job_dict['parsed_config'] = {}
+                    result.append(job_dict)
+                
+                return result
+                
+        except Exception as e:
+            self.logger.error(f"[JOB_MANAGER] Error listing jobs modified since {since}: {e}")
+            return []
+    
+    def list_job_ids(self) -> List[str]:
+        """
+        List the IDs of all V2 jobs (enabled or not)
+        
+        Lets the scheduler notice deleted jobs without reading every configuration.
+        
+        Raises:
+            Exception: If the query fails, so a failed read is not taken for an empty table
+        """
+        with get_db_session() as session:
+            return [job_id for (job_id,) in session.query(JobConfigurationV2.job_id)]
+    
+    def job_exists(self, job_id: str) -> bool:
+        """
+        Check whether a V2 job exists (enabled or not)
+        
+        Unlike get_job(), which returns None on any error, this tells a deleted
+        job apart from a failed lookup.
+        
+        Raises:
+            Exception: If the query fails
+        """
+        with get_db_session() as session:
+            return session.query(JobConfigurationV2.job_id).filter(
+                JobConfigurationV2.job_id == job_id
+            ).first() is not None
+    
     def get_job(self, job_id: str, job_version: str = None, version: str = None, **kwargs) -> Optional[Dict[str, Any]]:
         """
         Get a V2 job by ID
@@ -469,7 +562,7 @@ class JobManager:
                 self.logger.info(f"[JOB_MANAGER] No YAML update needed")
             
             # Save changes
-            job.modified_date = datetime.now(timezone.utc)
+            job.modified_date = utc_now()
             session.commit()
             
             self.logger.info(f"[JOB_MANAGER] V2 job updated successfully: {job.name}")
@@ -582,7 +675,7 @@ class JobManager:
             
             if job:
                 job.enabled = enabled
-                job.modified_date = datetime.now(timezone.utc)
+                job.modified_date = utc_now()
                 session.commit()
                 
                 status = "enabled" if enabled else "disabled"
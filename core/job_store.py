@@ -0,0 +1,224 @@
+"""
+Persistent APScheduler job store for the IntegratedScheduler
+Keeps each job's next fire time in job_configurations_v2 so schedules survive restarts
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+import pytz
+import yaml
+from apscheduler.jobstores.memory import MemoryJobStore
+from sqlalchemy import bindparam
+
+from utils.logger import get_logger
+from database.sqlalchemy_models import get_db_session, JobConfigurationV2
+
+
+def to_db_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to the naive UTC stored in DATETIME columns"""
+    if value is None:
+        return None
+    return value.astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def from_db_time(value) -> Optional[datetime]:
+    """Convert a naive UTC DATETIME value (or its ISO string) to an aware datetime"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return pytz.UTC.localize(value)
+    return value
+
+
+class DatabaseJobStore(MemoryJobStore):
+    """
+    Job store that writes next fire times through to the job configuration table
+    
+    Jobs themselves (trigger and callable) are rebuilt from each row's YAML
+    schedule at startup, so only the next fire time has to be persisted. It
+    goes into the indexed next_scheduled_time column, and the scheduler hands
+    it back when re-adding the job, so fires that fell due while the process
+    was down are run on start (coalesced) instead of being skipped.
+    
+    Writes leave modified_date untouched; it marks configuration changes,
+    which the scheduler syncs incrementally. Values already in the table are
+    not written again. Changes are written behind by a thread every
+    flush_interval_seconds as one executemany (the latest value per job), so
+    a fire never waits for the database on the APScheduler thread; with an
+    interval of 0 every change is written through. Between begin_batch() and
+    flush_batch() writes are collected and sent at once (used while starting
+    with many jobs). Jobs removed inside handing_off() keep their stored fire
+    time, for the scheduler node that takes them over.
+    """
+    
+    def __init__(self, session_factory=get_db_session, flush_interval_seconds: float = 1.0):
+        super().__init__()
+        self.session_factory = session_factory
+        self.flush_interval = max(float(flush_interval_seconds), 0.0)
+        self._stored: Dict[str, Optional[datetime]] = {}  # job_id -> next_scheduled_time known to be in the table
+        self._pending: Dict[str, Optional[datetime]] = {}  # job_id -> next_scheduled_time waiting for the writer
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps flushes in order, so an older value never lands last
+        self._batch: Optional[Dict[str, Optional[datetime]]] = None
+        self._handing_off: Set[str] = set()
+        self._writer: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.logger = get_logger(__name__)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'DatabaseJobStore':
+        """Create a store from the scheduler.persistent_job_store configuration"""
+        return cls(flush_interval_seconds=float(config.get('flush_interval_seconds', 1.0)))
+    
+    def prime(self, stored_times: Dict[str, Optional[datetime]]):
+        """Record next_scheduled_time values already in the table (naive UTC), so unchanged ones are skipped"""
+        self._stored.update(stored_times)
+    
+    def begin_batch(self):
+        """Collect writes until flush_batch()"""
+        if self._batch is None:
+            self._batch = {}
+    
+    def flush_batch(self):
+        """Write collected next run times in one round trip and stop batching"""
+        batch, self._batch = self._batch, None
+        if batch:
+            self._write(batch)
+    
+    def flush(self):
+        """Write changes still waiting for the writer thread now (on the calling thread)"""
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._write(pending)
+    
+    def close(self):
+        """Stop the writer thread and write what it had not written yet"""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self._stop_event.set()
+            writer.join()
+            self._stop_event.clear()
+        self.flush()
+    
+    @contextmanager
+    def handing_off(self, job_ids: Iterable[str]):
+        """Remove jobs from this store without clearing their stored fire time"""
+        job_ids = set(job_ids)
+        # The node taking over reads the latest fire times, not the ones the writer had yet to write
+        self.flush()
+        self._handing_off |= job_ids
+        try:
+            yield
+        finally:
+            self._handing_off -= job_ids
+            for job_id in job_ids:
+                self._stored.pop(job_id, None)
+    
+    def add_job(self, job):
+        super().add_job(job)
+        self._store_next_run_times([job.id], job.next_run_time)
+    
+    def update_job(self, job):
+        super().update_job(job)
+        self._store_next_run_times([job.id], job.next_run_time)
+    
+    def remove_job(self, job_id):
+        super().remove_job(job_id)
+        self._store_next_run_times([job_id], None)
+    
+    def remove_all_jobs(self):
+        job_ids = list(self._jobs_index)
+        super().remove_all_jobs()
+        self._store_next_run_times(job_ids, None)
+    
+    def _store_next_run_times(self, job_ids: Iterable[str], next_run_time: Optional[datetime]):
+        """Set next_scheduled_time of job rows, skipping rows that already hold (or will hold) the value"""
+        value = to_db_time(next_run_time)
+        with self._pending_lock:
+            changes = {
+                job_id: value for job_id in job_ids
+                if job_id not in self._handing_off and not self._holds(job_id, value)
+            }
+            if not changes:
+                return
+            
+            if self._batch is not None:
+                self._batch.update(changes)
+                return
+            if self.flush_interval > 0:
+                self._pending.update(changes)
+                self._start_writer()
+                return
+        
+        self._write(changes)
+    
+    def _holds(self, job_id: str, value: Optional[datetime]) -> bool:
+        """Check if the table holds value for the job once pending writes are done (pending lock must be held)"""
+        for known in (self._pending, self._stored):
+            if job_id in known:
+                return known[job_id] == value
+        return False
+    
+    def _start_writer(self):
+        """Start the write-behind thread on the first pending change (pending lock must be held)"""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, name="JobStoreWriter", daemon=True)
+            self._writer.start()
+    
+    def _writer_loop(self):
+        """Write pending changes every flush interval until close()"""
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+    
+    def _write(self, changes: Dict[str, Optional[datetime]]):
+        """Update next_scheduled_time per job in one executemany, without bumping modified_date"""
+        table = JobConfigurationV2.__table__
+        statement = (
+            table.update()
+            .where(table.c.job_id == bindparam('b_job_id'))
+            .values(next_scheduled_time=bindparam('b_next_scheduled_time'), modified_date=table.c.modified_date)
+        )
+        
+        try:
+            with self.session_factory() as session:
+                session.connection().execute(statement, [
+                    {'b_job_id': job_id, 'b_next_scheduled_time': value} for job_id, value in changes.items()
+                ])
+                session.commit()
+            with self._pending_lock:
+                self._stored.update(changes)
+        except Exception as e:
+            # The in-memory schedule stays authoritative, only restart recovery is affected
+            self.logger.error(f"[JOB_STORE] Error storing next run time for {len(changes)} jobs: {e}")
+
+
+def is_stored_fire_time_valid(trigger, stored_time: Optional[datetime]) -> bool:
+    """Check that a stored next fire time is a fire time of the job's current trigger"""
+    if stored_time is None:
+        return False
+    try:
+        return trigger.get_next_fire_time(None, stored_time) == stored_time
+    except Exception:
+        return False
+
+
+def load_scheduler_config_section(name: str) -> Dict[str, Any]:
+    """Load a sub-section of the scheduler configuration from config file"""
+    config_path = Path("config/config.yaml")
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+                return (config.get('scheduler') or {}).get(name) or {}
+        except Exception as e:
+            get_logger(__name__).warning(f"Could not load scheduler {name} configuration: {str(e)}")
+    
+    return {}
@@ -0,0 +1,209 @@
+"""
+Dispatch rate limiting for Windows Job Scheduler
+Token buckets per connection_name, agent_pool and job type, shared by the V2 queues and IntegratedScheduler
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from utils.logger import get_logger
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of refusals.
+    
+    A reservation always succeeds and returns how long the caller must wait
+    for its token. The balance may go negative, so a burst of excess jobs is
+    spread out at the refill rate rather than released all at once.
+    """
+    
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = float(rate_per_second)
+        if not self.rate > 0:
+            raise ValueError(f"rate_per_second must be positive, got {rate_per_second}")
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        
+        # Metrics
+        self.granted = 0
+        self.deferred = 0
+        self.total_deferral = 0.0
+    
+    def reserve(self, now: Optional[float] = None) -> float:
+        """Take one token, returns seconds until it is actually available (0 if available now)"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self._tokens -= 1
+        
+        if self._tokens >= 0:
+            self.granted += 1
+            return 0.0
+        
+        delay = -self._tokens / self.rate
+        self.deferred += 1
+        self.total_deferral += delay
+        return delay
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket statistics"""
+        self._refill(time.monotonic())
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens": self._tokens,
+            "granted": self.granted,
+            "deferred": self.deferred,
+            "avg_deferral": self.total_deferral / self.deferred if self.deferred else 0.0
+        }
+    
+    def _refill(self, now: float):
+        """Add tokens accrued since the last update, up to the burst size"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class DispatchRateLimiter:
+    """
+    Rate limiters consulted before a job is dispatched.
+    
+    Buckets are configured in the rate_limits section of config/config.yaml,
+    keyed by connection name, agent pool and job type. A job reserves a token
+    from every bucket that applies to it and is deferred by the longest wait.
+    """
+    
+    # Config section -> dimension name used in bucket keys
+    DIMENSIONS: Tuple[Tuple[str, str], ...] = (
+        ("connections", "connection"),
+        ("agent_pools", "agent_pool"),
+        ("job_types", "job_type"),
+    )
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.enabled = bool(config.get('enabled', True))
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.logger = get_logger("DispatchRateLimiter")
+        
+        for section, dimension in self.DIMENSIONS:
+            for name, limit in (config.get(section) or {}).items():
+                try:
+                    rate = float(limit.get('rate_per_second', limit.get('rate', 1)))
+                    burst = float(limit.get('burst', max(rate, 1)))
+                    self._buckets[(dimension, str(name).lower())] = TokenBucket(rate, burst)
+                except Exception as e:
+                    self.logger.warning(f"Ignoring invalid rate limit {section}.{name}: {str(e)}")
+        
+        if self._buckets:
+            self.logger.info(f"Dispatch rate limiter configured with {len(self._buckets)} buckets")
+    
+    def has_limits(self) -> bool:
+        """Check if any bucket is configured"""
+        return self.enabled and bool(self._buckets)
+    
+    def reserve(self, dimensions: List[Tuple[str, str]]) -> float:
+        """
+        Reserve a dispatch slot in every bucket matching the job
+        
+        Args:
+            dimensions: (dimension, name) pairs, e.g. ("connection", "warehouse")
+        
+        Returns:
+            Seconds the dispatch must be deferred (0 to dispatch now)
+        """
+        if not self.has_limits():
+            return 0.0
+        
+        delay = 0.0
+        with self._lock:
+            now = time.monotonic()
+            for dimension, name in dimensions:
+                bucket = self._buckets.get((dimension, str(name).lower()))
+                if bucket is not None:
+                    delay = max(delay, bucket.reserve(now))
+        return delay
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get statistics of every bucket, keyed as dimension:name"""
+        with self._lock:
+            return {f"{dimension}:{name}": bucket.get_stats() for (dimension, name), bucket in self._buckets.items()}
+
+
+def get_job_definition_dimensions(job: Any) -> List[Tuple[str, str]]:
+    """Get rate limit dimensions of a V2 JobDefinition (step types, connection names, agent pool)"""
+    dimensions = set()
+    metadata = getattr(job, 'metadata', None) or {}
+    
+    if metadata.get('agent_pool'):
+        dimensions.add(("agent_pool", metadata['agent_pool']))
+    
+    for step in getattr(job, 'steps', None) or []:
+        step_type = getattr(step, 'step_type', None)
+        if step_type:
+            dimensions.add(("job_type", step_type))
+        step_config = getattr(step, 'config', None) or {}
+        if step_config.get('connection_name'):
+            dimensions.add(("connection", step_config['connection_name']))
+        if step_config.get('agent_pool'):
+            dimensions.add(("agent_pool", step_config['agent_pool']))
+    
+    return sorted(dimensions)
+
+
+def get_job_config_dimensions(job_config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Get rate limit dimensions of a job configuration dict from JobManager"""
+    dimensions = []
+    parsed_config = job_config.get('parsed_config') or {}
+    if not isinstance(parsed_config, dict):
+        parsed_config = {}
+    
+    job_type = job_config.get('job_type') or parsed_config.get('type')
+    if job_type:
+        dimensions.append(("job_type", job_type))
+    
+    connection_name = job_config.get('connection_name') or parsed_config.get('connection')
+    if connection_name:
+        dimensions.append(("connection", connection_name))
+    
+    agent_pool = job_config.get('agent_pool') or parsed_config.get('agent_pool')
+    if agent_pool:
+        dimensions.append(("agent_pool", agent_pool))
+    
+    return dimensions
+
+
+def _load_rate_limit_config() -> Dict[str, Any]:
+    """Load rate_limits configuration from config file"""
+    config_path = Path("config/config.yaml")
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+                return config.get('rate_limits') or {}
+        except Exception as e:
+            get_logger("DispatchRateLimiter").warning(f"Could not load rate limit configuration: {str(e)}")
+    
+    return {}
+
+
+# Global rate limiter instance
+_limiter_instance: Optional[DispatchRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_dispatch_rate_limiter() -> DispatchRateLimiter:
+    """Get the global dispatch rate limiter (singleton, configured from config.yaml)"""
+    global _limiter_instance
+    
+    if _limiter_instance is None:
+        with _limiter_lock:
+            if _limiter_instance is None:
+                _limiter_instance = DispatchRateLimiter(_load_rate_limit_config())
+    
+    return _limiter_instance
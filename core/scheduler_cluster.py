@@ -0,0 +1,668 @@
+"""
+Multi-node scheduling through heartbeated lease rows in the database
+Splits IntegratedScheduler jobs into job_id hash shards per node, and elects the active SchedulerManager among hot standbys
+"""
+
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, func, literal_column, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from utils.logger import get_logger
+from database.sqlalchemy_models import get_db_session, SchedulerLease
+
+
+NODE_LEASE_PREFIX = "node:"
+SHARD_LEASE_PREFIX = "shard:"
+LEADER_LEASE_PREFIX = "leader:"
+
+
+def get_job_shard(job_id: str, shard_count: int) -> int:
+    """Map a job ID to its shard (CRC32 is stable across processes and hosts, unlike hash())"""
+    return zlib.crc32(job_id.encode('utf-8')) % shard_count
+
+
+def get_default_node_id() -> str:
+    """Node ID unique to this process: hostname and PID"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseTable:
+    """
+    Atomic lease operations on the scheduler_leases table
+    
+    Every operation is a single conditional statement, so two nodes can
+    never both succeed in taking the same lease. Expiry is evaluated with
+    the database clock, which keeps nodes with skewed clocks consistent.
+    """
+    
+    def __init__(self, session_factory=get_db_session):
+        self.session_factory = session_factory
+        self.table = SchedulerLease.__table__
+    
+    @staticmethod
+    def _db_now():
+        return func.getutcdate()
+    
+    def _db_expiry(self, ttl_seconds: int):
+        return func.dateadd(literal_column('second'), ttl_seconds, self._db_now())
+    
+    def ensure(self, lease_names: Iterable[str]):
+        """Create missing lease rows (unowned), rows created concurrently by other nodes are fine"""
+        lease_names = list(lease_names)
+        table = self.table
+        with self.session_factory() as session:
+            existing = {row[0] for row in session.execute(
+                select(table.c.lease_name).where(table.c.lease_name.in_(lease_names))
+            )}
+            missing = [name for name in lease_names if name not in existing]
+            if not missing:
+                return
+            try:
+                session.execute(table.insert(), [{'lease_name': name, 'fencing_token': 0} for name in missing])
+                session.commit()
+            except IntegrityError:
+                # Another node created (some of) them first
+                session.rollback()
+                for name in missing:
+                    try:
+                        session.execute(table.insert().values(lease_name=name, fencing_token=0))
+                        session.commit()
+                    except IntegrityError:
+                        session.rollback()
+    
+    def acquire(self, lease_names: Iterable[str], owner_id: str, ttl_seconds: int) -> int:
+        """Take every listed lease that is free, expired or already ours, returns the number of rows taken"""
+        lease_names = list(lease_names)
+        if not lease_names:
+            return 0
+        
+        table = self.table
+        now = self._db_now()
+        statement = (
+            table.update()
+            .where(and_(
+                table.c.lease_name.in_(lease_names),
+                or_(table.c.owner_id.is_(None), table.c.expires_at < now, table.c.owner_id == owner_id)
+            ))
+            .values(
+                owner_id=owner_id,
+                expires_at=self._db_expiry(ttl_seconds),
+                renewed_at=now,
+                acquired_at=case((table.c.owner_id == owner_id, table.c.acquired_at), else_=now),
+                fencing_token=case((table.c.owner_id == owner_id, table.c.fencing_token), else_=table.c.fencing_token + 1)
+            )
+        )
+        with self.session_factory() as session:
+            result = session.execute(statement)
+            session.commit()
+            return result.rowcount
+    
+    def take(self, lease_name: str, owner_id: str, ttl_seconds: int) -> Optional[int]:
+        """
+        Start a new holding of a lease that is free, expired or left by an earlier process of ours
+        
+        Unlike acquire(), the fencing token is always incremented, so writes of
+        the previous holder are refused even if it had the same owner ID.
+        Returns the new fencing token, None if someone else holds the lease.
+        """
+        table = self.table
+        now = self._db_now()
+        statement = (
+            table.update()
+            .where(and_(
+                table.c.lease_name == lease_name,
+                or_(table.c.owner_id.is_(None), table.c.expires_at < now, table.c.owner_id == owner_id)
+            ))
+            .values(
+                owner_id=owner_id,
+                expires_at=self._db_expiry(ttl_seconds),
+                renewed_at=now,
+                acquired_at=now,
+                fencing_token=table.c.fencing_token + 1
+            )
+        )
+        with self.session_factory() as session:
+            if session.execute(statement).rowcount == 0:
+                session.rollback()
+                return None
+            # Still inside the transaction, the row is locked by our update
+            token = session.execute(
+                select(table.c.fencing_token).where(table.c.lease_name == lease_name)
+            ).scalar()
+            session.commit()
+            return token
+    
+    def renew_fenced(self, lease_name: str, owner_id: str, fencing_token: int, ttl_seconds: int) -> bool:
+        """Extend a lease only if it is still ours under the same fencing token"""
+        table = self.table
+        statement = (
+            table.update()
+            .where(and_(
+                table.c.lease_name == lease_name,
+                table.c.owner_id == owner_id,
+                table.c.fencing_token == fencing_token
+            ))
+            .values(expires_at=self._db_expiry(ttl_seconds), renewed_at=self._db_now())
+        )
+        with self.session_factory() as session:
+            result = session.execute(statement)
+            session.commit()
+            return result.rowcount > 0
+    
+    def holds(self, session, lease_name: str, owner_id: str, fencing_token: int) -> bool:
+        """
+        Check in the caller's transaction that a live lease is held with this fencing token
+        
+        The lease row stays locked until the session commits or rolls back, so
+        the lease cannot change hands between this check and the caller's
+        writes in the same transaction.
+        """
+        table = self.table
+        query = (
+            select(table.c.lease_name)
+            .where(and_(
+                table.c.lease_name == lease_name,
+                table.c.owner_id == owner_id,
+                table.c.fencing_token == fencing_token,
+                table.c.expires_at >= self._db_now()
+            ))
+            .with_for_update()
+        )
+        return session.execute(query).first() is not None
+    
+    def renew(self, owner_id: str, ttl_seconds: int, prefix: Optional[str] = None) -> int:
+        """
+        Extend every lease held by the owner (with the name prefix if given), returns the number renewed
+        
+        Leases still carrying our owner_id were not taken by anyone, even
+        if they expired meanwhile, so they are safe to extend.
+        """
+        table = self.table
+        condition = table.c.owner_id == owner_id
+        if prefix:
+            condition = and_(condition, table.c.lease_name.like(f"{prefix}%"))
+        statement = (
+            table.update()
+            .where(condition)
+            .values(expires_at=self._db_expiry(ttl_seconds), renewed_at=self._db_now())
+        )
+        with self.session_factory() as session:
+            result = session.execute(statement)
+            session.commit()
+            return result.rowcount
+    
+    def release(self, lease_names: Iterable[str], owner_id: str, fencing_token: Optional[int] = None) -> int:
+        """Give up leases held by the owner (under the fencing token if given) so other nodes can take them at once"""
+        lease_names = list(lease_names)
+        if not lease_names:
+            return 0
+        
+        table = self.table
+        condition = and_(table.c.lease_name.in_(lease_names), table.c.owner_id == owner_id)
+        if fencing_token is not None:
+            condition = and_(condition, table.c.fencing_token == fencing_token)
+        statement = (
+            table.update()
+            .where(condition)
+            .values(owner_id=None, expires_at=None)
+        )
+        with self.session_factory() as session:
+            result = session.execute(statement)
+            session.commit()
+            return result.rowcount
+    
+    def snapshot(self, prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read lease rows with a 'live' flag (owned and not expired by the database clock)"""
+        table = self.table
+        live = case((and_(table.c.owner_id.isnot(None), table.c.expires_at >= self._db_now()), 1), else_=0)
+        query = select(table.c.lease_name, table.c.owner_id, table.c.fencing_token, live.label('live'))
+        if prefix:
+            query = query.where(table.c.lease_name.like(f"{prefix}%"))
+        
+        with self.session_factory() as session:
+            return [
+                {
+                    'lease_name': row.lease_name,
+                    'owner_id': row.owner_id,
+                    'fencing_token': row.fencing_token,
+                    'live': bool(row.live)
+                }
+                for row in session.execute(query)
+            ]
+
+
+class ShardLeaseManager:
+    """
+    Shard ownership of one scheduler node
+    
+    Jobs map to shard_count shards by job_id hash, and each shard is a
+    lease row. Every node heartbeats its node lease and its shard leases
+    on a dedicated thread, then rebalances: it computes its fair share of
+    shards from the live nodes, releases shards above it (after its jobs
+    were unscheduled) and takes free or expired shards below it. A node
+    that dies stops renewing, its leases expire after lease_ttl_seconds
+    and the survivors take its shards over on their next heartbeat.
+    
+    A node only fires jobs while its lease is known to be valid: if
+    renewal fails (e.g. the database is unreachable), can_run_job() turns
+    false once the lease may have expired, before anyone can take it over.
+    """
+    
+    def __init__(self, node_id: Optional[str] = None, shard_count: int = 64, lease_ttl_seconds: int = 30,
+                 heartbeat_interval_seconds: int = 10, clock_margin_seconds: float = 2.0, lease_table: LeaseTable = None):
+        self.node_id = node_id or get_default_node_id()
+        self.shard_count = max(int(shard_count), 1)
+        self.lease_ttl = max(int(lease_ttl_seconds), 1)
+        self.heartbeat_interval = max(min(float(heartbeat_interval_seconds), self.lease_ttl / 2), 0.1)
+        self.clock_margin = float(clock_margin_seconds)
+        self.leases = lease_table or LeaseTable()
+        self.logger = get_logger(__name__)
+        
+        # Called with (gained, lost) shard sets; lost shards are reported before their leases are released
+        self.on_change: Optional[Callable[[Set[int], Set[int]], None]] = None
+        
+        self._owned: Set[int] = set()
+        self._valid_until = 0.0  # Monotonic time until which our leases are certainly not expired
+        self._live_nodes: List[str] = []
+        self._lock = threading.Lock()
+        self._heartbeat_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        # Metrics
+        self._heartbeats = 0
+        self._heartbeat_failures = 0
+        self._shards_acquired = 0
+        self._shards_released = 0
+        self._last_heartbeat_seconds = 0.0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ShardLeaseManager":
+        """Create a manager from the scheduler.cluster configuration"""
+        return cls(
+            node_id=config.get('node_id') or None,
+            shard_count=int(config.get('shard_count', 64)),
+            lease_ttl_seconds=int(config.get('lease_ttl_seconds', 30)),
+            heartbeat_interval_seconds=int(config.get('heartbeat_interval_seconds', 10)),
+            clock_margin_seconds=float(config.get('clock_margin_seconds', 2))
+        )
+    
+    @property
+    def node_lease(self) -> str:
+        return f"{NODE_LEASE_PREFIX}{self.node_id}"
+    
+    @staticmethod
+    def shard_lease(shard: int) -> str:
+        return f"{SHARD_LEASE_PREFIX}{shard}"
+    
+    def get_shard(self, job_id: str) -> int:
+        """Get the shard a job belongs to"""
+        return get_job_shard(job_id, self.shard_count)
+    
+    def is_local_job(self, job_id: str) -> bool:
+        """Check if the job's shard is assigned to this node (whether or not the lease is still being renewed)"""
+        return self.get_shard(job_id) in self._owned
+    
+    def can_run_job(self, job_id: str) -> bool:
+        """Check if this node may fire the job now: its shard is ours and the lease certainly has not expired"""
+        return self.is_local_job(job_id) and time.monotonic() < self._valid_until
+    
+    def get_owned_shards(self) -> Set[int]:
+        """Get the shards assigned to this node"""
+        return set(self._owned)
+    
+    def join(self):
+        """Register this node and take its first shards (synchronously, so startup loads only owned jobs)"""
+        try:
+            self.leases.ensure([self.node_lease] + [self.shard_lease(shard) for shard in range(self.shard_count)])
+        except Exception as e:
+            self.logger.error(f"[SCHEDULER_CLUSTER] Error creating lease rows: {e}")
+        self.heartbeat()
+        self.logger.info(
+            f"[SCHEDULER_CLUSTER] Node {self.node_id} joined with {len(self._owned)}/{self.shard_count} shards "
+            f"({len(self._live_nodes)} live nodes)"
+        )
+    
+    def start(self):
+        """Start heartbeating on a dedicated thread, so busy job executors never delay lease renewal"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._heartbeat_loop, name="SchedulerClusterHeartbeat", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop heartbeating and release every lease of this node so its shards move immediately"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_interval + 5)
+            self._thread = None
+        
+        with self._heartbeat_lock:
+            released = [self.shard_lease(shard) for shard in self._owned] + [self.node_lease]
+            with self._lock:
+                self._owned = set()
+                self._valid_until = 0.0
+            try:
+                self.leases.release(released, self.node_id)
+                self.logger.info(f"[SCHEDULER_CLUSTER] Node {self.node_id} left the cluster, released {len(released) - 1} shards")
+            except Exception as e:
+                self.logger.error(f"[SCHEDULER_CLUSTER] Error releasing leases of node {self.node_id}: {e}")
+    
+    def heartbeat(self) -> Tuple[Set[int], Set[int]]:
+        """Renew our leases and rebalance shards, returns the (gained, lost) shards"""
+        with self._heartbeat_lock:
+            started = time.monotonic()
+            try:
+                gained, lost = self._rebalance(started)
+                self._heartbeats += 1
+                self._last_heartbeat_seconds = time.monotonic() - started
+            except Exception as e:
+                self._heartbeat_failures += 1
+                self.logger.error(f"[SCHEDULER_CLUSTER] Heartbeat of node {self.node_id} failed: {e}")
+                if self._owned and time.monotonic() >= self._valid_until:
+                    self.logger.warning(
+                        f"[SCHEDULER_CLUSTER] Leases of node {self.node_id} may have expired, "
+                        f"pausing {len(self._owned)} shards until renewal succeeds"
+                    )
+                return set(), set()
+            
+            if gained and self.on_change is not None:
+                try:
+                    self.on_change(gained, set())
+                except Exception as e:
+                    self.logger.error(f"[SCHEDULER_CLUSTER] Error loading gained shards: {e}")
+            return gained, lost
+    
+    def _rebalance(self, started: float) -> Tuple[Set[int], Set[int]]:
+        """One heartbeat round, runs under the heartbeat lock"""
+        # Renew everything we hold, taking the node lease back if it lapsed
+        self.leases.renew(self.node_id, self.lease_ttl, SHARD_LEASE_PREFIX)
+        self.leases.acquire([self.node_lease], self.node_id, self.lease_ttl)
+        
+        rows = self.leases.snapshot()
+        live_nodes = sorted({
+            row['owner_id'] for row in rows
+            if row['lease_name'].startswith(NODE_LEASE_PREFIX) and row['live'] and row['owner_id']
+        } | {self.node_id})
+        shard_rows = [row for row in rows if row['lease_name'].startswith(SHARD_LEASE_PREFIX)]
+        owned = {self._shard_number(row) for row in shard_rows if row['owner_id'] == self.node_id}
+        owned.discard(None)
+        
+        # Renewal succeeded: leases are valid for the TTL counted from before the round trip
+        valid_until = started + self.lease_ttl - self.clock_margin
+        
+        # Fair share: shard_count split over live nodes, the remainder going to the first nodes by ID
+        base, extra = divmod(self.shard_count, len(live_nodes))
+        target = base + (1 if live_nodes.index(self.node_id) < extra else 0)
+        
+        lost_to_others = self._owned - owned
+        released: Set[int] = set()
+        if len(owned) > target:
+            released = set(sorted(owned)[target:])
+            # Stop firing their jobs before anyone else can take them
+            with self._lock:
+                self._owned = owned - released
+                self._valid_until = valid_until
+            if self.on_change is not None:
+                self.on_change(set(), released)
+            self.leases.release([self.shard_lease(shard) for shard in released], self.node_id)
+            self._shards_released += len(released)
+            owned -= released
+        elif len(owned) < target:
+            free = sorted(
+                shard for shard in (self._shard_number(row) for row in shard_rows if not row['live'])
+                if shard is not None
+            )
+            wanted = free[:target - len(owned)]
+            if wanted and self.leases.acquire([self.shard_lease(shard) for shard in wanted], self.node_id, self.lease_ttl):
+                owned = {
+                    self._shard_number(row) for row in self.leases.snapshot(SHARD_LEASE_PREFIX)
+                    if row['owner_id'] == self.node_id
+                }
+                owned.discard(None)
+        
+        gained = owned - self._owned
+        self._shards_acquired += len(gained)
+        with self._lock:
+            self._owned = owned
+            self._live_nodes = live_nodes
+            self._valid_until = valid_until
+        
+        if lost_to_others and self.on_change is not None:
+            # Taken over while our renewals were failing, their jobs are already paused by can_run_job()
+            self.logger.warning(f"[SCHEDULER_CLUSTER] Node {self.node_id} lost shards {sorted(lost_to_others)} to other nodes")
+            self.on_change(set(), lost_to_others)
+        if gained or released or lost_to_others:
+            self.logger.info(
+                f"[SCHEDULER_CLUSTER] Node {self.node_id} rebalanced: +{len(gained)} -{len(released) + len(lost_to_others)} shards, "
+                f"owns {len(owned)}/{self.shard_count} (target {target}, {len(live_nodes)} live nodes)"
+            )
+        return gained, released | lost_to_others
+    
+    def _heartbeat_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            self.heartbeat()
+    
+    @staticmethod
+    def _shard_number(row: Dict[str, Any]) -> Optional[int]:
+        try:
+            return int(row['lease_name'][len(SHARD_LEASE_PREFIX):])
+        except ValueError:
+            return None
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get node, ownership and heartbeat statistics"""
+        return {
+            'node_id': self.node_id,
+            'shard_count': self.shard_count,
+            'owned_shards': sorted(self._owned),
+            'live_nodes': list(self._live_nodes),
+            'lease_valid': time.monotonic() < self._valid_until,
+            'lease_ttl_seconds': self.lease_ttl,
+            'heartbeat_interval_seconds': self.heartbeat_interval,
+            'heartbeats': self._heartbeats,
+            'heartbeat_failures': self._heartbeat_failures,
+            'shards_acquired': self._shards_acquired,
+            'shards_released': self._shards_released,
+            'last_heartbeat_seconds': round(self._last_heartbeat_seconds, 4)
+        }
+
+
+class LeaderElection:
+    """
+    Leader election among scheduler processes of one group
+    
+    The leader holds the leader:<group> lease and renews it every
+    heartbeat; standbys try to take it on every heartbeat and succeed once
+    it was released or expired. Every new leadership increments the lease's
+    fencing token. Renewals only succeed under the token they were elected
+    with, and writes made through holds_lease() commit only while it is
+    current, so a deposed leader (even a stalled process with the same
+    node ID) cannot renew or record anything after a takeover.
+    
+    A leader whose renewals fail stops being leader locally (is_leader()
+    turns false and on_demoted runs) before its lease can expire, so two
+    processes never both act as leader.
+    """
+    
+    def __init__(self, group: str = "scheduler_manager", node_id: Optional[str] = None, lease_ttl_seconds: int = 8,
+                 heartbeat_interval_seconds: float = 2, clock_margin_seconds: float = 1.0, lease_table: LeaseTable = None):
+        self.group = group
+        self.node_id = node_id or get_default_node_id()
+        self.lease_ttl = max(int(lease_ttl_seconds), 1)
+        self.heartbeat_interval = max(min(float(heartbeat_interval_seconds), self.lease_ttl / 2), 0.1)
+        self.clock_margin = float(clock_margin_seconds)
+        self.leases = lease_table or LeaseTable()
+        self.logger = get_logger(__name__)
+        
+        # Called on the election thread: on_elected(fencing_token) after winning, on_demoted() after losing
+        self.on_elected: Optional[Callable[[int], None]] = None
+        self.on_demoted: Optional[Callable[[], None]] = None
+        
+        self._leader = False
+        self._fencing_token: Optional[int] = None
+        self._valid_until = 0.0
+        self._leader_id: Optional[str] = None
+        self._leader_last_seen: Optional[datetime] = None  # Last time (UTC) another live leader was observed
+        self._campaign_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        # Metrics
+        self._elections_won = 0
+        self._demotions = 0
+        self._heartbeat_failures = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LeaderElection":
+        """Create an election from the scheduler.high_availability configuration"""
+        return cls(
+            group=config.get('group') or "scheduler_manager",
+            node_id=config.get('node_id') or None,
+            lease_ttl_seconds=int(config.get('lease_ttl_seconds', 8)),
+            heartbeat_interval_seconds=float(config.get('heartbeat_interval_seconds', 2)),
+            clock_margin_seconds=float(config.get('clock_margin_seconds', 1))
+        )
+    
+    @property
+    def lease_name(self) -> str:
+        return f"{LEADER_LEASE_PREFIX}{self.group}"
+    
+    @property
+    def fencing_token(self) -> Optional[int]:
+        """Fencing token of our leadership, None while standby"""
+        return self._fencing_token if self._leader else None
+    
+    @property
+    def leader_last_seen(self) -> Optional[datetime]:
+        """When another process was last seen holding a live leader lease (UTC)"""
+        return self._leader_last_seen
+    
+    def is_leader(self) -> bool:
+        """Check if this process is leader and its lease certainly has not expired"""
+        return self._leader and time.monotonic() < self._valid_until
+    
+    def start(self):
+        """Campaign once synchronously, then keep campaigning/renewing on a dedicated thread"""
+        try:
+            self.leases.ensure([self.lease_name])
+        except Exception as e:
+            self.logger.error(f"[LEADER_ELECTION] Error creating lease row {self.lease_name}: {e}")
+        self.campaign()
+        
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._election_loop, name="SchedulerLeaderElection", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop campaigning and hand leadership over at once if we hold it"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_interval + 5)
+            self._thread = None
+        
+        with self._campaign_lock:
+            if not self._leader:
+                return
+            self._demote("stopping")
+            try:
+                self.leases.release([self.lease_name], self.node_id, self._fencing_token)
+                self.logger.info(f"[LEADER_ELECTION] Node {self.node_id} released leadership of {self.group}")
+            except Exception as e:
+                self.logger.error(f"[LEADER_ELECTION] Error releasing leadership of {self.group}: {e}")
+    
+    def campaign(self) -> bool:
+        """Renew our leadership or try to take it, returns True if we are leader afterwards"""
+        with self._campaign_lock:
+            started = time.monotonic()
+            try:
+                if self._leader:
+                    if self.leases.renew_fenced(self.lease_name, self.node_id, self._fencing_token, self.lease_ttl):
+                        self._valid_until = started + self.lease_ttl - self.clock_margin
+                        return True
+                    self._demote("lease taken over")
+                else:
+                    token = self.leases.take(self.lease_name, self.node_id, self.lease_ttl)
+                    if token is not None:
+                        self._promote(token, started)
+                        return True
+                
+                lease = self._read_lease()
+                self._leader_id = lease['owner_id'] if lease and lease['live'] else None
+                if self._leader_id:
+                    self._leader_last_seen = datetime.now(timezone.utc)
+            except Exception as e:
+                self._heartbeat_failures += 1
+                self.logger.error(f"[LEADER_ELECTION] Heartbeat of node {self.node_id} failed: {e}")
+                if self._leader and time.monotonic() >= self._valid_until:
+                    self._demote("lease could not be renewed")
+            return self._leader
+    
+    def holds_lease(self, session) -> bool:
+        """
+        Check in the session's transaction that we are still leader under our fencing token
+        
+        Writes the session commits afterwards cannot interleave with a
+        takeover, the lease row stays locked until then.
+        """
+        if not self._leader or self._fencing_token is None:
+            return False
+        return self.leases.holds(session, self.lease_name, self.node_id, self._fencing_token)
+    
+    def _read_lease(self) -> Optional[Dict[str, Any]]:
+        for row in self.leases.snapshot(self.lease_name):
+            if row['lease_name'] == self.lease_name:
+                return row
+        return None
+    
+    def _promote(self, token: Optional[int], started: float):
+        self._leader = True
+        self._leader_id = self.node_id
+        self._fencing_token = token
+        self._valid_until = started + self.lease_ttl - self.clock_margin
+        self._elections_won += 1
+        self.logger.info(f"[LEADER_ELECTION] Node {self.node_id} elected leader of {self.group} (fencing token {token})")
+        if self.on_elected is not None:
+            try:
+                self.on_elected(token)
+            except Exception as e:
+                self.logger.error(f"[LEADER_ELECTION] Error taking over leadership: {e}")
+    
+    def _demote(self, reason: str):
+        self._leader = False
+        self._valid_until = 0.0
+        self._demotions += 1
+        self.logger.warning(f"[LEADER_ELECTION] Node {self.node_id} is no longer leader of {self.group}: {reason}")
+        if self.on_demoted is not None:
+            try:
+                self.on_demoted()
+            except Exception as e:
+                self.logger.error(f"[LEADER_ELECTION] Error stepping down: {e}")
+    
+    def _election_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            self.campaign()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get role, leader and election statistics"""
+        return {
+            'group': self.group,
+            'node_id': self.node_id,
+            'role': 'leader' if self.is_leader() else 'standby',
+            'leader_id': self._leader_id,
+            'fencing_token': self.fencing_token,
+            'lease_ttl_seconds': self.lease_ttl,
+            'heartbeat_interval_seconds': self.heartbeat_interval,
+            'elections_won': self._elections_won,
+            'demotions': self._demotions,
+            'heartbeat_failures': self._heartbeat_failures
+        }
@@ -2,6 +2,7 @@
 Complete Scheduler Manager for Windows Job Scheduler
 """
 
+import copy
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
@@ -9,6 +10,9 @@ from threading import Lock
 import threading
 import signal
 import sys
+import time
+
+import pytz
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -23,6 +27,9 @@ from .sql_job import SqlJob
 from .powershell_job import PowerShellJob
 from database.job_storage import JobStorage
 from utils.logger import get_logger, JobLogger
+from .job_store import load_scheduler_config_section
+from .scheduler_cluster import LeaderElection
+from .trigger_cache import get_cron_trigger, get_timezone
 
 
 class SchedulerManager:
@@ -52,6 +59,13 @@ class SchedulerManager:
         self.jobs: Dict[str, JobBase] = {}
         self.job_schedules: Dict[str, Dict[str, Any]] = {}
         
+        # Hot standby: every process loads all triggers, only the elected leader fires them (config.yaml scheduler.high_availability)
+        self.ha_config = load_scheduler_config_section('high_availability')
+        self.leader_election = LeaderElection.from_config(self.ha_config) if self.ha_config.get('enabled', False) else None
+        self._standby_since: Optional[datetime] = None
+        self._synced_versions: Dict[str, Any] = {}  # job_id -> modified_date (database) or configuration (YAML) last loaded
+        self._sync_watermark: Optional[datetime] = None  # Newest modified_date loaded
+        
         # Initialize APScheduler
         self._init_scheduler()
         
@@ -81,9 +95,19 @@ class SchedulerManager:
         self.logger.info("APScheduler initialized")
     
     def start(self):
-        """Start the scheduler"""
+        """Start the scheduler (paused as a standby until elected leader, in high availability mode)"""
         try:
             if not self.scheduler.running:
+                if self.leader_election:
+                    # Triggers are loaded and computed but nothing fires until this process is leader
+                    self._standby_since = datetime.now(pytz.UTC)
+                    self.scheduler.start(paused=True)
+                    self.leader_election.on_elected = self._on_elected_leader
+                    self.leader_election.on_demoted = self._on_demoted_to_standby
+                    self.leader_election.start()
+                    role = 'leader' if self.leader_election.is_leader() else 'standby'
+                    self.logger.info(f"Scheduler started successfully as {role} (node {self.leader_election.node_id})")
+                    return True
                 self.scheduler.start()
                 self.logger.info("Scheduler started successfully")
             else:
@@ -97,6 +121,9 @@ class SchedulerManager:
     def stop(self, wait: bool = True):
         """Stop the scheduler"""
         try:
+            if self.leader_election:
+                # Pauses firing and releases the leader lease so a standby takes over immediately
+                self.leader_election.stop()
             if self.scheduler.running:
                 self.scheduler.shutdown(wait=wait)
                 self.logger.info("Scheduler stopped successfully")
@@ -210,15 +237,11 @@ class SchedulerManager:
         self.logger.info(f"Creating trigger for timezone: {timezone}")
         
         try:
-            # Import timezone handling
-            import pytz
-            from pytz import timezone as pytz_timezone
-            
-            # Always create timezone object for precise scheduling
+            # Always create timezone object for precise scheduling (cached per name)
             if timezone == 'UTC':
                 tz = pytz.UTC
             else:
-                tz = pytz_timezone(timezone)
+                tz = get_timezone(timezone)
             
             self.logger.info(f"Using timezone object: {tz}")
             
@@ -227,18 +250,9 @@ class SchedulerManager:
                 if cron_expr:
                     parts = cron_expr.split()
                     if len(parts) == 6:
-                        trigger_kwargs = {
-                            'second': parts[0], 
-                            'minute': parts[1], 
-                            'hour': parts[2],
-                            'day': parts[3], 
-                            'month': parts[4], 
-                            'day_of_week': parts[5],
-                            'timezone': tz  # Always set timezone for precise scheduling
-                        }
-                        
-                        self.logger.info(f"Creating CronTrigger with args: {trigger_kwargs}")
-                        trigger = CronTrigger(**trigger_kwargs)
+                        # Jobs with the same expression and timezone share one compiled trigger
+                        self.logger.info(f"Getting CronTrigger for '{cron_expr}' in {tz}")
+                        trigger = get_cron_trigger(cron_expr, tz.zone)
                         
                         # Log next run time for verification
                         next_run = trigger.get_next_fire_time(None, datetime.now(tz))
@@ -391,6 +405,11 @@ class SchedulerManager:
                 self.logger.error(f"Job not found during execution: {job_id}")
                 return
             
+            # A leader that could not renew its lease must not fire, a standby may already have taken over
+            if self.leader_election and not self.leader_election.is_leader():
+                self.logger.warning(f"Skipping job {job_id}: node {self.leader_election.node_id} is not the leader")
+                return
+            
             # Log timezone execution details
             schedule_config = self.job_schedules.get(job_id, {})
             job_timezone = schedule_config.get('timezone', 'UTC')
@@ -426,12 +445,13 @@ class SchedulerManager:
                         'execution_time_utc': datetime.now(pytz.UTC).strftime('%Y-%m-%d %H:%M:%S UTC'),
                         'timezone_offset': current_time.strftime('%z')
                     })
+                    if self.leader_election:
+                        result.metadata['leader_fencing_token'] = self.leader_election.fencing_token
                     
-                    self.storage.save_execution_result(result)
-                    
-                    # Also save to V2 execution history table
+                    # Save to V2 execution history table
+                    superseded = False
                     try:
-                        from database.sqlalchemy_models import get_db_session, JobExecutionHistoryV2
+                        from database.sqlalchemy_models import JobExecutionHistoryV2
                         from datetime import datetime, timezone
                         import uuid
                         
@@ -453,14 +473,16 @@ class SchedulerManager:
                             execution_timezone=job_timezone
                         )
                         
-                        with get_db_session() as session:
-                            session.add(execution_data)
-                            session.commit()
-                            
-                        self.logger.info(f"[SCHEDULER] Scheduled job execution recorded to V2 database: {execution_id}")
+                        superseded = not self._save_execution_history(execution_data)
+                        if not superseded:
+                            self.logger.info(f"[SCHEDULER] Scheduled job execution recorded to V2 database: {execution_id}")
                     except Exception as db_error:
                         self.logger.warning(f"[SCHEDULER] Failed to record scheduled execution to V2 database: {db_error}")
                     
+                    if superseded:
+                        return
+                    self.storage.save_execution_result(result)
+                    
                     if result.status == JobStatus.RETRY:
                         self._schedule_retry(job_id, job.retry_delay)
                 else:
@@ -482,11 +504,11 @@ class SchedulerManager:
                         error_message=f"Job execution crashed: {str(job_error)}",
                         duration_seconds=0
                     )
-                    self.storage.save_execution_result(failure_result)
                     
-                    # Also save failure to V2 execution history table
+                    # Save failure to V2 execution history table
+                    superseded = False
                     try:
-                        from database.sqlalchemy_models import get_db_session, JobExecutionHistoryV2
+                        from database.sqlalchemy_models import JobExecutionHistoryV2
                         from datetime import datetime, timezone
                         import uuid
                         
@@ -508,13 +530,14 @@ class SchedulerManager:
                             execution_timezone=job_timezone
                         )
                         
-                        with get_db_session() as session:
-                            session.add(execution_data)
-                            session.commit()
-                            
-                        self.logger.info(f"[SCHEDULER] Scheduled job failure recorded to V2 database: {execution_id}")
+                        superseded = not self._save_execution_history(execution_data)
+                        if not superseded:
+                            self.logger.info(f"[SCHEDULER] Scheduled job failure recorded to V2 database: {execution_id}")
                     except Exception as db_error:
                         self.logger.warning(f"[SCHEDULER] Failed to record scheduled failure to V2 database: {db_error}")
+                    
+                    if not superseded:
+                        self.storage.save_execution_result(failure_result)
                         
                 except Exception as save_error:
                     self.logger.error(f"Failed to save crash result for {job_id}: {save_error}")
@@ -523,6 +546,27 @@ class SchedulerManager:
             self.logger.exception(f"Critical error in job execution wrapper for {job_id}: {e}")
             # This should prevent the entire application from crashing
     
+    def _save_execution_history(self, execution_data) -> bool:
+        """
+        Insert a V2 execution history row, returns False if leadership has passed to a newer leader
+        
+        In high availability mode the row is only committed while our leader
+        lease still carries our fencing token, checked in the same transaction.
+        """
+        from database.sqlalchemy_models import get_db_session
+        
+        with get_db_session() as session:
+            if self.leader_election and not self.leader_election.holds_lease(session):
+                session.rollback()
+                self.logger.warning(
+                    f"[SCHEDULER] Not recording execution of {execution_data.job_id}: node "
+                    f"{self.leader_election.node_id} no longer holds the leader lease it ran under"
+                )
+                return False
+            session.add(execution_data)
+            session.commit()
+        return True
+    
     def _schedule_retry(self, job_id: str, delay_seconds: int):
         """Schedule job retry"""
         try:
@@ -541,6 +585,73 @@ class SchedulerManager:
         except Exception as e:
             self.logger.error(f"Failed to schedule retry for job {job_id}: {e}")
     
+    def _on_elected_leader(self, fencing_token: int):
+        """Pick up job changes made while standby, catch triggers up to now and start firing"""
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                synced = self._sync_jobs_from_storage()
+            except Exception as e:
+                # Firing the boot-time job set beats not firing at all
+                synced = 0
+                self.logger.error(f"Failed to sync jobs from storage on takeover: {e}")
+            caught_up = self._catch_up_standby_jobs()
+            self.scheduler.resume()
+        self.logger.info(
+            f"Took over as leader (fencing token {fencing_token}) in {time.perf_counter() - started:.3f}s, "
+            f"{synced} jobs changed in storage reloaded, {caught_up} missed fires run now"
+        )
+    
+    def _on_demoted_to_standby(self):
+        """Stop firing, another process leads now"""
+        self.scheduler.pause()
+        self._standby_since = datetime.now(pytz.UTC)
+        self.logger.warning("Scheduler paused, running as standby")
+    
+    def _catch_up_standby_jobs(self) -> int:
+        """
+        Move next run times of a paused standby's jobs to the present
+        
+        Fires up to when another leader was last seen alive (or this
+        process stepped down) were handled elsewhere and are skipped. The
+        first fire after that, if due and not older than
+        failover_grace_seconds, runs once now; a fire the old leader
+        dispatched just before dying may therefore run again. Returns the
+        number of jobs set to run now.
+        """
+        now = datetime.now(pytz.UTC)
+        handled_until = max(
+            (moment for moment in (self.leader_election.leader_last_seen, self._standby_since) if moment),
+            default=now
+        )
+        grace = float(self.ha_config.get('failover_grace_seconds', 300))
+        
+        caught_up = 0
+        for scheduled_job in self.scheduler.get_jobs():
+            if scheduled_job.next_run_time is None or scheduled_job.next_run_time > now:
+                continue
+            
+            missed = self._first_fire_at_or_after(scheduled_job.trigger, max(handled_until, scheduled_job.next_run_time))
+            if missed is not None and missed <= now and (now - missed).total_seconds() <= grace:
+                next_run_time = now
+                caught_up += 1
+            else:
+                next_run_time = self._first_fire_at_or_after(scheduled_job.trigger, now)
+            
+            if next_run_time is None:
+                self.scheduler.remove_job(scheduled_job.id)
+            else:
+                self.scheduler.modify_job(scheduled_job.id, next_run_time=next_run_time)
+        return caught_up
+    
+    @staticmethod
+    def _first_fire_at_or_after(trigger, moment: datetime) -> Optional[datetime]:
+        """First fire time of a trigger not before the given moment (None if it fires no more)"""
+        fire_time = trigger.get_next_fire_time(None, moment)
+        if fire_time is None or fire_time < moment:
+            return None
+        return fire_time
+    
     def _on_job_executed(self, event):
         """Handle job execution completion"""
         try:
@@ -576,18 +687,7 @@ class SchedulerManager:
                 for job_config in jobs_list:
                     try:
                         job_id = job_config['job_id']
-                        job = self._create_job_from_config(job_config)
-                        if job:
-                            self.jobs[job_id] = job
-                            
-                            # Check for schedule in configuration
-                            configuration = job_config.get('configuration', {})
-                            schedule_config = configuration.get('schedule')
-                            if schedule_config and job.enabled:
-                                self.schedule_job(job_id, schedule_config)
-                            
-                            self.logger.info(f"Loaded job from database: {job.name} ({job_id})")
-                        
+                        self._load_database_job(job_id, job_config)
                     except Exception as e:
                         self.logger.error(f"Failed to load job {job_config.get('job_id', 'unknown')}: {e}")
                 
@@ -599,16 +699,7 @@ class SchedulerManager:
                 
                 for job_id, job_config in job_configs.items():
                     try:
-                        job = self._create_job_from_config(job_config)
-                        if job:
-                            self.jobs[job_id] = job
-                            
-                            schedule_config = job_config.get('schedule')
-                            if schedule_config and job.enabled:
-                                self.schedule_job(job_id, schedule_config)
-                            
-                            self.logger.info(f"Loaded job from YAML: {job.name} ({job_id})")
-                        
+                        self._load_yaml_job(job_id, job_config)
                     except Exception as e:
                         self.logger.error(f"Failed to load job {job_id}: {e}")
                 
@@ -619,6 +710,89 @@ class SchedulerManager:
         except Exception as e:
             self.logger.error(f"Failed to load jobs from storage: {e}")
     
+    def _load_database_job(self, job_id: str, job_config: Dict[str, Any]):
+        """Create and schedule a job from its database configuration"""
+        self._record_synced_version(job_id, job_config.get('modified_date'))
+        job = self._create_job_from_config(job_config)
+        if job:
+            self.jobs[job_id] = job
+            
+            # Check for schedule in configuration
+            configuration = job_config.get('configuration', {})
+            schedule_config = configuration.get('schedule')
+            if schedule_config and job.enabled:
+                self.schedule_job(job_id, schedule_config)
+            
+            self.logger.info(f"Loaded job from database: {job.name} ({job_id})")
+    
+    def _load_yaml_job(self, job_id: str, job_config: Dict[str, Any]):
+        """Create and schedule a job from its YAML storage configuration"""
+        self._synced_versions[job_id] = copy.deepcopy(job_config)
+        job = self._create_job_from_config(job_config)
+        if job:
+            self.jobs[job_id] = job
+            
+            schedule_config = job_config.get('schedule')
+            if schedule_config and job.enabled:
+                self.schedule_job(job_id, schedule_config)
+            
+            self.logger.info(f"Loaded job from YAML: {job.name} ({job_id})")
+    
+    def _record_synced_version(self, job_id: str, modified_date: Optional[str]):
+        """Remember the modified_date a job was loaded at and advance the sync watermark"""
+        self._synced_versions[job_id] = modified_date
+        if modified_date:
+            modified = datetime.fromisoformat(modified_date).replace(tzinfo=None)
+            if self._sync_watermark is None or modified > self._sync_watermark:
+                self._sync_watermark = modified
+    
+    def _sync_jobs_from_storage(self) -> int:
+        """
+        Reload jobs that changed in storage since they were loaded, returns the number changed
+        
+        A standby keeps the job set it loaded at boot, so this runs before it
+        starts firing as leader. In database mode only rows modified since the
+        newest modified_date seen (less sync_overlap_seconds) are read, plus
+        the job IDs to drop deleted jobs; YAML storage is re-read and compared.
+        """
+        if self.disconnected_mode and self.job_manager:
+            since = None
+            if self._sync_watermark is not None:
+                since = self._sync_watermark - timedelta(seconds=int(self.ha_config.get('sync_overlap_seconds', 60)))
+            stored = {
+                job_config['job_id']: job_config for job_config in self.job_manager.list_jobs_modified_since(since)
+                if self._synced_versions.get(job_config['job_id'], False) != job_config.get('modified_date')
+            }
+            deleted = set(self.jobs) - set(self.job_manager.list_job_ids())
+            load = self._load_database_job
+        elif self.storage:
+            job_configs = self.storage.load_all_jobs()
+            stored = {
+                job_id: job_config for job_id, job_config in job_configs.items()
+                if self._synced_versions.get(job_id, False) != job_config
+            }
+            deleted = set(self.jobs) - set(job_configs)
+            load = self._load_yaml_job
+        else:
+            return 0
+        
+        for job_id in deleted | set(stored):
+            self._unload_job(job_id)
+        for job_id, job_config in stored.items():
+            try:
+                load(job_id, job_config)
+            except Exception as e:
+                self.logger.error(f"Failed to reload job {job_id}: {e}")
+        return len(deleted | set(stored))
+    
+    def _unload_job(self, job_id: str):
+        """Drop a job from the scheduler and registry, leaving storage untouched"""
+        if self.scheduler.get_job(job_id):
+            self.scheduler.remove_job(job_id)
+        self.jobs.pop(job_id, None)
+        self.job_schedules.pop(job_id, None)
+        self._synced_versions.pop(job_id, None)
+    
     def _create_job_from_config(self, job_config: Dict[str, Any]) -> Optional[JobBase]:
         """Create job instance from configuration"""
         job_type = job_config.get('job_type')
@@ -707,6 +881,7 @@ class SchedulerManager:
                 'disabled_jobs': len([j for j in self.jobs.values() if not j.enabled]),
                 'job_types': self._get_job_type_counts(),
                 'next_run_times': self._get_next_run_times(),
+                'high_availability': self.leader_election.get_status() if self.leader_election else None,
                 'uptime': "Available in future version"
             }
             
@@ -0,0 +1,311 @@
+"""
+Compiled cron trigger cache for the schedulers
+Shares one CronTrigger per (expression, timezone) and computes upcoming fire times for many jobs at once
+"""
+
+import calendar
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pytz
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.cron.expressions import (
+    AllExpression, MonthRangeExpression, RangeExpression, WeekdayRangeExpression
+)
+from apscheduler.triggers.cron.fields import MAX_VALUES, MIN_VALUES
+from apscheduler.util import datetime_ceil
+
+from .trigger_jitter import JitteredTrigger
+
+
+CRON_FIELD_NAMES = ('second', 'minute', 'hour', 'day', 'month', 'day_of_week')
+CRON_CACHE_SIZE = 4096
+
+# Fire times this close before a UTC offset change (more than any DST shift) are left to the trigger
+DST_MARGIN = timedelta(hours=3)
+
+# Wall-clock search steps before an unusual expression is left to the trigger
+MAX_SEARCH_STEPS = 1000
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str):
+    """Get a pytz timezone by name (raises pytz.exceptions.UnknownTimeZoneError)"""
+    if name == 'UTC':
+        return pytz.UTC
+    return pytz.timezone(name)
+
+
+def get_cron_trigger(cron_expr: str, timezone_name: str = 'UTC') -> CronTrigger:
+    """
+    Get the shared CronTrigger for a 6 part cron expression and timezone
+    
+    Triggers carry no start date, so one instance serves every job with the
+    same schedule. Expressions are normalized to single spaces before lookup.
+    
+    Raises:
+        ValueError: If the expression does not have 6 parts or a field is invalid
+    """
+    parts = cron_expr.split()
+    if len(parts) != len(CRON_FIELD_NAMES):
+        raise ValueError(f"Invalid cron expression: {cron_expr} (expected {len(CRON_FIELD_NAMES)} parts)")
+    return _build_cron_trigger(' '.join(parts), timezone_name)
+
+
+@lru_cache(maxsize=CRON_CACHE_SIZE)
+def _build_cron_trigger(cron_expr: str, timezone_name: str) -> CronTrigger:
+    trigger_kwargs = dict(zip(CRON_FIELD_NAMES, cron_expr.split()))
+    return CronTrigger(timezone=get_timezone(timezone_name), **trigger_kwargs)
+
+
+def get_trigger_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counts of the cron trigger and timezone caches"""
+    triggers = _build_cron_trigger.cache_info()
+    timezones = get_timezone.cache_info()
+    return {
+        'cron_triggers': {
+            'hits': triggers.hits, 'misses': triggers.misses,
+            'size': triggers.currsize, 'max_size': triggers.maxsize
+        },
+        'timezones': {'hits': timezones.hits, 'misses': timezones.misses, 'size': timezones.currsize},
+        'compiled_triggers': len(_compiled)
+    }
+
+
+def _next_bit(mask: int, value: int) -> Optional[int]:
+    """Get the lowest set bit of mask at or above value"""
+    rest = mask >> value
+    if not rest:
+        return None
+    return value + (rest & -rest).bit_length() - 1
+
+
+def _field_mask(field) -> Optional[int]:
+    """Get the bitmask of values a cron field matches, None if it depends on more than the value"""
+    minval = MIN_VALUES[field.name]
+    maxval = MAX_VALUES[field.name]
+    mask = 0
+    for expr in field.expressions:
+        if type(expr) is AllExpression:
+            first, last = minval, maxval
+        elif type(expr) in (RangeExpression, MonthRangeExpression, WeekdayRangeExpression):
+            first = max(expr.first, minval)
+            last = min(expr.last if expr.last is not None else maxval, maxval)
+        else:
+            # last, 1st mon, ... depend on the month being searched
+            return None
+        for value in range(first, last + 1, expr.step or 1):
+            mask |= 1 << value
+    return mask
+
+
+class CompiledCron:
+    """
+    A CronTrigger reduced to one bitmask per field
+    
+    Fire times are found by jumping to the next set bit of each field in
+    local wall-clock time instead of stepping through the trigger's field
+    objects. Searches that could be affected by a DST transition are left
+    to the trigger, so both always agree.
+    """
+    
+    __slots__ = ('timezone', 'transitions', 'months', 'days', 'weekdays', 'hours', 'minutes', 'seconds')
+    
+    def __init__(self, trigger: CronTrigger, masks: Dict[str, int]):
+        self.timezone = trigger.timezone
+        # UTC offset changes of the zone (naive UTC), none for fixed-offset zones
+        self.transitions = getattr(trigger.timezone, '_utc_transition_times', None) or []
+        self.months = masks['month']
+        self.days = masks['day']
+        self.weekdays = masks['day_of_week']
+        self.hours = masks['hour']
+        self.minutes = masks['minute']
+        self.seconds = masks['second']
+    
+    @classmethod
+    def compile(cls, trigger) -> Optional['CompiledCron']:
+        """Compile a CronTrigger, None if it uses features the bitmasks cannot express"""
+        if type(trigger) is not CronTrigger or trigger.start_date or trigger.end_date or trigger.jitter:
+            return None
+        if not hasattr(trigger.timezone, 'localize'):
+            return None
+        
+        masks = {}
+        for field in trigger.fields:
+            if field.name in ('year', 'week'):
+                if not field.is_default:
+                    return None
+                continue
+            mask = _field_mask(field)
+            if not mask:
+                return None
+            masks[field.name] = mask
+        return cls(trigger, masks)
+    
+    def get_next_fire_time(self, now: datetime) -> Optional[datetime]:
+        """
+        Get the first fire time at or after now (timezone-aware)
+        
+        Returns None when the UTC offset changes before (or shortly after)
+        the fire time, the trigger's get_next_fire_time() has to decide then.
+        """
+        start = datetime_ceil(now).astimezone(self.timezone)
+        start_local = start.replace(tzinfo=None)
+        local = self._next_wall_time(start_local)
+        if local is None:
+            return None
+        
+        offset = start.utcoffset()
+        if self.transitions:
+            # Wall times repeated after a transition are resolved by the trigger too
+            index = bisect_right(self.transitions, start_local - offset)
+            if index < len(self.transitions) and self.transitions[index] <= local - offset + DST_MARGIN:
+                return None
+        return local.replace(tzinfo=start.tzinfo)
+    
+    def _next_wall_time(self, moment: datetime) -> Optional[datetime]:
+        year, month, day = moment.year, moment.month, moment.day
+        hour, minute, second = moment.hour, moment.minute, moment.second
+        
+        for _ in range(MAX_SEARCH_STEPS):
+            next_month = _next_bit(self.months, month)
+            if next_month is None:
+                year, month, day, hour, minute, second = year + 1, 1, 1, 0, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute, second = next_month, 1, 0, 0, 0
+            
+            days_in_month = calendar.monthrange(year, month)[1]
+            next_day = _next_bit(self.days, day)
+            if next_day is None or next_day > days_in_month:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute, second = 1, 0, 0, 0
+                continue
+            if next_day != day:
+                day, hour, minute, second = next_day, 0, 0, 0
+            if not (self.weekdays >> calendar.weekday(year, month, day)) & 1:
+                day, hour, minute, second = day + 1, 0, 0, 0
+                continue
+            
+            next_hour = _next_bit(self.hours, hour)
+            if next_hour is None:
+                day, hour, minute, second = day + 1, 0, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute, second = next_hour, 0, 0
+            
+            next_minute = _next_bit(self.minutes, minute)
+            if next_minute is None:
+                hour, minute, second = hour + 1, 0, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                continue
+            if next_minute != minute:
+                minute, second = next_minute, 0
+            
+            next_second = _next_bit(self.seconds, second)
+            if next_second is None:
+                minute, second = minute + 1, 0
+                if minute > 59:
+                    hour, minute = hour + 1, 0
+                    if hour > 23:
+                        day, hour = day + 1, 0
+                continue
+            
+            return datetime(year, month, day, hour, minute, next_second)
+        
+        return None
+
+
+_compiled: 'OrderedDict[str, Optional[CompiledCron]]' = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_cron(trigger) -> Optional[CompiledCron]:
+    """Get the compiled form of a CronTrigger, cached by its schedule (repr)"""
+    if type(trigger) is not CronTrigger:
+        return None
+    key = repr(trigger)
+    with _compiled_lock:
+        if key in _compiled:
+            _compiled.move_to_end(key)
+            return _compiled[key]
+    
+    compiled = CompiledCron.compile(trigger)
+    with _compiled_lock:
+        _compiled[key] = compiled
+        if len(_compiled) > CRON_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def _schedule_key(trigger) -> Tuple[Hashable, ...]:
+    """Identify triggers with the same schedule, so their fire times are computed once"""
+    if isinstance(trigger, JitteredTrigger):
+        return _schedule_key(trigger.trigger) + (trigger.offset_seconds,)
+    if type(trigger) is CronTrigger:
+        # The repr lists every non-default field, the timezone, start/end date and jitter
+        return ('cron', repr(trigger))
+    return ('trigger', id(trigger))
+
+
+def _next_cron_fire_time(compiled: CompiledCron, trigger: CronTrigger, now: datetime) -> Optional[datetime]:
+    return compiled.get_next_fire_time(now) or trigger.get_next_fire_time(None, now)
+
+
+def _iter_fire_times(trigger, now: datetime, count: int, until: Optional[datetime]) -> List[datetime]:
+    if isinstance(trigger, JitteredTrigger):
+        offset = timedelta(seconds=trigger.offset_seconds)
+        return [fire_time + offset for fire_time in _iter_fire_times(
+            trigger.trigger, now - offset, count, until - offset if until else None
+        )]
+    
+    compiled = get_compiled_cron(trigger)
+    fire_times: List[datetime] = []
+    fire_time = _next_cron_fire_time(compiled, trigger, now) if compiled else trigger.get_next_fire_time(None, now)
+    while fire_time is not None and len(fire_times) < count:
+        if until and fire_time >= until:
+            break
+        if fire_time >= now:
+            fire_times.append(fire_time)
+        if compiled:
+            fire_time = _next_cron_fire_time(compiled, trigger, fire_time + timedelta(seconds=1))
+        else:
+            next_time = trigger.get_next_fire_time(fire_time, fire_time)
+            fire_time = next_time if next_time is None or next_time > fire_time else None
+    return fire_times
+
+
+def compute_next_fire_times(triggers: Iterable[Tuple[Any, Any]], now: datetime, count: int = 1,
+                            until: Optional[datetime] = None) -> Dict[Any, List[datetime]]:
+    """
+    Compute the next fire times of many jobs at once
+    
+    Jobs sharing a schedule (same cron expression, timezone and jitter offset)
+    are computed once, and cron triggers are evaluated with their compiled
+    bitmasks.
+    
+    Args:
+        triggers: (key, trigger) pairs, e.g. (job_id, job.trigger)
+        now: Start of the search (timezone-aware)
+        count: Maximum fire times per job
+        until: Optional exclusive end of the search
+    
+    Returns:
+        Dict of key -> ascending fire times (aware, in each trigger's timezone)
+    """
+    results: Dict[Any, List[datetime]] = {}
+    computed: Dict[Tuple[Hashable, ...], Tuple[Any, List[datetime]]] = {}
+    
+    for key, trigger in triggers:
+        schedule_key = _schedule_key(trigger)
+        if schedule_key not in computed:
+            # Keep the trigger referenced so id() based keys stay unique
+            computed[schedule_key] = (trigger, _iter_fire_times(trigger, now, count, until))
+        results[key] = computed[schedule_key][1]
+    
+    return results
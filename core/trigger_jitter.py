@@ -0,0 +1,128 @@
+"""
+Deterministic start jitter for APScheduler triggers
+Spreads jobs that share a cron boundary across a window using an offset hashed from the job ID
+"""
+
+import hashlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from apscheduler.triggers.base import BaseTrigger
+
+
+def get_jitter_offset(job_id: str, window_seconds: int) -> int:
+    """
+    Get a job's offset within its jitter window
+    
+    Uses a SHA-256 of the job ID rather than hash(), which is salted per
+    process, so the offset is the same on every run and every node.
+    """
+    if not window_seconds or window_seconds <= 0:
+        return 0
+    digest = hashlib.sha256(str(job_id).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % int(window_seconds)
+
+
+class JitteredTrigger(BaseTrigger):
+    """Wraps a trigger and shifts every fire time by a fixed per-job offset"""
+    
+    def __init__(self, trigger: BaseTrigger, offset_seconds: int, window_seconds: int):
+        self.trigger = trigger
+        self.offset_seconds = offset_seconds
+        self.window_seconds = window_seconds
+        self._offset = timedelta(seconds=offset_seconds)
+    
+    def get_next_fire_time(self, previous_fire_time, now):
+        """Get the wrapped trigger's next fire time, evaluated in unshifted time, plus the offset"""
+        previous_base = previous_fire_time - self._offset if previous_fire_time else None
+        next_base = self.trigger.get_next_fire_time(previous_base, now - self._offset)
+        return next_base + self._offset if next_base else None
+    
+    def __getstate__(self):
+        return {
+            'trigger': self.trigger,
+            'offset_seconds': self.offset_seconds,
+            'window_seconds': self.window_seconds
+        }
+    
+    def __setstate__(self, state):
+        self.__init__(state['trigger'], state['offset_seconds'], state['window_seconds'])
+    
+    def __str__(self):
+        return f"{self.trigger} +{self.offset_seconds}s jitter"
+    
+    def __repr__(self):
+        return f"<JitteredTrigger ({self.trigger!r}, offset={self.offset_seconds}s, window={self.window_seconds}s)>"
+
+
+def apply_jitter(job_id: str, trigger: BaseTrigger, window_seconds: Optional[int]) -> BaseTrigger:
+    """Wrap a trigger with the job's deterministic offset (unchanged if the window is empty)"""
+    offset = get_jitter_offset(job_id, window_seconds or 0)
+    if not offset:
+        return trigger
+    return JitteredTrigger(trigger, offset, int(window_seconds))
+
+
+def build_fire_density_report(triggers: Iterable[Any], now: datetime, horizon_seconds: int = 3600,
+                              top: int = 10, max_fires_per_job: int = 10000) -> Dict[str, Any]:
+    """
+    Count fires per second over the horizon with and without jitter
+    
+    Args:
+        triggers: (job_id, trigger) pairs
+        now: Start of the horizon (timezone-aware)
+        horizon_seconds: Length of the horizon
+        top: Number of busiest seconds to list
+        max_fires_per_job: Cap on fire times computed for a single job
+    
+    Returns:
+        Dict with 'before' and 'after' density summaries
+    """
+    end = now + timedelta(seconds=horizon_seconds)
+    before: Counter = Counter()
+    after: Counter = Counter()
+    jobs = 0
+    jittered_jobs = 0
+    
+    for _, trigger in triggers:
+        jobs += 1
+        base_trigger = trigger.trigger if isinstance(trigger, JitteredTrigger) else trigger
+        offset = timedelta(seconds=trigger.offset_seconds) if isinstance(trigger, JitteredTrigger) else timedelta(0)
+        if offset:
+            jittered_jobs += 1
+        
+        # Start early enough that fires shifted into the horizon are counted too
+        fire_time = base_trigger.get_next_fire_time(None, now - offset)
+        for _ in range(max_fires_per_job):
+            if fire_time is None or fire_time >= end:
+                break
+            if fire_time >= now:
+                before[int(fire_time.timestamp())] += 1
+            shifted = fire_time + offset
+            if now <= shifted < end:
+                after[int(shifted.timestamp())] += 1
+            fire_time = base_trigger.get_next_fire_time(fire_time, fire_time)
+    
+    return {
+        "horizon_seconds": horizon_seconds,
+        "start_time": now.isoformat(),
+        "jobs": jobs,
+        "jittered_jobs": jittered_jobs,
+        "before": _summarize_density(before, top),
+        "after": _summarize_density(after, top)
+    }
+
+
+def _summarize_density(counts: Counter, top: int) -> Dict[str, Any]:
+    """Summarize a per-second fire histogram"""
+    busiest: List[Dict[str, Any]] = [
+        {"second": datetime.utcfromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S UTC'), "fires": fires}
+        for second, fires in counts.most_common(top)
+    ]
+    return {
+        "total_fires": sum(counts.values()),
+        "active_seconds": len(counts),
+        "max_fires_per_second": max(counts.values()) if counts else 0,
+        "busiest_seconds": busiest
+    }
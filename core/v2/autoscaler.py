@@ -0,0 +1,217 @@
+"""
+Adaptive worker autoscaling for Job Scheduler V2
+Grows and shrinks timezone queue workers and concurrency from backlog, wait times and host headroom
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from .engine_config import get_engine_config_section
+from utils.logger import get_logger
+
+
+class AdjustableSemaphore:
+    """
+    Async semaphore whose limit can change while permits are held.
+    
+    Lowering the limit never interrupts running holders; new acquirers
+    simply wait until usage drops below the new limit.
+    """
+    
+    def __init__(self, limit: int):
+        self._limit = max(limit, 1)
+        self._in_use = 0
+        self._condition = asyncio.Condition()
+    
+    @property
+    def limit(self) -> int:
+        return self._limit
+    
+    def locked(self) -> bool:
+        """Check if acquiring would wait"""
+        return self._in_use >= self._limit
+    
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < self._limit)
+            self._in_use += 1
+    
+    async def release(self):
+        async with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+    
+    async def set_limit(self, limit: int):
+        """Change the limit, waking waiters if it grew"""
+        async with self._condition:
+            self._limit = max(limit, 1)
+            self._condition.notify_all()
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+
+class QueueAutoscaler:
+    """
+    Sizes timezone queues from their load, within configured bounds.
+    
+    Each evaluation looks at a queue's due backlog and the p95 of recent
+    due-to-start wait times. A queue that is backing up gains a worker and
+    a concurrency slot while host CPU and memory are below their ceilings;
+    an idle queue, or any queue while the host is over a ceiling, gives one
+    back. A cooldown per queue keeps decisions from flapping.
+    """
+    
+    def __init__(self, enabled: bool = False, interval_seconds: float = 30.0, cooldown_seconds: float = 60.0,
+                 min_workers: int = 1, max_workers: int = 8, min_concurrent_jobs: int = 2,
+                 max_concurrent_jobs: int = 20, backlog_per_worker: int = 5,
+                 scale_up_wait_p95_seconds: float = 5.0, scale_down_wait_p95_seconds: float = 0.5,
+                 max_cpu_percent: float = 85.0, max_memory_percent: float = 85.0):
+        self.enabled = enabled
+        self.interval = interval_seconds
+        self.cooldown = cooldown_seconds
+        self.min_workers = max(min_workers, 1)
+        self.max_workers = max(max_workers, self.min_workers)
+        self.min_concurrent_jobs = max(min_concurrent_jobs, 1)
+        self.max_concurrent_jobs = max(max_concurrent_jobs, self.min_concurrent_jobs)
+        self.backlog_per_worker = max(backlog_per_worker, 1)
+        self.scale_up_wait_p95 = scale_up_wait_p95_seconds
+        self.scale_down_wait_p95 = scale_down_wait_p95_seconds
+        self.max_cpu_percent = max_cpu_percent
+        self.max_memory_percent = max_memory_percent
+        
+        self._last_scaled: Dict[str, float] = {}  # timezone -> monotonic time of its last decision
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self._scale_ups = 0
+        self._scale_downs = 0
+        self.logger = get_logger("QueueAutoscaler")
+    
+    @classmethod
+    def from_config(cls) -> "QueueAutoscaler":
+        """Create an autoscaler from the execution_v2.autoscaling configuration"""
+        config = get_engine_config_section('autoscaling')
+        return cls(
+            enabled=bool(config.get('enabled', False)),
+            interval_seconds=float(config.get('interval_seconds', 30.0)),
+            cooldown_seconds=float(config.get('cooldown_seconds', 60.0)),
+            min_workers=int(config.get('min_workers', 1)),
+            max_workers=int(config.get('max_workers', 8)),
+            min_concurrent_jobs=int(config.get('min_concurrent_jobs', 2)),
+            max_concurrent_jobs=int(config.get('max_concurrent_jobs', 20)),
+            backlog_per_worker=int(config.get('backlog_per_worker', 5)),
+            scale_up_wait_p95_seconds=float(config.get('scale_up_wait_p95_seconds', 5.0)),
+            scale_down_wait_p95_seconds=float(config.get('scale_down_wait_p95_seconds', 0.5)),
+            max_cpu_percent=float(config.get('max_cpu_percent', 85.0)),
+            max_memory_percent=float(config.get('max_memory_percent', 85.0))
+        )
+    
+    def evaluate(self, timezone_name: str, worker_count: int, max_concurrent_jobs: int, ready_backlog: int,
+                 active_executions: int, wait_p95: float, host_metrics: Dict[str, float],
+                 now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Decide a new size for one queue.
+        
+        Returns the decision (target worker count and concurrency, direction
+        and reason) or None when the queue should stay as it is.
+        """
+        now = time.monotonic() if now is None else now
+        last_scaled = self._last_scaled.get(timezone_name)
+        if last_scaled is not None and now - last_scaled < self.cooldown:
+            return None
+        
+        cpu_percent = host_metrics.get("cpu_percent", 0.0)
+        memory_percent = host_metrics.get("memory_percent", 0.0)
+        host_saturated = cpu_percent >= self.max_cpu_percent or memory_percent >= self.max_memory_percent
+        
+        direction = None
+        reason = None
+        if host_saturated:
+            direction = -1
+            reason = f"host over ceiling (cpu {cpu_percent:.0f}%, memory {memory_percent:.0f}%)"
+        elif ready_backlog > worker_count * self.backlog_per_worker:
+            direction = 1
+            reason = f"backlog {ready_backlog} exceeds {self.backlog_per_worker} per worker"
+        elif wait_p95 > self.scale_up_wait_p95 and ready_backlog > 0:
+            direction = 1
+            reason = f"wait p95 {wait_p95:.2f}s above {self.scale_up_wait_p95:.2f}s"
+        elif ready_backlog == 0 and wait_p95 <= self.scale_down_wait_p95 and active_executions < worker_count:
+            direction = -1
+            reason = f"idle (wait p95 {wait_p95:.2f}s, {active_executions} active)"
+        
+        target_workers = worker_count
+        target_concurrency = max_concurrent_jobs
+        if direction is not None:
+            target_workers += direction
+            target_concurrency += direction
+        # Sizes outside the bounds (e.g. the engine defaults) are pulled in even without load changes
+        target_workers = min(max(target_workers, self.min_workers), self.max_workers)
+        target_concurrency = min(max(target_concurrency, self.min_concurrent_jobs), self.max_concurrent_jobs)
+        
+        if target_workers == worker_count and target_concurrency == max_concurrent_jobs:
+            return None
+        if direction is None:
+            reason = "size outside configured bounds"
+        
+        self._last_scaled[timezone_name] = now
+        return {
+            "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+            "timezone": timezone_name,
+            "direction": "up" if target_workers + target_concurrency > worker_count + max_concurrent_jobs else "down",
+            "reason": reason,
+            "workers": (worker_count, target_workers),
+            "max_concurrent_jobs": (max_concurrent_jobs, target_concurrency),
+            "ready_backlog": ready_backlog,
+            "active_executions": active_executions,
+            "wait_p95": wait_p95,
+            "cpu_percent": cpu_percent,
+            "memory_percent": memory_percent
+        }
+    
+    async def autoscale(self, queues: Dict[str, Any], host_metrics: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Evaluate and resize the given running queues, returns the decisions taken"""
+        decisions = []
+        for timezone_name, queue in queues.items():
+            decision = self.evaluate(
+                timezone_name,
+                worker_count=queue.worker_count,
+                max_concurrent_jobs=queue.max_concurrent_jobs,
+                ready_backlog=queue.get_ready_backlog(),
+                active_executions=len(queue.get_active_jobs()),
+                wait_p95=queue.get_wait_percentiles().get("p95", 0.0),
+                host_metrics=host_metrics
+            )
+            if decision is None:
+                continue
+            
+            await queue.resize(decision["workers"][1], decision["max_concurrent_jobs"][1])
+            if decision["direction"] == "up":
+                self._scale_ups += 1
+            else:
+                self._scale_downs += 1
+            self._decisions.append(decision)
+            decisions.append(decision)
+            self.logger.info(
+                f"Scaled queue {timezone_name} {decision['direction']}: "
+                f"workers {decision['workers'][0]} -> {decision['workers'][1]}, "
+                f"max concurrent {decision['max_concurrent_jobs'][0]} -> {decision['max_concurrent_jobs'][1]} "
+                f"({decision['reason']})"
+            )
+        return decisions
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get autoscaling settings and recent decisions"""
+        return {
+            "enabled": self.enabled,
+            "workers": (self.min_workers, self.max_workers),
+            "max_concurrent_jobs": (self.min_concurrent_jobs, self.max_concurrent_jobs),
+            "scale_ups": self._scale_ups,
+            "scale_downs": self._scale_downs,
+            "recent_decisions": list(self._decisions)[-10:]
+        }
@@ -0,0 +1,89 @@
+"""
+Cooperative cancellation for Job Scheduler V2
+Cancellation tokens are shared between a queue and the steps of a single execution
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional
+
+from utils.logger import get_logger
+
+
+class CancellationToken:
+    """Cancellation signal for one job execution, passed to steps via ExecutionContext"""
+    
+    def __init__(self):
+        self._event = asyncio.Event()
+        self._callbacks: List[Callable[[], Any]] = []
+        self.reason: Optional[str] = None
+        self.logger = get_logger("CancellationToken")
+    
+    def cancel(self, reason: str = "Execution cancelled") -> bool:
+        """
+        Signal cancellation and run registered callbacks
+        
+        Returns:
+            False if the token was already cancelled
+        """
+        if self._event.is_set():
+            return False
+        
+        self.reason = reason
+        self._event.set()
+        
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run_callback(callback)
+        return True
+    
+    def is_cancelled(self) -> bool:
+        """Check if cancellation has been requested"""
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """Raise CancelledError if cancellation has been requested"""
+        if self._event.is_set():
+            raise asyncio.CancelledError(self.reason)
+    
+    async def wait(self):
+        """Wait until cancellation is requested"""
+        await self._event.wait()
+    
+    def add_callback(self, callback: Callable[[], Any]):
+        """Register a callback to run on cancellation (runs immediately if already cancelled)"""
+        if self._event.is_set():
+            self._run_callback(callback)
+        else:
+            self._callbacks.append(callback)
+    
+    def remove_callback(self, callback: Callable[[], Any]):
+        """Unregister a previously added callback"""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+    
+    def kill_process_on_cancel(self, process: Any) -> Callable[[], Any]:
+        """
+        Kill a subprocess when cancellation is requested
+        
+        Args:
+            process: asyncio.subprocess.Process or subprocess.Popen instance
+        
+        Returns:
+            The registered callback, pass it to remove_callback once the process has exited
+        """
+        def kill_process():
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass  # Process already exited
+        
+        self.add_callback(kill_process)
+        return kill_process
+    
+    def _run_callback(self, callback: Callable[[], Any]):
+        """Run a cancellation callback without letting it break cancellation"""
+        try:
+            callback()
+        except Exception as e:
+            self.logger.error(f"Cancellation callback error: {str(e)}")
@@ -0,0 +1,171 @@
+"""
+Concurrency keys for Job Scheduler V2
+Named limits (e.g. "connection:warehouse" or "job:nightly-load") enforced across all timezone queues
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .engine_config import get_engine_config_section
+from utils.logger import get_logger
+
+
+def get_job_concurrency_keys(job: Any) -> Dict[str, int]:
+    """
+    Get the concurrency keys a job declares, mapped to their limits
+    
+    Keys come from the concurrency_keys entry of the job metadata (YAML), as a
+    list of names (limit 1), a list of {key, limit} mappings or a {key: limit}
+    mapping. max_instances adds the key job:<job_id> with that limit.
+    """
+    metadata = getattr(job, 'metadata', None) or {}
+    declared = metadata.get('concurrency_keys') or []
+    keys: Dict[str, int] = {}
+    
+    if isinstance(declared, dict):
+        declared = [{'key': key, 'limit': limit} for key, limit in declared.items()]
+    elif isinstance(declared, str):
+        declared = [declared]
+    
+    for entry in declared:
+        if isinstance(entry, str):
+            keys[entry] = 1
+        elif isinstance(entry, dict) and (entry.get('key') or entry.get('name')):
+            keys[str(entry.get('key') or entry.get('name'))] = max(1, int(entry.get('limit', 1)))
+    
+    max_instances = metadata.get('max_instances')
+    if max_instances:
+        keys[f"job:{job.job_id}"] = max(1, int(max_instances))
+    
+    return keys
+
+
+class ConcurrencyKeyManager:
+    """
+    Engine-wide holder of concurrency key slots.
+    
+    An execution acquires all of its keys at once or none of them, so a job
+    never sits on one key while waiting for another. Limits configured under
+    execution_v2.concurrency_keys override the limit declared by the job.
+    """
+    
+    def __init__(self, configured_limits: Optional[Dict[str, int]] = None):
+        self.configured_limits = {key: max(1, int(limit)) for key, limit in (configured_limits or {}).items()}
+        
+        self._limits: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+        self._holders: Dict[str, List[str]] = {}  # execution_id -> keys held
+        self._release_listeners: List[Callable[[List[str]], None]] = []
+        self.logger = get_logger("ConcurrencyKeyManager")
+        
+        # Metrics
+        self._created_time = time.monotonic()
+        self._peak_in_use: Dict[str, int] = {}
+        self._acquired: Dict[str, int] = {}
+        self._blocked: Dict[str, int] = {}
+        self._busy_slot_seconds: Dict[str, float] = {}  # Integral of in_use over time
+        self._last_change: Dict[str, float] = {}
+    
+    def get_limit(self, key: str, declared_limit: int = 1) -> int:
+        """Get the effective limit of a key"""
+        return self.configured_limits.get(key, declared_limit)
+    
+    def get_available(self, key: str) -> int:
+        """Get number of free slots of a key"""
+        return max(self._limits.get(key, 1) - self._in_use.get(key, 0), 0)
+    
+    def try_acquire(self, execution_id: str, keys: Dict[str, int]) -> Optional[str]:
+        """
+        Acquire all keys for an execution
+        
+        Args:
+            execution_id: Execution that will hold the keys
+            keys: Key name -> limit declared by the job
+        
+        Returns:
+            None if the keys were acquired, otherwise the first key that is full
+        """
+        for key, declared_limit in keys.items():
+            self._limits[key] = self.get_limit(key, declared_limit)
+            if self._in_use.get(key, 0) >= self._limits[key]:
+                self._blocked[key] = self._blocked.get(key, 0) + 1
+                return key
+        
+        now = time.monotonic()
+        for key in keys:
+            self._accumulate(key, now)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+            self._acquired[key] = self._acquired.get(key, 0) + 1
+            self._peak_in_use[key] = max(self._peak_in_use.get(key, 0), self._in_use[key])
+        self._holders[execution_id] = list(keys)
+        return None
+    
+    def release(self, execution_id: str) -> List[str]:
+        """Release the keys held by an execution and notify listeners, returns the released keys"""
+        keys = self._holders.pop(execution_id, None)
+        if not keys:
+            return []
+        
+        now = time.monotonic()
+        for key in keys:
+            self._accumulate(key, now)
+            self._in_use[key] = max(self._in_use.get(key, 0) - 1, 0)
+        
+        for listener in list(self._release_listeners):
+            try:
+                listener(keys)
+            except Exception as e:
+                self.logger.error(f"Concurrency key release listener error: {str(e)}")
+        return keys
+    
+    def add_release_listener(self, listener: Callable[[List[str]], None]):
+        """Register a callback run with the released keys whenever an execution releases them"""
+        if listener not in self._release_listeners:
+            self._release_listeners.append(listener)
+    
+    def remove_release_listener(self, listener: Callable[[List[str]], None]):
+        """Unregister a release callback"""
+        if listener in self._release_listeners:
+            self._release_listeners.remove(listener)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-key utilisation statistics"""
+        now = time.monotonic()
+        stats = {}
+        for key, limit in self._limits.items():
+            self._accumulate(key, now)
+            elapsed = now - self._created_time
+            stats[key] = {
+                "limit": limit,
+                "in_use": self._in_use.get(key, 0),
+                "peak_in_use": self._peak_in_use.get(key, 0),
+                "acquired": self._acquired.get(key, 0),
+                "blocked": self._blocked.get(key, 0),
+                "utilisation": self._in_use.get(key, 0) / limit,
+                "average_utilisation": self._busy_slot_seconds.get(key, 0.0) / (limit * elapsed) if elapsed > 0 else 0.0
+            }
+        return stats
+    
+    def _accumulate(self, key: str, now: float):
+        """Add slot-seconds used since the last change of a key"""
+        last_change = self._last_change.get(key, self._created_time)
+        self._busy_slot_seconds[key] = self._busy_slot_seconds.get(key, 0.0) + self._in_use.get(key, 0) * (now - last_change)
+        self._last_change[key] = now
+
+
+# Global concurrency key manager instance
+_manager_instance: Optional[ConcurrencyKeyManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_concurrency_key_manager() -> ConcurrencyKeyManager:
+    """Get the global concurrency key manager (singleton, limits from config.yaml)"""
+    global _manager_instance
+    
+    if _manager_instance is None:
+        with _manager_lock:
+            if _manager_instance is None:
+                _manager_instance = ConcurrencyKeyManager(get_engine_config_section('concurrency_keys'))
+    
+    return _manager_instance
@@ -0,0 +1,47 @@
+"""
+Configuration loading for Job Scheduler V2
+Reads the execution_v2 section of config/config.yaml
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from utils.logger import get_logger
+
+
+_config_cache: Optional[Dict[str, Any]] = None
+_config_lock = threading.Lock()
+
+
+def get_engine_config() -> Dict[str, Any]:
+    """Get the execution_v2 configuration section (empty dict if missing or unreadable)"""
+    global _config_cache
+    
+    if _config_cache is None:
+        with _config_lock:
+            if _config_cache is None:
+                _config_cache = _load_engine_config()
+    
+    return _config_cache
+
+
+def get_engine_config_section(name: str) -> Dict[str, Any]:
+    """Get a sub-section of the execution_v2 configuration"""
+    return get_engine_config().get(name) or {}
+
+
+def _load_engine_config() -> Dict[str, Any]:
+    """Load execution_v2 configuration from config file"""
+    config_path = Path("config/config.yaml")
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f) or {}
+                return config.get('execution_v2') or {}
+        except Exception as e:
+            get_logger("EngineConfig").warning(f"Could not load execution_v2 configuration: {str(e)}")
+    
+    return {}
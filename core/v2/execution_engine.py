@@ -5,17 +5,23 @@ Coordinates timezone queues, manages job execution, and provides central control
 
 import asyncio
 import threading
-from datetime import datetime, timezone as dt_timezone, timedelta
-from typing import Dict, List, Optional, Any, Set
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List, Optional, Any, Set, Callable
 from pathlib import Path
 from enum import Enum
-import json
-import uuid
 
-from .data_models import JobDefinition, JobExecutionResult, JobStatus, ExecutionContext, create_job_from_legacy
-from .timezone_queue import TimezoneJobQueue, QueueStatus
+from .data_models import JobDefinition, JobExecutionResult, ExecutionContext, create_job_from_legacy
+from .timezone_queue import TimezoneJobQueue, QueueStatus, QueuedJob
 from .timezone_logger import get_timezone_logger, get_performance_logger, get_audit_logger
 from .step_framework import StepFactory
+from .execution_history_writer import get_execution_history_writer
+from .executors import ExecutorCategory, LoopLagMonitor, get_executor_pool, get_host_metrics, get_process_metrics
+from .queue_journal import QueueJournal
+from .concurrency_keys import get_concurrency_key_manager
+from .autoscaler import QueueAutoscaler
+from .latency_metrics import LatencyMetrics
+from .engine_config import get_engine_config_section
+from ..rate_limiter import get_dispatch_rate_limiter
 from utils.logger import get_logger
 
 
@@ -33,8 +39,12 @@ class ModernExecutionEngine:
     Central execution engine that manages timezone queues and job coordination
     """
     
-    def __init__(self, default_max_concurrent_jobs: int = 5):
+    def __init__(self, default_max_concurrent_jobs: int = 5, shared_worker_count: int = 4,
+                 timezone_filter: Optional[Callable[[str], bool]] = None):
         self.default_max_concurrent_jobs = default_max_concurrent_jobs
+        self.shared_worker_count = shared_worker_count
+        # Limits the default and journaled queues created at start to timezones this engine owns (shards)
+        self.timezone_filter = timezone_filter
         self.status = ExecutionEngineStatus.STOPPED
         
         # Timezone queue management
@@ -45,6 +55,17 @@ class ModernExecutionEngine:
         self._engine_task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
         
+        # Shared worker pool that steals due work from the most backlogged queue
+        self._shared_workers: List[asyncio.Task] = []
+        self._work_signal = asyncio.Event()
+        self._stolen_jobs = 0
+        
+        # Event loop lag probe, shows when blocking work slips onto the loop
+        self._loop_lag_monitor = LoopLagMonitor.from_config()
+        
+        # Resizes timezone queues from backlog, wait times and host headroom (execution_v2.autoscaling)
+        self._autoscaler = QueueAutoscaler.from_config()
+        
         # Logging
         self.logger = get_logger("ModernExecutionEngine")
         self.performance_logger = get_performance_logger()
@@ -70,13 +91,21 @@ class ModernExecutionEngine:
         self._engine_start_time = datetime.now(dt_timezone.utc)
         
         try:
-            # Create default timezone queues
-            for tz_name in self._default_timezones:
-                await self._ensure_timezone_queue(tz_name)
+            # Create default timezone queues, plus any queue with journaled jobs to restore
+            for tz_name in dict.fromkeys(self._default_timezones + QueueJournal.list_journaled_timezones()):
+                if self.timezone_filter is None or self.timezone_filter(tz_name):
+                    await self._ensure_timezone_queue(tz_name)
             
             # Start monitoring task
             self._engine_task = asyncio.create_task(self._engine_monitor_loop())
             
+            # Start shared workers
+            for i in range(self.shared_worker_count):
+                self._shared_workers.append(asyncio.create_task(self._shared_worker_loop(i)))
+            
+            # Start loop lag probe
+            self._loop_lag_monitor.start()
+            
             self.status = ExecutionEngineStatus.RUNNING
             self.logger.info("Modern Execution Engine started successfully")
             
@@ -101,6 +130,12 @@ class ModernExecutionEngine:
             if self._engine_task and not self._engine_task.done():
                 await self._engine_task
             
+            # Stop shared workers
+            self._work_signal.set()
+            if self._shared_workers:
+                await asyncio.gather(*self._shared_workers, return_exceptions=True)
+                self._shared_workers.clear()
+            
             # Stop all timezone queues
             async with self._queue_lock:
                 stop_tasks = [queue.stop() for queue in self._timezone_queues.values()]
@@ -109,6 +144,13 @@ class ModernExecutionEngine:
                 
                 self._timezone_queues.clear()
             
+            # Write remaining execution history and stop the writer thread
+            await get_execution_history_writer().stop()
+            
+            # Stop loop lag probe and release executor threads
+            await self._loop_lag_monitor.stop()
+            get_executor_pool().shutdown(wait=False)
+            
             self.status = ExecutionEngineStatus.STOPPED
             self.logger.info("Modern Execution Engine stopped")
             
@@ -130,6 +172,7 @@ class ModernExecutionEngine:
                     max_concurrent_jobs=max_concurrent_jobs or self.default_max_concurrent_jobs
                 )
                 
+                queue.work_available_callback = self._work_signal.set
                 self._timezone_queues[timezone_name] = queue
                 
                 # Start the queue
@@ -166,11 +209,8 @@ class ModernExecutionEngine:
         if scheduled_time is None:
             scheduled_time = datetime.now(dt_timezone.utc)
         
-        # Add job to queue
-        await queue.add_job(job, scheduled_time, priority)
-        
-        # Generate execution ID for tracking
-        execution_id = f"exec_{scheduled_time.strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        # Add job to queue, the queue assigns the execution ID used for tracking and cancellation
+        execution_id = await queue.add_job(job, scheduled_time, priority)
         
         # Log scheduling
         self.logger.info(f"Job scheduled: {job.job_name} ({job.job_id}) in {job.timezone} for {scheduled_time}")
@@ -189,13 +229,15 @@ class ModernExecutionEngine:
         
         return execution_id
     
-    async def execute_job_immediately(self, job: JobDefinition, priority: int = 10) -> JobExecutionResult:
+    async def execute_job_immediately(self, job: JobDefinition, priority: int = 10,
+                                      timeout: Optional[float] = None) -> JobExecutionResult:
         """
         Execute a job immediately and return the result
         
         Args:
             job: Job definition
             priority: Job priority (higher for immediate execution)
+            timeout: Seconds to wait for completion (defaults to the job timeout plus a 60 second buffer)
             
         Returns:
             Job execution result
@@ -213,90 +255,82 @@ class ModernExecutionEngine:
         
         # Schedule for immediate execution with high priority
         immediate_time = datetime.now(dt_timezone.utc)
-        await queue.add_job(job, immediate_time, priority)
-        
-        # Wait for actual job completion using queue's job tracking
-        execution_timeout = job.timeout_seconds + 60  # Add buffer
-        start_wait_time = datetime.now(dt_timezone.utc)
+        execution_id = await queue.add_job(job, immediate_time, priority)
         
-        # Track the job by monitoring the queue for completion
-        while True:
-            # Check if we've exceeded timeout
-            if (datetime.now(dt_timezone.utc) - start_wait_time).total_seconds() > execution_timeout:
-                raise TimeoutError(f"Job execution timed out after {execution_timeout} seconds")
-            
-            # Get queue status to check if job completed
-            queue_status = queue.get_queue_status()
-            active_jobs = queue.get_active_jobs()
-            
-            # Check if our job is still in the queue or being processed
-            job_still_running = any(active_job.get('job_id') == job.job_id for active_job in active_jobs)
-            queue_not_empty = queue_status.get('queue_size', 0) > 0
-            
-            if not job_still_running and not queue_not_empty:
-                # Job should be completed, wait a moment for database save to complete
-                await asyncio.sleep(1)
-                break
-            
-            await asyncio.sleep(0.5)  # Check every half second
-        
-        # Try to get the actual execution result from the database
+        # Await the execution's completion future instead of polling the queue
+        execution_timeout = timeout if timeout is not None else job.timeout_seconds + 60  # Add buffer
         try:
-            from database.sqlalchemy_models import JobExecutionHistory, get_db_session
-            
-            # Look for the most recent execution of this job
-            with get_db_session() as session:
-                recent_execution = session.query(JobExecutionHistory).filter(
-                    JobExecutionHistory.job_id == job.job_id,
-                    JobExecutionHistory.start_time >= immediate_time - timedelta(seconds=5)
-                ).order_by(JobExecutionHistory.start_time.desc()).first()
-                
-                if recent_execution:
-                    # Convert database record back to JobExecutionResult
-                    result = JobExecutionResult(
-                        execution_id=recent_execution.execution_metadata and 
-                                   json.loads(recent_execution.execution_metadata).get('execution_id', 'unknown'),
-                        job_id=job.job_id,
-                        job_name=job.job_name,
-                        status=JobStatus(recent_execution.status.lower()),
-                        timezone=job.timezone,
-                        start_time=recent_execution.start_time.replace(tzinfo=dt_timezone.utc),
-                        end_time=recent_execution.end_time.replace(tzinfo=dt_timezone.utc) if recent_execution.end_time else None
-                    )
-                    result.duration_seconds = recent_execution.duration_seconds
-                    result.error_message = recent_execution.error_message
-                    
-                    self.logger.info(f"Immediate job executed: {job.job_name} ({job.job_id}) - Status: {result.status.value}")
-                    self._total_jobs_executed += 1
-                    
-                    return result
-        
-        except Exception as e:
-            self.logger.warning(f"Could not retrieve actual execution result: {e}")
-        
-        # Fallback: create a result based on queue completion status
-        execution_id = f"exec_{immediate_time.strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
-        
-        result = JobExecutionResult(
-            execution_id=execution_id,
-            job_id=job.job_id,
-            job_name=job.job_name,
-            status=JobStatus.SUCCESS,  # Assume success if queue completed without errors
-            timezone=job.timezone,
-            start_time=immediate_time,
-            end_time=datetime.now(dt_timezone.utc)
-        )
+            result = await queue.wait_for_job(execution_id, execution_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Job execution timed out after {execution_timeout} seconds")
         
-        self.logger.info(f"Immediate job executed (fallback): {job.job_name} ({job.job_id})")
+        self.logger.info(f"Immediate job executed: {job.job_name} ({job.job_id}) - Status: {result.status.value}")
         self._total_jobs_executed += 1
         
         return result
     
+    async def _shared_worker_loop(self, worker_id: int):
+        """Shared worker that steals due jobs from the most backlogged timezone queue"""
+        worker_name = f"shared-{worker_id}"
+        self.logger.info(f"Shared worker {worker_name} started")
+        
+        while not self._stop_event.is_set():
+            try:
+                # Clear before looking for work so a signal raised meanwhile is not lost
+                self._work_signal.clear()
+                
+                queue = self._select_steal_target()
+                queued_job = await queue.steal_ready_job() if queue else None
+                
+                if queued_job is not None:
+                    self._stolen_jobs += 1
+                    await queue.run_job(queued_job, worker_name)
+                    continue
+                
+                # Sleep until new work is signalled or the next queued job becomes due
+                try:
+                    await asyncio.wait_for(self._work_signal.wait(), self._seconds_until_next_due())
+                except asyncio.TimeoutError:
+                    pass
+                
+            except Exception as e:
+                self.logger.error(f"Shared worker {worker_name} error: {str(e)}")
+                await asyncio.sleep(5)
+        
+        self.logger.info(f"Shared worker {worker_name} stopped")
+    
+    def _select_steal_target(self) -> Optional[TimezoneJobQueue]:
+        """Pick the queue with the largest due backlog that still has spare concurrency"""
+        target = None
+        target_backlog = 0
+        
+        for queue in list(self._timezone_queues.values()):
+            if not queue.has_free_capacity():
+                continue
+            backlog = queue.get_ready_backlog()
+            if backlog > target_backlog:
+                target, target_backlog = queue, backlog
+        
+        return target
+    
+    def _seconds_until_next_due(self) -> Optional[float]:
+        """Get seconds until the earliest waiting job in a queue with spare concurrency becomes due"""
+        # Saturated queues signal the shared workers themselves when a slot frees up
+        delays = [
+            delay for delay in (
+                queue.seconds_until_next_due()
+                for queue in list(self._timezone_queues.values()) if queue.has_free_capacity()
+            )
+            if delay is not None
+        ]
+        return min(delays) if delays else None
+    
     async def _engine_monitor_loop(self):
         """Engine monitoring and maintenance loop"""
         self.logger.info("Engine monitor started")
         
         last_metrics_time = datetime.now(dt_timezone.utc)
+        monitor_interval = min(30, self._autoscaler.interval) if self._autoscaler.enabled else 30
         
         while not self._stop_event.is_set():
             try:
@@ -310,8 +344,15 @@ class ModernExecutionEngine:
                 # Check queue health
                 await self._check_queue_health()
                 
-                # Sleep for 30 seconds
-                await asyncio.sleep(30)
+                # Grow or shrink queues to their load
+                if self._autoscaler.enabled:
+                    await self._autoscale_queues()
+                
+                # Sleep until the next check
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), monitor_interval)
+                except asyncio.TimeoutError:
+                    pass
                 
             except Exception as e:
                 self.logger.error(f"Engine monitor error: {str(e)}")
@@ -338,6 +379,20 @@ class ModernExecutionEngine:
             if unhealthy_queues:
                 self.logger.error(f"Unhealthy queues detected: {', '.join(unhealthy_queues)}")
     
+    async def _autoscale_queues(self):
+        """Resize running timezone queues and record every scaling decision in the performance log"""
+        host_metrics = await get_executor_pool().run(ExecutorCategory.IO, get_host_metrics)
+        
+        async with self._queue_lock:
+            running_queues = {
+                tz_name: queue for tz_name, queue in self._timezone_queues.items()
+                if queue.status == QueueStatus.RUNNING
+            }
+            decisions = await self._autoscaler.autoscale(running_queues, host_metrics)
+        
+        for decision in decisions:
+            self.performance_logger.log_scaling_decision(decision)
+    
     async def _log_performance_metrics(self):
         """Log overall engine performance metrics"""
         async with self._queue_lock:
@@ -368,10 +423,9 @@ class ModernExecutionEngine:
             overall_success_rate = (total_successful / total_processed * 100) if total_processed > 0 else 0
             
             # Get system metrics
-            import psutil
-            process = psutil.Process()
-            memory_usage = process.memory_info().rss // (1024 * 1024)  # MB
-            cpu_usage = process.cpu_percent()
+            process_metrics = await get_executor_pool().run(ExecutorCategory.IO, get_process_metrics)
+            memory_usage = process_metrics["memory_mb"]
+            cpu_usage = process_metrics["cpu_percent"]
             
             # Log to performance logger
             self.performance_logger.log_system_metrics(
@@ -406,10 +460,29 @@ class ModernExecutionEngine:
             "runtime_seconds": runtime,
             "timezone_queue_count": len(self._timezone_queues),
             "total_jobs_executed": self._total_jobs_executed,
+            "shared_worker_count": len([w for w in self._shared_workers if not w.done()]),
+            "stolen_jobs": self._stolen_jobs,
+            "history_writer": get_execution_history_writer().get_stats(),
+            "executors": get_executor_pool().get_stats(),
+            "loop_lag": self._loop_lag_monitor.get_stats(),
+            "autoscaling": self._autoscaler.get_stats(),
+            "latency": self.get_latency_summary(),
+            "concurrency_keys": get_concurrency_key_manager().get_stats(),
+            "rate_limits": get_dispatch_rate_limiter().get_stats(),
             "start_time": self._engine_start_time.isoformat() if self._engine_start_time else None,
             "supported_step_types": StepFactory.get_step_types()
         }
     
+    def get_latency_metrics(self) -> LatencyMetrics:
+        """Get the latency histograms of all timezone queues merged into one"""
+        return LatencyMetrics.combine(
+            queue.get_latency_metrics() for queue in self._timezone_queues.values()
+        )
+    
+    def get_latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Get p50/p95/p99 of queue wait, step duration and end-to-end latency across all timezone queues"""
+        return self.get_latency_metrics().get_summary()
+    
     def get_timezone_queue_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all timezone queues"""
         return {
@@ -424,10 +497,10 @@ class ModernExecutionEngine:
             for tz_name, queue in self._timezone_queues.items()
         }
     
-    def get_queued_jobs(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Get queued jobs across all timezone queues"""
+    def get_queued_jobs(self, limit: Optional[int] = 100) -> Dict[str, List[Dict[str, Any]]]:
+        """Get queued jobs across all timezone queues (up to limit per queue, None for all)"""
         return {
-            tz_name: queue.get_queued_jobs()
+            tz_name: queue.get_queued_jobs(limit)
             for tz_name, queue in self._timezone_queues.items()
         }
     
@@ -445,6 +518,28 @@ class ModernExecutionEngine:
         
         return False
     
+    async def wait_for_execution(self, execution_id: str, timeout: Optional[float] = None) -> JobExecutionResult:
+        """Wait for a queued or active execution in any timezone queue to finish"""
+        for queue in self._timezone_queues.values():
+            if queue.get_completion_future(execution_id) is not None:
+                return await queue.wait_for_job(execution_id, timeout)
+        
+        raise KeyError(f"Execution not found: {execution_id}")
+    
+    async def cancel_jobs_by_job_id(self, job_id: str) -> int:
+        """Cancel every queued execution of a job across all timezone queues"""
+        cancelled_count = 0
+        for queue in list(self._timezone_queues.values()):
+            cancelled_count += await queue.cancel_jobs_by_job_id(job_id)
+        return cancelled_count
+    
+    async def cancel_jobs_where(self, predicate: Callable[[QueuedJob], bool]) -> int:
+        """Cancel every queued execution matching the predicate across all timezone queues"""
+        cancelled_count = 0
+        for queue in list(self._timezone_queues.values()):
+            cancelled_count += await queue.cancel_jobs_where(predicate)
+        return cancelled_count
+    
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get comprehensive performance summary"""
         engine_status = self.get_engine_status()
@@ -511,13 +606,17 @@ _engine_lock = threading.Lock()
 
 
 def get_execution_engine() -> ModernExecutionEngine:
-    """Get the global execution engine instance (singleton)"""
+    """Get the global execution engine instance (singleton, a sharded coordinator if execution_v2.sharding is enabled)"""
     global _engine_instance
     
     if _engine_instance is None:
         with _engine_lock:
             if _engine_instance is None:
-                _engine_instance = ModernExecutionEngine()
+                if get_engine_config_section('sharding').get('enabled', False):
+                    from .sharded_engine import ShardedExecutionEngine
+                    _engine_instance = ShardedExecutionEngine.from_config()
+                else:
+                    _engine_instance = ModernExecutionEngine()
     
     return _engine_instance
 
@@ -0,0 +1,217 @@
+"""
+Write-behind execution history persistence for Job Scheduler V2
+Buffers execution records and writes them in bulk on a dedicated thread so commits never block the event loop
+"""
+
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .engine_config import get_engine_config_section
+from utils.logger import get_logger
+
+
+class _FlushRequest:
+    """Marker asking the writer thread to write everything buffered so far"""
+    
+    def __init__(self):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+
+
+_STOP = object()
+
+
+class ExecutionHistoryWriter:
+    """
+    Write-behind buffer for JobExecutionHistory rows.
+    
+    Records are flushed in one bulk insert every batch_size rows or
+    flush_interval_ms milliseconds, whichever comes first. At most
+    max_buffered_rows records are held in memory; submit() waits for the
+    writer to catch up when the buffer is full.
+    """
+    
+    def __init__(self, batch_size: int = 100, flush_interval_ms: int = 500, max_buffered_rows: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_buffered_rows = max_buffered_rows
+        
+        self._buffer: "queue.Queue[Any]" = queue.Queue()
+        self._slots: Optional[asyncio.Semaphore] = None  # Backpressure, one slot per buffered row
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        
+        self.logger = get_logger("ExecutionHistoryWriter")
+        
+        # Metrics
+        self._buffered_rows = 0
+        self._rows_written = 0
+        self._rows_failed = 0
+        self._batches_written = 0
+    
+    @classmethod
+    def from_config(cls) -> "ExecutionHistoryWriter":
+        """Create a writer from the execution_v2.history_writer configuration"""
+        config = get_engine_config_section('history_writer')
+        return cls(
+            batch_size=max(int(config.get('batch_size', 100)), 1),
+            flush_interval_ms=max(int(config.get('flush_interval_ms', 500)), 1),
+            max_buffered_rows=max(int(config.get('max_buffered_rows', 10000)), 1)
+        )
+    
+    def is_running(self) -> bool:
+        """Check if the writer thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Start the writer thread (must be called from the event loop that submits records)"""
+        if self.is_running():
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_buffered_rows)
+        self._thread = threading.Thread(target=self._writer_loop, name="ExecutionHistoryWriter", daemon=True)
+        self._thread.start()
+        
+        self.logger.info(
+            f"Execution history writer started (batch: {self.batch_size}, "
+            f"interval: {self.flush_interval * 1000:.0f}ms, max buffered: {self.max_buffered_rows})"
+        )
+    
+    async def submit(self, record: Dict[str, Any]):
+        """Buffer a JobExecutionHistory record, waits while the buffer is full"""
+        if not self.is_running():
+            self.start()
+        
+        await self._slots.acquire()
+        self._buffered_rows += 1
+        self._buffer.put(record)
+    
+    async def flush(self):
+        """Wait until every record submitted so far has been written"""
+        if not self.is_running():
+            return
+        
+        request = _FlushRequest()
+        self._buffer.put(request)
+        await asyncio.wrap_future(request.future)
+    
+    async def stop(self):
+        """Write all buffered records and stop the writer thread"""
+        if not self.is_running():
+            return
+        
+        thread = self._thread
+        self._buffer.put(_STOP)
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        self._thread = None
+        
+        self.logger.info(f"Execution history writer stopped ({self._rows_written} rows written)")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics"""
+        return {
+            "running": self.is_running(),
+            "buffered_rows": self._buffered_rows,
+            "rows_written": self._rows_written,
+            "rows_failed": self._rows_failed,
+            "batches_written": self._batches_written
+        }
+    
+    def _writer_loop(self):
+        """Collect records into batches and write them (runs on the writer thread)"""
+        batch: List[Dict[str, Any]] = []
+        deadline = 0.0
+        
+        # A full buffer always triggers a write so submitters waiting on backpressure are released
+        batch_limit = max(1, min(self.batch_size, self.max_buffered_rows))
+        
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0) if batch else None
+            try:
+                item = self._buffer.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            flush_requests = []
+            stopping = item is _STOP
+            if isinstance(item, _FlushRequest):
+                flush_requests.append(item)
+            elif item is not None and not stopping:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            
+            should_write = (
+                item is None or stopping or flush_requests
+                or len(batch) >= batch_limit or time.monotonic() >= deadline
+            )
+            if batch and should_write:
+                self._write_batch(batch)
+                batch = []
+            
+            for request in flush_requests:
+                request.future.set_result(None)
+            
+            if stopping:
+                break
+    
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Bulk insert a batch, falling back to row-by-row inserts to isolate bad records"""
+        try:
+            from database.sqlalchemy_models import JobExecutionHistory, get_db_session
+            
+            try:
+                with get_db_session() as session:
+                    session.add_all([JobExecutionHistory(**record) for record in batch])
+                    session.commit()
+                self._rows_written += len(batch)
+                self._batches_written += 1
+            except Exception as e:
+                self.logger.error(f"Bulk insert of {len(batch)} execution records failed, retrying individually: {str(e)}")
+                for record in batch:
+                    try:
+                        with get_db_session() as session:
+                            session.add(JobExecutionHistory(**record))
+                            session.commit()
+                        self._rows_written += 1
+                    except Exception as row_error:
+                        self._rows_failed += 1
+                        self.logger.error(f"Failed to save execution history for job {record.get('job_id')}: {str(row_error)}")
+        except Exception as e:
+            self._rows_failed += len(batch)
+            self.logger.error(f"Failed to save execution history batch: {str(e)}")
+        finally:
+            self._release_slots(len(batch))
+    
+    def _release_slots(self, count: int):
+        """Return buffer slots to waiting submitters on the event loop"""
+        def release():
+            self._buffered_rows -= count
+            for _ in range(count):
+                self._slots.release()
+        
+        try:
+            self._loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            pass  # Event loop already closed during shutdown
+
+
+# Global writer instance
+_writer_instance: Optional[ExecutionHistoryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_execution_history_writer() -> ExecutionHistoryWriter:
+    """Get the global execution history writer (singleton, configured from config.yaml)"""
+    global _writer_instance
+    
+    if _writer_instance is None:
+        with _writer_lock:
+            if _writer_instance is None:
+                _writer_instance = ExecutionHistoryWriter.from_config()
+    
+    return _writer_instance
@@ -0,0 +1,283 @@
+"""
+Managed executors for Job Scheduler V2
+Per-category thread/process pools for blocking work and event loop lag instrumentation
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from .engine_config import get_engine_config_section
+from utils.logger import get_logger
+
+
+class ExecutorCategory(Enum):
+    """Categories of blocking work, each with its own pool"""
+    DB = "db"
+    IO = "io"
+    CPU = "cpu"
+
+
+class _PoolStats:
+    """Counters for one executor pool"""
+    
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+        self.max_wait_time = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.submitted - self.completed - self.failed,
+            "avg_wait_time": self.total_wait_time / self.completed if self.completed else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "avg_run_time": self.total_run_time / self.completed if self.completed else 0.0
+        }
+
+
+class ManagedExecutorPool:
+    """
+    Executor layer used by the V2 queues for blocking calls.
+    
+    Each category (db, io, cpu) gets a separate pool so slow database
+    commits cannot starve file writes or CPU-bound post-processing.
+    Pool sizes come from execution_v2.executors in config/config.yaml.
+    """
+    
+    def __init__(self, db_workers: int = 4, io_workers: int = 4, cpu_workers: int = 2,
+                 cpu_use_processes: bool = False):
+        self.worker_counts = {
+            ExecutorCategory.DB: db_workers,
+            ExecutorCategory.IO: io_workers,
+            ExecutorCategory.CPU: cpu_workers
+        }
+        self.cpu_use_processes = cpu_use_processes
+        
+        self._executors: Dict[ExecutorCategory, Executor] = {}
+        self._stats = {category: _PoolStats() for category in ExecutorCategory}
+        self._lock = threading.Lock()
+        self.logger = get_logger("ManagedExecutorPool")
+    
+    @classmethod
+    def from_config(cls) -> "ManagedExecutorPool":
+        """Create a pool from the execution_v2.executors configuration"""
+        config = get_engine_config_section('executors')
+        return cls(
+            db_workers=int(config.get('db_workers', 4)),
+            io_workers=int(config.get('io_workers', 4)),
+            cpu_workers=int(config.get('cpu_workers', 2)),
+            cpu_use_processes=bool(config.get('cpu_use_processes', False))
+        )
+    
+    def get_executor(self, category: ExecutorCategory) -> Executor:
+        """Get (creating on first use) the executor for a category"""
+        executor = self._executors.get(category)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(category)
+                if executor is None:
+                    executor = self._create_executor(category)
+                    self._executors[category] = executor
+        return executor
+    
+    async def run(self, category: ExecutorCategory, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable in the category's pool and await its result"""
+        category = ExecutorCategory(category)
+        executor = self.get_executor(category)
+        stats = self._stats[category]
+        call = functools.partial(func, *args, **kwargs)
+        
+        stats.submitted += 1
+        
+        # Process pools need a picklable callable, so only thread pools are timed
+        if isinstance(executor, ProcessPoolExecutor):
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(executor, call)
+            except Exception:
+                stats.failed += 1
+                raise
+            stats.completed += 1
+            return result
+        
+        submitted_at = time.perf_counter()
+        timings = {}
+        
+        def timed_call():
+            started_at = time.perf_counter()
+            timings['wait'] = started_at - submitted_at
+            try:
+                return call()
+            finally:
+                timings['run'] = time.perf_counter() - started_at
+        
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, timed_call)
+        except Exception:
+            stats.failed += 1
+            raise
+        
+        stats.completed += 1
+        stats.total_wait_time += timings.get('wait', 0.0)
+        stats.total_run_time += timings.get('run', 0.0)
+        stats.max_wait_time = max(stats.max_wait_time, timings.get('wait', 0.0))
+        return result
+    
+    def shutdown(self, wait: bool = True):
+        """Shut down all pools"""
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-category pool statistics"""
+        return {
+            category.value: {
+                "workers": self.worker_counts[category],
+                **self._stats[category].to_dict()
+            }
+            for category in ExecutorCategory
+        }
+    
+    def _create_executor(self, category: ExecutorCategory) -> Executor:
+        """Create the executor for a category"""
+        max_workers = max(1, self.worker_counts[category])
+        if category == ExecutorCategory.CPU and self.cpu_use_processes:
+            return ProcessPoolExecutor(max_workers=max_workers)
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"v2-{category.value}")
+
+
+class LoopLagMonitor:
+    """
+    Measures how long the event loop was blocked.
+    
+    A probe sleeps for a fixed interval and records how late it wakes up;
+    any delay beyond the interval is time the loop spent running other
+    code without yielding.
+    """
+    
+    def __init__(self, interval_seconds: float = 0.5, warning_threshold_ms: float = 100.0):
+        self.interval = interval_seconds
+        self.warning_threshold = warning_threshold_ms / 1000.0
+        
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self.logger = get_logger("LoopLagMonitor")
+        
+        # Metrics
+        self._samples = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+        self._blocked_events = 0
+        self._total_blocked_time = 0.0
+    
+    @classmethod
+    def from_config(cls) -> "LoopLagMonitor":
+        """Create a monitor from the execution_v2.loop_lag configuration"""
+        config = get_engine_config_section('loop_lag')
+        return cls(
+            interval_seconds=float(config.get('interval_seconds', 0.5)),
+            warning_threshold_ms=float(config.get('warning_threshold_ms', 100.0))
+        )
+    
+    def start(self):
+        """Start probing the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._probe_loop())
+    
+    async def stop(self):
+        """Stop probing"""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loop lag statistics (seconds)"""
+        return {
+            "samples": self._samples,
+            "last_lag": self._last_lag,
+            "max_lag": self._max_lag,
+            "avg_lag": self._total_lag / self._samples if self._samples else 0.0,
+            "blocked_events": self._blocked_events,
+            "total_blocked_time": self._total_blocked_time,
+            "warning_threshold": self.warning_threshold
+        }
+    
+    async def _probe_loop(self):
+        """Sleep for the interval repeatedly and record how late each wake-up was"""
+        loop = asyncio.get_running_loop()
+        
+        while not self._stop_event.is_set():
+            expected_wake = loop.time() + self.interval
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self.interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+            
+            lag = max(loop.time() - expected_wake, 0.0)
+            self._samples += 1
+            self._last_lag = lag
+            self._total_lag += lag
+            self._max_lag = max(self._max_lag, lag)
+            
+            if lag >= self.warning_threshold:
+                self._blocked_events += 1
+                self._total_blocked_time += lag
+                self.logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")
+
+
+# Global executor pool instance
+_pool_instance: Optional[ManagedExecutorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_executor_pool() -> ManagedExecutorPool:
+    """Get the global managed executor pool (singleton, configured from config.yaml)"""
+    global _pool_instance
+    
+    if _pool_instance is None:
+        with _pool_lock:
+            if _pool_instance is None:
+                _pool_instance = ManagedExecutorPool.from_config()
+    
+    return _pool_instance
+
+
+def get_process_metrics() -> Dict[str, Any]:
+    """Sample memory (MB) and CPU usage of this process, blocking so run it in the io pool"""
+    import psutil
+    process = psutil.Process()
+    return {
+        "memory_mb": process.memory_info().rss // (1024 * 1024),
+        "cpu_percent": process.cpu_percent()
+    }
+
+
+def get_host_metrics() -> Dict[str, float]:
+    """Sample host-wide CPU and memory usage (percent), blocking so run it in the io pool"""
+    import psutil
+    return {
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "memory_percent": psutil.virtual_memory().percent
+    }
+
+
+async def run_blocking(category: ExecutorCategory, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable in the global pool for its category"""
+    return await get_executor_pool().run(category, func, *args, **kwargs)
@@ -0,0 +1,195 @@
+"""
+Latency histograms for Job Scheduler V2
+Streaming log-bucketed histograms with percentile queries for queue wait, step and end-to-end latency
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+QUEUE_WAIT = "queue_wait"  # Due (or queued, if later) until a worker picked the job up
+STEP_DURATION = "step_duration"  # One step, grouped by step type
+END_TO_END = "end_to_end"  # Due until the execution finished
+
+ALL_TYPES = "all"
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in seconds.
+    
+    Values fall into logarithmic buckets growing by 2^(1/8), so any recorded
+    value is known to within about 4.5% regardless of magnitude. Recording
+    is one log and one list increment; percentile queries scan the fixed
+    bucket array, which does not grow with the number of samples.
+    """
+    
+    MIN_VALUE = 0.0001  # 0.1 ms, smaller values share the first bucket
+    MAX_VALUE = 7 * 24 * 3600.0  # One week, larger values share the last bucket
+    BUCKETS_PER_DOUBLING = 8
+    
+    _LOG_GROWTH = math.log(2) / BUCKETS_PER_DOUBLING
+    BUCKET_COUNT = int(math.ceil(math.log(MAX_VALUE / MIN_VALUE) / _LOG_GROWTH)) + 1
+    
+    def __init__(self):
+        self.counts: List[int] = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, value: float):
+        """Add one latency sample (seconds)"""
+        if value < 0:
+            value = 0.0
+        if value <= self.MIN_VALUE:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.MIN_VALUE) / self._LOG_GROWTH) + 1, self.BUCKET_COUNT - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: "LatencyHistogram"):
+        """Add the samples of another histogram to this one"""
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+    
+    def reset(self):
+        """Drop all samples"""
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def percentile(self, percentile: float) -> float:
+        """Get the value at a percentile (0-100), 0.0 if there are no samples"""
+        if self.count == 0:
+            return 0.0
+        
+        rank = max(math.ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._bucket_midpoint(index), self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get count, mean, max and the p50/p95/p99 percentiles"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max
+        }
+    
+    def _bucket_midpoint(self, index: int) -> float:
+        """Get the geometric midpoint of a bucket"""
+        if index == 0:
+            return self.MIN_VALUE
+        return self.MIN_VALUE * math.exp((index - 0.5) * self._LOG_GROWTH)
+
+
+class WindowedLatencyHistogram:
+    """
+    Histogram over roughly the last window of samples.
+    
+    Two histograms take turns: samples go into the current one, and when the
+    window elapses it becomes the previous one and a fresh one starts.
+    Queries read both, so they cover between one and two windows.
+    """
+    
+    def __init__(self, window_seconds: float = 300.0):
+        self.window = window_seconds
+        self._current = LatencyHistogram()
+        self._previous = LatencyHistogram()
+        self._window_start = time.monotonic()
+    
+    def record(self, value: float):
+        """Add one latency sample (seconds)"""
+        self._rotate()
+        self._current.record(value)
+    
+    def snapshot(self) -> LatencyHistogram:
+        """Get a histogram of the samples in the window"""
+        self._rotate()
+        histogram = LatencyHistogram()
+        histogram.merge(self._previous)
+        histogram.merge(self._current)
+        return histogram
+    
+    def _rotate(self):
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.window:
+            return
+        if elapsed >= 2 * self.window:
+            # Nothing recent enough to keep
+            self._previous.reset()
+        else:
+            self._previous, self._current = self._current, self._previous
+        self._current.reset()
+        self._window_start = time.monotonic()
+
+
+class LatencyMetrics:
+    """Latency histograms of one queue, per metric for all jobs and per job or step type"""
+    
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+    
+    def record(self, metric: str, value: float, type_name: Optional[str] = None):
+        """Record a sample for all jobs and, if given, for its job or step type"""
+        self._get_histogram(metric, ALL_TYPES).record(value)
+        if type_name:
+            self._get_histogram(metric, type_name).record(value)
+    
+    def merge(self, other: "LatencyMetrics"):
+        """Add the samples of another queue's metrics"""
+        for key, histogram in other._histograms.items():
+            self._get_histogram(*key).merge(histogram)
+    
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Get percentiles per metric, for all jobs and broken down by type"""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for (metric, type_name), histogram in sorted(self._histograms.items()):
+            metric_summary = summary.setdefault(metric, {"all": None, "by_type": {}})
+            if type_name == ALL_TYPES:
+                metric_summary["all"] = histogram.to_dict()
+            else:
+                metric_summary["by_type"][type_name] = histogram.to_dict()
+        return summary
+    
+    @classmethod
+    def combine(cls, metrics: Iterable["LatencyMetrics"]) -> "LatencyMetrics":
+        """Merge the metrics of several queues"""
+        combined = cls()
+        for queue_metrics in metrics:
+            combined.merge(queue_metrics)
+        return combined
+    
+    def _get_histogram(self, metric: str, type_name: str) -> LatencyHistogram:
+        histogram = self._histograms.get((metric, type_name))
+        if histogram is None:
+            histogram = self._histograms[(metric, type_name)] = LatencyHistogram()
+        return histogram
+
+
+def get_job_type(job: Any) -> str:
+    """Get the type a job's latency is grouped under (metadata job_type, else its step types)"""
+    metadata = getattr(job, 'metadata', None) or {}
+    if metadata.get('job_type'):
+        return str(metadata['job_type'])
+    
+    step_types = sorted({
+        step.step_type for step in getattr(job, 'steps', None) or [] if getattr(step, 'step_type', None)
+    })
+    return "+".join(step_types) or "unknown"
@@ -0,0 +1,287 @@
+"""
+Durable queue journal for Job Scheduler V2
+Append-only SQLite (WAL) log of enqueue/dequeue/complete events, replayed to rebuild a queue after restart
+"""
+
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .engine_config import get_engine_config_section
+from utils.logger import get_logger
+
+
+EVENT_ENQUEUE = "enqueue"
+EVENT_DEQUEUE = "dequeue"
+EVENT_COMPLETE = "complete"
+
+
+@dataclass
+class JournalEntry:
+    """A queued occurrence recovered from the journal"""
+    execution_id: str
+    job_data: Dict[str, Any]
+    scheduled_time: datetime
+    priority: int
+    queue_time: datetime
+    retry_count: int
+    interrupted: bool  # Was dequeued but never completed (process died mid-run)
+
+
+class QueueJournal:
+    """
+    Append-only journal of a single timezone queue.
+    
+    Events are buffered on the event loop and group-committed by a single
+    writer thread, so appends never block the loop and stay in order. A job
+    stays live from its enqueue event until its complete event; compaction
+    drops all rows of completed jobs.
+    """
+    
+    def __init__(self, path: Path, flush_interval_ms: int = 50, compact_threshold: int = 5000,
+                 rerun_interrupted: bool = False):
+        self.path = Path(path)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.compact_threshold = compact_threshold
+        # Re-queue every job that was running when the process died (jobs opt in with metadata rerun_if_interrupted)
+        self.rerun_interrupted = rerun_interrupted
+        
+        self._buffer: List[Tuple[str, str, Optional[str], Optional[str], Optional[float], Optional[int], Optional[float], Optional[int]]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._pending_writes: List[asyncio.Future] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._closed = False
+        self._completed_since_compaction = 0
+        
+        self.logger = get_logger(f"QueueJournal.{self.path.stem}")
+        
+        # Metrics
+        self._events_written = 0
+        self._compactions = 0
+        self._write_errors = 0
+    
+    @classmethod
+    def for_timezone(cls, timezone_name: str) -> Optional["QueueJournal"]:
+        """Create the journal for a timezone queue from execution_v2.journal configuration (None if disabled)"""
+        config = get_engine_config_section('journal')
+        if not config.get('enabled', True):
+            return None
+        
+        return cls(
+            cls._get_directory(config) / f"{timezone_name.replace('/', '__')}.db",
+            flush_interval_ms=int(config.get('flush_interval_ms', 50)),
+            compact_threshold=int(config.get('compact_threshold', 5000)),
+            rerun_interrupted=bool(config.get('rerun_interrupted', False))
+        )
+    
+    @classmethod
+    def list_journaled_timezones(cls) -> List[str]:
+        """Get timezones that have a journal file, their queues must be started to replay it"""
+        config = get_engine_config_section('journal')
+        directory = cls._get_directory(config)
+        if not config.get('enabled', True) or not directory.exists():
+            return []
+        return sorted(path.stem.replace('__', '/') for path in directory.glob("*.db"))
+    
+    @staticmethod
+    def _get_directory(config: Dict[str, Any]) -> Path:
+        """Get the journal directory from configuration"""
+        return Path(config.get('directory', 'data/queue_journal'))
+    
+    # Event recording (called from the event loop)
+    def open(self):
+        """Accept events again after close()"""
+        self._closed = False
+    
+    def record_enqueue(self, execution_id: str, job_data: Dict[str, Any], scheduled_time: datetime,
+                       priority: int, queue_time: datetime, retry_count: int = 0):
+        """Record a job occurrence entering the queue"""
+        self._append((
+            EVENT_ENQUEUE, execution_id, job_data.get('job_id'), json.dumps(job_data, default=str),
+            scheduled_time.timestamp(), priority, queue_time.timestamp(), retry_count
+        ))
+    
+    def record_dequeue(self, execution_id: str):
+        """Record a job occurrence starting execution"""
+        self._append((EVENT_DEQUEUE, execution_id, None, None, None, None, None, None))
+    
+    def record_complete(self, execution_id: str):
+        """Record a job occurrence leaving the queue for good (finished or cancelled)"""
+        self._append((EVENT_COMPLETE, execution_id, None, None, None, None, None, None))
+    
+    async def flush(self):
+        """Write all buffered events and wait until they are committed"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._submit_buffer()
+        
+        pending, self._pending_writes = self._pending_writes, []
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def replay(self) -> List[JournalEntry]:
+        """Read the journal and return the live entries in enqueue order, then compact it in the background"""
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(self._get_executor(), self._replay)
+        self._pending_writes.append(loop.run_in_executor(self._get_executor(), self._compact))
+        return entries
+    
+    async def close(self):
+        """Flush buffered events and close the database"""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._close_connection)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get journal statistics"""
+        return {
+            "path": str(self.path),
+            "buffered_events": len(self._buffer),
+            "events_written": self._events_written,
+            "compactions": self._compactions,
+            "write_errors": self._write_errors
+        }
+    
+    def _append(self, row: Tuple):
+        """Buffer an event and schedule a group commit"""
+        if self._closed:
+            return
+        self._buffer.append(row)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_soon)
+    
+    def _flush_soon(self):
+        """Timer callback that hands the buffered batch to the writer thread"""
+        self._flush_handle = None
+        self._submit_buffer()
+        self._pending_writes = [future for future in self._pending_writes if not future.done()]
+    
+    def _submit_buffer(self):
+        """Hand the buffered events to the writer thread"""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        loop = asyncio.get_running_loop()
+        self._pending_writes.append(loop.run_in_executor(self._get_executor(), self._write_batch, batch))
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the single writer thread, one thread keeps events in order and owns the connection"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="v2-journal")
+        return self._executor
+    
+    # Writer thread
+    def _get_connection(self) -> sqlite3.Connection:
+        """Open the journal database on the writer thread"""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path))
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS queue_journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event TEXT NOT NULL,
+                    execution_id TEXT NOT NULL,
+                    job_id TEXT,
+                    job_data TEXT,
+                    scheduled_time REAL,
+                    priority INTEGER,
+                    queue_time REAL,
+                    retry_count INTEGER
+                )
+            """)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def _write_batch(self, batch: List[Tuple]):
+        """Commit a batch of events in one transaction, compacting when enough jobs have completed"""
+        try:
+            connection = self._get_connection()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO queue_journal (event, execution_id, job_id, job_data, scheduled_time, "
+                    "priority, queue_time, retry_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    batch
+                )
+            self._events_written += len(batch)
+            self._completed_since_compaction += sum(1 for row in batch if row[0] == EVENT_COMPLETE)
+        except Exception as e:
+            self._write_errors += 1
+            self.logger.error(f"Error writing {len(batch)} queue journal events: {str(e)}")
+            return
+        
+        if self._completed_since_compaction >= self.compact_threshold:
+            self._compact()
+    
+    def _replay(self) -> List[JournalEntry]:
+        """Fold the event log into the set of live entries"""
+        connection = self._get_connection()
+        live: Dict[str, Tuple] = {}
+        started = set()
+        
+        for row in connection.execute(
+            "SELECT event, execution_id, job_data, scheduled_time, priority, queue_time, retry_count "
+            "FROM queue_journal ORDER BY seq"
+        ):
+            event, execution_id = row[0], row[1]
+            if event == EVENT_ENQUEUE:
+                live[execution_id] = row
+            elif event == EVENT_DEQUEUE:
+                started.add(execution_id)
+            else:
+                live.pop(execution_id, None)
+        
+        # Occurrences of the same job share one decoded definition
+        job_data_cache: Dict[str, Dict[str, Any]] = {}
+        entries = []
+        for execution_id, (_, _, job_json, scheduled_time, priority, queue_time, retry_count) in live.items():
+            job_data = job_data_cache.get(job_json)
+            if job_data is None:
+                job_data = job_data_cache[job_json] = json.loads(job_json)
+            entries.append(JournalEntry(
+                execution_id=execution_id,
+                job_data=job_data,
+                scheduled_time=datetime.fromtimestamp(scheduled_time, dt_timezone.utc),
+                priority=priority or 0,
+                queue_time=datetime.fromtimestamp(queue_time, dt_timezone.utc),
+                retry_count=retry_count or 0,
+                interrupted=execution_id in started
+            ))
+        
+        return entries
+    
+    def _compact(self):
+        """Drop every event of completed jobs, leaving only rows of live jobs"""
+        try:
+            connection = self._get_connection()
+            with connection:
+                connection.execute("""
+                    DELETE FROM queue_journal
+                    WHERE execution_id IN (SELECT execution_id FROM queue_journal WHERE event = 'complete')
+                """)
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._completed_since_compaction = 0
+            self._compactions += 1
+        except Exception as e:
+            self.logger.error(f"Error compacting queue journal: {str(e)}")
+    
+    def _close_connection(self):
+        """Close the database on the writer thread"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,549 @@
+"""
+Multi-process sharded execution for Job Scheduler V2
+Runs timezone queues in worker processes behind a coordinator that keeps the execution engine interface
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .data_models import JobDefinition, JobExecutionResult, create_job_from_legacy
+from . import engine_config
+from . import execution_engine as engine_module
+from .execution_engine import ExecutionEngineStatus, ModernExecutionEngine
+from .engine_config import get_engine_config, get_engine_config_section
+from .latency_metrics import LatencyMetrics
+from .timezone_queue import QueuedJob, QueuedJobFilter
+from utils.logger import get_logger
+
+
+SHARD_BY_TIMEZONE = "timezone"
+SHARD_BY_JOB_ID = "job_id"
+
+
+def get_shard_index(key: str, shard_count: int) -> int:
+    """Map a timezone or job ID to a shard (CRC32 is stable across processes, unlike hash())"""
+    return zlib.crc32(key.encode('utf-8')) % shard_count
+
+
+class _ShardServer:
+    """Serves coordinator requests against the ModernExecutionEngine of a shard process"""
+    
+    # Engine coroutines the coordinator may call
+    METHODS = frozenset({
+        "schedule_job", "execute_job_immediately", "cancel_job", "wait_for_execution", "cancel_jobs_by_job_id",
+        "cancel_jobs_where"
+    })
+    
+    def __init__(self, shard_index: int, shard_count: int, shard_by: str, connection,
+                 engine_options: Dict[str, Any], status_interval: float):
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.shard_by = shard_by
+        self.connection = connection
+        self.engine_options = engine_options
+        self.status_interval = status_interval
+        
+        self.engine: Optional[ModernExecutionEngine] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._send_lock = threading.Lock()
+        self._calls: set = set()
+        self.logger = get_logger(f"ExecutionShard.{shard_index}")
+    
+    async def serve(self):
+        """Run the shard engine until the coordinator asks it to stop or goes away"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        
+        timezone_filter = None
+        if self.shard_by == SHARD_BY_TIMEZONE:
+            timezone_filter = lambda timezone_name: get_shard_index(timezone_name, self.shard_count) == self.shard_index
+        else:
+            # Every shard may host every timezone, so each needs journal files of its own
+            # Copies, the loaded configuration may be shared (another engine in this process, benchmarks)
+            config = dict(get_engine_config())
+            journal = dict(config.get('journal') or {})
+            journal['directory'] = os.path.join(journal.get('directory', 'data/queue_journal'), f"shard-{self.shard_index}")
+            config['journal'] = journal
+            engine_config._config_cache = config
+        
+        self.engine = ModernExecutionEngine(timezone_filter=timezone_filter, **self.engine_options)
+        # Code running inside this process (steps, helpers) sees the shard's engine as the global one
+        engine_module._engine_instance = self.engine
+        await self.engine.start()
+        
+        threading.Thread(target=self._read_requests, name=f"v2-shard-{self.shard_index}-reader", daemon=True).start()
+        status_task = asyncio.create_task(self._push_status())
+        
+        await self._stop_event.wait()
+        
+        status_task.cancel()
+        await asyncio.gather(status_task, return_exceptions=True)
+        await self.engine.stop()
+        self._send(("stopped", self.shard_index))
+        self.logger.info(f"Shard {self.shard_index} stopped")
+    
+    def _read_requests(self):
+        """Reader thread, hands coordinator messages to the event loop"""
+        while True:
+            try:
+                message = self.connection.recv()
+            except (EOFError, OSError):
+                # Coordinator exited without a stop message
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+                return
+            
+            if message[0] == "stop":
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+                return
+            self._loop.call_soon_threadsafe(self._start_call, message)
+    
+    def _start_call(self, message: Tuple):
+        """Run a coordinator call as its own task so slow calls do not hold up others"""
+        task = asyncio.create_task(self._handle_call(*message[1:]))
+        self._calls.add(task)
+        task.add_done_callback(self._calls.discard)
+    
+    async def _handle_call(self, request_id: int, method: str, args: Tuple, kwargs: Dict[str, Any]):
+        """Run an engine method and send back its result or exception"""
+        try:
+            if method == "snapshot":
+                result = self._get_snapshot()
+            elif method in self.METHODS:
+                result = await getattr(self.engine, method)(*args, **kwargs)
+            else:
+                raise ValueError(f"Unsupported shard method: {method}")
+        except Exception as e:
+            self._send(("response", request_id, False, e))
+            return
+        self._send(("response", request_id, True, result))
+    
+    async def _push_status(self):
+        """Send a status snapshot to the coordinator periodically"""
+        while True:
+            self._send(("status", self.shard_index, self._get_snapshot()))
+            await asyncio.sleep(self.status_interval)
+    
+    def _get_snapshot(self) -> Dict[str, Any]:
+        """Collect the status the coordinator aggregates"""
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "engine": self.engine.get_engine_status(),
+            "timezone_queues": self.engine.get_timezone_queue_status(),
+            "active_jobs": self.engine.get_active_jobs(),
+            "queued_jobs": self.engine.get_queued_jobs(50),
+            "performance": self.engine.get_performance_summary(),
+            "latency": self.engine.get_latency_metrics()
+        }
+    
+    def _send(self, message: Tuple):
+        """Send a message to the coordinator, replacing unpicklable payloads with an error"""
+        with self._send_lock:
+            try:
+                self.connection.send(message)
+            except (EOFError, OSError):
+                pass
+            except Exception as e:
+                if message[0] == "response":
+                    self.connection.send(("response", message[1], False, RuntimeError(f"Unpicklable shard result: {str(e)}")))
+                else:
+                    self.logger.error(f"Error sending {message[0]} to coordinator: {str(e)}")
+
+
+def _run_shard(shard_index: int, shard_count: int, shard_by: str, connection,
+               engine_options: Dict[str, Any], status_interval: float):
+    """Entry point of a shard process"""
+    server = _ShardServer(shard_index, shard_count, shard_by, connection, engine_options, status_interval)
+    asyncio.run(server.serve())
+
+
+class _ShardHandle:
+    """Coordinator side of one shard process"""
+    
+    def __init__(self, index: int, process, connection):
+        self.index = index
+        self.process = process
+        self.connection = connection
+        self.send_lock = threading.Lock()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ready = asyncio.Event()
+        self.alive = True
+        self.snapshot: Dict[str, Any] = {}
+
+
+class ShardedExecutionEngine:
+    """
+    Coordinator that spreads the V2 engine over worker processes.
+    
+    Each shard process runs its own ModernExecutionEngine and event loop, so
+    CPU-heavy steps and queue overhead are no longer capped at one core.
+    Jobs are routed by timezone or by a hash of job_id; calls and results go
+    over a duplex pipe per shard, and shards push status snapshots that the
+    synchronous status methods aggregate. Concurrency keys and rate limits
+    are enforced per shard process.
+    """
+    
+    def __init__(self, shard_count: Optional[int] = None, shard_by: str = SHARD_BY_TIMEZONE,
+                 status_interval_seconds: float = 2.0, default_max_concurrent_jobs: int = 5,
+                 shared_worker_count: int = 4):
+        if shard_by not in (SHARD_BY_TIMEZONE, SHARD_BY_JOB_ID):
+            raise ValueError(f"Unsupported shard_by: {shard_by}")
+        
+        self.shard_count = shard_count or os.cpu_count() or 1
+        self.shard_by = shard_by
+        self.status_interval = status_interval_seconds
+        self.engine_options = {
+            "default_max_concurrent_jobs": default_max_concurrent_jobs,
+            "shared_worker_count": shared_worker_count
+        }
+        self.status = ExecutionEngineStatus.STOPPED
+        
+        self._shards: List[_ShardHandle] = []
+        self._request_ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine_start_time: Optional[datetime] = None
+        
+        self.logger = get_logger("ShardedExecutionEngine")
+    
+    @classmethod
+    def from_config(cls) -> "ShardedExecutionEngine":
+        """Create a coordinator from the execution_v2.sharding configuration"""
+        config = get_engine_config_section('sharding')
+        return cls(
+            shard_count=int(config.get('shard_count', 0)) or None,
+            shard_by=config.get('shard_by', SHARD_BY_TIMEZONE),
+            status_interval_seconds=float(config.get('status_interval_seconds', 2.0))
+        )
+    
+    async def start(self, ready_timeout: float = 60.0):
+        """Start the shard processes and wait until each has started its engine"""
+        if self.status == ExecutionEngineStatus.RUNNING:
+            self.logger.warning("Sharded execution engine is already running")
+            return
+        
+        self.status = ExecutionEngineStatus.STARTING
+        self._loop = asyncio.get_running_loop()
+        self._engine_start_time = datetime.now(dt_timezone.utc)
+        
+        # Spawn works the same on Windows and POSIX and does not copy the parent's threads
+        context = multiprocessing.get_context("spawn")
+        try:
+            for index in range(self.shard_count):
+                connection, child_connection = context.Pipe(duplex=True)
+                process = context.Process(
+                    target=_run_shard,
+                    args=(index, self.shard_count, self.shard_by, child_connection,
+                          self.engine_options, self.status_interval),
+                    name=f"v2-shard-{index}"
+                )
+                process.start()
+                child_connection.close()
+                
+                shard = _ShardHandle(index, process, connection)
+                self._shards.append(shard)
+                threading.Thread(target=self._read_responses, args=(shard,),
+                                 name=f"v2-shard-{index}-responses", daemon=True).start()
+            
+            await asyncio.wait_for(asyncio.gather(*(shard.ready.wait() for shard in self._shards)), ready_timeout)
+        except Exception as e:
+            self.status = ExecutionEngineStatus.ERROR
+            self.logger.error(f"Failed to start execution shards: {str(e)}")
+            await self._terminate_shards()
+            raise
+        
+        self.status = ExecutionEngineStatus.RUNNING
+        self.logger.info(f"Sharded execution engine started with {self.shard_count} shards by {self.shard_by}")
+    
+    async def stop(self, timeout: float = 60.0):
+        """Stop every shard engine and wait for the processes to exit"""
+        if self.status == ExecutionEngineStatus.STOPPED:
+            return
+        
+        self.status = ExecutionEngineStatus.STOPPING
+        for shard in self._shards:
+            try:
+                with shard.send_lock:
+                    shard.connection.send(("stop",))
+            except (EOFError, OSError):
+                pass
+        
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(None, shard.process.join, timeout) for shard in self._shards
+        ), return_exceptions=True)
+        await self._terminate_shards()
+        
+        self.status = ExecutionEngineStatus.STOPPED
+        self.logger.info("Sharded execution engine stopped")
+    
+    # Job routing
+    def get_shard_for_job(self, job: JobDefinition) -> int:
+        """Get the index of the shard that runs a job"""
+        key = job.timezone if self.shard_by == SHARD_BY_TIMEZONE else job.job_id
+        return get_shard_index(key, self.shard_count)
+    
+    async def schedule_job(self, job: JobDefinition, scheduled_time: Optional[datetime] = None, priority: int = 0) -> str:
+        """Schedule a job on its shard, returns the execution ID"""
+        self._check_running()
+        return await self._call(self._shards[self.get_shard_for_job(job)], "schedule_job", job, scheduled_time, priority)
+    
+    async def execute_job_immediately(self, job: JobDefinition, priority: int = 10,
+                                      timeout: Optional[float] = None) -> JobExecutionResult:
+        """Execute a job on its shard and return the result"""
+        self._check_running()
+        return await self._call(self._shards[self.get_shard_for_job(job)], "execute_job_immediately", job, priority, timeout)
+    
+    async def cancel_job(self, execution_id: str, timezone: Optional[str] = None) -> bool:
+        """Cancel an execution on whichever shard holds it"""
+        if timezone and self.shard_by == SHARD_BY_TIMEZONE:
+            return await self._call(self._shards[get_shard_index(timezone, self.shard_count)], "cancel_job", execution_id, timezone)
+        results = await self._call_all("cancel_job", execution_id, timezone)
+        return any(result is True for result in results)
+    
+    async def wait_for_execution(self, execution_id: str, timeout: Optional[float] = None) -> JobExecutionResult:
+        """Wait for an execution on whichever shard holds it"""
+        for result in await self._call_all("wait_for_execution", execution_id, timeout):
+            if not isinstance(result, Exception):
+                return result
+            if not isinstance(result, KeyError):
+                raise result
+        raise KeyError(f"Execution not found: {execution_id}")
+    
+    async def cancel_jobs_by_job_id(self, job_id: str) -> int:
+        """Cancel every queued execution of a job"""
+        if self.shard_by == SHARD_BY_JOB_ID:
+            return await self._call(self._shards[get_shard_index(job_id, self.shard_count)], "cancel_jobs_by_job_id", job_id)
+        return sum(result for result in await self._call_all("cancel_jobs_by_job_id", job_id) if isinstance(result, int))
+    
+    async def cancel_jobs_where(self, predicate: Union[QueuedJobFilter, Callable[[QueuedJob], bool]]) -> int:
+        """
+        Cancel every queued execution matching a filter on the shards that can hold one
+        
+        Raises:
+            TypeError: If predicate is an arbitrary callable, only a QueuedJobFilter can be sent to shards
+        """
+        if not isinstance(predicate, QueuedJobFilter):
+            raise TypeError("The sharded engine needs a QueuedJobFilter, arbitrary predicates cannot be sent to shards")
+        
+        shard_indexes = None
+        if predicate.timezone is not None and self.shard_by == SHARD_BY_TIMEZONE:
+            shard_indexes = {get_shard_index(predicate.timezone, self.shard_count)}
+        elif predicate.job_ids is not None and self.shard_by == SHARD_BY_JOB_ID:
+            shard_indexes = {get_shard_index(job_id, self.shard_count) for job_id in predicate.job_ids}
+        
+        shards = [shard for shard in self._shards if shard_indexes is None or shard.index in shard_indexes]
+        results = await asyncio.gather(
+            *(self._call(shard, "cancel_jobs_where", predicate) for shard in shards),
+            return_exceptions=True
+        )
+        return sum(result for result in results if isinstance(result, int))
+    
+    async def refresh_status(self):
+        """Fetch fresh snapshots from every shard instead of waiting for the next push"""
+        for shard, snapshot in zip(self._shards, await self._call_all("snapshot")):
+            if isinstance(snapshot, dict):
+                shard.snapshot = snapshot
+    
+    # Aggregated status (from the latest snapshots)
+    def get_engine_status(self) -> Dict[str, Any]:
+        """Get overall engine status aggregated over the shards"""
+        runtime = 0
+        if self._engine_start_time:
+            runtime = (datetime.now(dt_timezone.utc) - self._engine_start_time).total_seconds()
+        
+        shards = {}
+        supported_step_types = []
+        for shard in self._shards:
+            engine_status = shard.snapshot.get("engine", {})
+            supported_step_types = supported_step_types or engine_status.get("supported_step_types", [])
+            shards[str(shard.index)] = {
+                "pid": shard.process.pid,
+                "alive": shard.alive and shard.process.is_alive(),
+                "snapshot_age_seconds": time.time() - shard.snapshot["time"] if shard.snapshot else None,
+                "status": engine_status.get("status"),
+                "timezone_queue_count": engine_status.get("timezone_queue_count", 0),
+                "total_jobs_executed": engine_status.get("total_jobs_executed", 0),
+                "stolen_jobs": engine_status.get("stolen_jobs", 0),
+                "loop_lag": engine_status.get("loop_lag"),
+                "latency": engine_status.get("latency"),
+                "executors": engine_status.get("executors")
+            }
+        
+        return {
+            "status": self.status.value,
+            "mode": "sharded",
+            "shard_by": self.shard_by,
+            "shard_count": self.shard_count,
+            "runtime_seconds": runtime,
+            "timezone_queue_count": sum(shard["timezone_queue_count"] for shard in shards.values()),
+            "total_jobs_executed": sum(shard["total_jobs_executed"] for shard in shards.values()),
+            "stolen_jobs": sum(shard["stolen_jobs"] for shard in shards.values()),
+            "shards": shards,
+            "start_time": self._engine_start_time.isoformat() if self._engine_start_time else None,
+            "supported_step_types": supported_step_types
+        }
+    
+    def get_timezone_queue_status(self) -> Dict[str, Dict[str, Any]]:
+        """Get status of all timezone queues of all shards"""
+        return self._merge_snapshots("timezone_queues")
+    
+    def get_active_jobs(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get active jobs across all shards"""
+        return self._merge_snapshots("active_jobs")
+    
+    def get_queued_jobs(self, limit: Optional[int] = 100) -> Dict[str, List[Dict[str, Any]]]:
+        """Get queued jobs across all shards (snapshots hold up to 50 per queue)"""
+        return {
+            queue_name: jobs if limit is None else jobs[:limit]
+            for queue_name, jobs in self._merge_snapshots("queued_jobs").items()
+        }
+    
+    def get_performance_summary(self) -> Dict[str, Any]:
+        """Get comprehensive performance summary aggregated over the shards"""
+        queue_summaries = {}
+        for shard in self._shards:
+            timezone_queues = shard.snapshot.get("performance", {}).get("timezone_queues", {})
+            for timezone_name, summary in timezone_queues.items():
+                queue_summaries[self._get_queue_name(timezone_name, shard.index)] = summary
+        
+        total_processed = sum(summary["total_jobs_processed"] for summary in queue_summaries.values())
+        total_successful = sum(summary["successful_jobs"] for summary in queue_summaries.values())
+        
+        return {
+            "engine": self.get_engine_status(),
+            "overall_success_rate": (total_successful / total_processed * 100) if total_processed > 0 else 0,
+            "total_jobs_processed": total_processed,
+            "timezone_queues": queue_summaries
+        }
+    
+    def get_latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Get p50/p95/p99 of queue wait, step duration and end-to-end latency across all shards"""
+        return LatencyMetrics.combine(
+            shard.snapshot["latency"] for shard in self._shards if "latency" in shard.snapshot
+        ).get_summary()
+    
+    # Legacy compatibility methods
+    async def execute_legacy_job(self, legacy_job: Dict[str, Any]) -> JobExecutionResult:
+        """Execute a job in legacy format on its shard by converting to V2"""
+        try:
+            result = await self.execute_job_immediately(create_job_from_legacy(legacy_job))
+            self.logger.info(f"Legacy job executed via sharded V2 engine: {legacy_job.get('name', 'Unknown')}")
+            return result
+        except Exception as e:
+            self.logger.error(f"Failed to execute legacy job: {str(e)}")
+            raise
+    
+    def list_supported_timezones(self) -> List[str]:
+        """Get list of supported timezones"""
+        import pytz
+        return sorted(pytz.all_timezones)
+    
+    def validate_job_definition(self, job_data: Dict[str, Any]) -> List[str]:
+        """Validate job definition and return any errors"""
+        try:
+            job = job_data if isinstance(job_data, JobDefinition) else JobDefinition.from_dict(job_data)
+            return job.validate()
+        except Exception as e:
+            return [f"Job validation error: {str(e)}"]
+    
+    # Pipe communication
+    async def _call(self, shard: _ShardHandle, method: str, *args, **kwargs) -> Any:
+        """Call an engine method in a shard and await its result"""
+        if not shard.alive:
+            raise RuntimeError(f"Execution shard {shard.index} is not running")
+        
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        shard.pending[request_id] = future
+        try:
+            with shard.send_lock:
+                shard.connection.send(("call", request_id, method, args, kwargs))
+        except Exception:
+            shard.pending.pop(request_id, None)
+            raise
+        return await future
+    
+    async def _call_all(self, method: str, *args, **kwargs) -> List[Any]:
+        """Call a method on every shard, returns results and exceptions in shard order"""
+        return await asyncio.gather(
+            *(self._call(shard, method, *args, **kwargs) for shard in self._shards),
+            return_exceptions=True
+        )
+    
+    def _read_responses(self, shard: _ShardHandle):
+        """Reader thread of a shard pipe, resolves call futures and stores status snapshots"""
+        while True:
+            try:
+                message = shard.connection.recv()
+            except (EOFError, OSError):
+                break
+            
+            kind = message[0]
+            if kind == "response":
+                self._loop.call_soon_threadsafe(self._resolve, shard, *message[1:])
+            elif kind == "status":
+                shard.snapshot = message[2]
+                self._loop.call_soon_threadsafe(shard.ready.set)
+            elif kind == "stopped":
+                break
+        
+        shard.alive = False
+        if self.status not in (ExecutionEngineStatus.STOPPING, ExecutionEngineStatus.STOPPED):
+            self.logger.error(f"Execution shard {shard.index} exited unexpectedly")
+        try:
+            self._loop.call_soon_threadsafe(self._fail_pending, shard)
+        except RuntimeError:
+            pass  # Coordinator loop already closed
+    
+    def _resolve(self, shard: _ShardHandle, request_id: int, ok: bool, payload: Any):
+        """Complete the future of a shard call"""
+        future = shard.pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload if isinstance(payload, BaseException) else RuntimeError(str(payload)))
+    
+    def _fail_pending(self, shard: _ShardHandle):
+        """Fail calls still waiting on a shard that exited"""
+        pending, shard.pending = shard.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(f"Execution shard {shard.index} exited"))
+    
+    async def _terminate_shards(self):
+        """Kill shard processes that did not exit and close their pipes"""
+        for shard in self._shards:
+            if shard.process.is_alive():
+                self.logger.warning(f"Terminating execution shard {shard.index}")
+                shard.process.terminate()
+            shard.connection.close()
+        self._shards = []
+    
+    # Helpers
+    def _check_running(self):
+        if self.status != ExecutionEngineStatus.RUNNING:
+            raise RuntimeError("Execution engine is not running")
+    
+    def _get_queue_name(self, timezone_name: str, shard_index: int) -> str:
+        """Key a queue in merged status, shards share timezones when sharding by job_id"""
+        if self.shard_by == SHARD_BY_TIMEZONE:
+            return timezone_name
+        return f"{timezone_name} [shard {shard_index}]"
+    
+    def _merge_snapshots(self, section: str) -> Dict[str, Any]:
+        """Merge a per-timezone section of all shard snapshots"""
+        merged = {}
+        for shard in self._shards:
+            for timezone_name, value in shard.snapshot.get(section, {}).items():
+                merged[self._get_queue_name(timezone_name, shard.index)] = value
+        return merged
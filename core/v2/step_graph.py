@@ -0,0 +1,83 @@
+"""
+Step dependency graph for Job Scheduler V2
+Builds a DAG from step depends_on declarations so independent steps can run concurrently
+"""
+
+from typing import Any, Dict, List, Set
+
+
+def get_step_dependencies(step_config: Any) -> List[str]:
+    """Get the step IDs a step depends on (empty if it declares none)"""
+    depends_on = getattr(step_config, 'depends_on', None) or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    return list(depends_on)
+
+
+def uses_step_dependencies(steps: List[Any]) -> bool:
+    """Check if any step declares depends_on, otherwise steps run sequentially"""
+    return any(get_step_dependencies(step_config) for step_config in steps)
+
+
+class StepGraphError(ValueError):
+    """Invalid step dependency graph (unknown step, duplicate ID or cycle)"""
+
+
+class StepGraph:
+    """Dependency graph of a job's steps, released in definition order as dependencies complete"""
+    
+    def __init__(self, steps: List[Any]):
+        self.steps: Dict[str, Any] = {}
+        self.step_numbers: Dict[str, int] = {}
+        
+        for step_number, step_config in enumerate(steps, 1):
+            if step_config.step_id in self.steps:
+                raise StepGraphError(f"Duplicate step ID: {step_config.step_id}")
+            self.steps[step_config.step_id] = step_config
+            self.step_numbers[step_config.step_id] = step_number
+        
+        self._remaining_dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, List[str]] = {step_id: [] for step_id in self.steps}
+        
+        for step_id, step_config in self.steps.items():
+            dependencies = set(get_step_dependencies(step_config))
+            unknown = dependencies - set(self.steps)
+            if unknown:
+                raise StepGraphError(f"Step {step_id} depends on unknown steps: {', '.join(sorted(unknown))}")
+            self._remaining_dependencies[step_id] = dependencies
+            for dependency in dependencies:
+                self._dependents[dependency].append(step_id)
+        
+        self._check_for_cycles()
+    
+    def get_initial_steps(self) -> List[str]:
+        """Get IDs of steps with no dependencies"""
+        return [step_id for step_id, dependencies in self._remaining_dependencies.items() if not dependencies]
+    
+    def mark_completed(self, step_id: str) -> List[str]:
+        """Mark a step finished, returns IDs of steps whose dependencies are now all complete"""
+        released = []
+        for dependent in self._dependents[step_id]:
+            dependencies = self._remaining_dependencies[dependent]
+            dependencies.discard(step_id)
+            if not dependencies:
+                released.append(dependent)
+        return sorted(released, key=self.step_numbers.__getitem__)
+    
+    def _check_for_cycles(self):
+        """Raise StepGraphError if the dependencies contain a cycle (Kahn's algorithm)"""
+        in_degree = {step_id: len(dependencies) for step_id, dependencies in self._remaining_dependencies.items()}
+        ready = [step_id for step_id, degree in in_degree.items() if degree == 0]
+        visited = 0
+        
+        while ready:
+            step_id = ready.pop()
+            visited += 1
+            for dependent in self._dependents[step_id]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+        
+        if visited != len(self.steps):
+            cyclic = sorted(step_id for step_id, degree in in_degree.items() if degree > 0)
+            raise StepGraphError(f"Step dependencies contain a cycle: {', '.join(cyclic)}")
@@ -4,13 +4,15 @@ Creates separate log files per timezone with structured logging
 """
 
 import os
+import atexit
 import logging
+import queue
 import threading
 from datetime import datetime, timezone as dt_timezone
 from typing import Dict, Optional, Any
 from pathlib import Path
 import pytz
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 
 from utils.logger import get_logger
 
@@ -90,11 +92,16 @@ class TimezoneLogger:
         self.logger = logging.getLogger(self.logger_name)
         self.logger.setLevel(logging.INFO)
         
-        # Add timezone file handler if not already added
+        # Add timezone file handler if not already added. Records are handed to a
+        # listener thread so job log lines never block the V2 event loop on disk I/O
         if not self.logger.handlers:
             handler = TimezoneFileHandler(timezone_name)
             handler.setLevel(logging.INFO)
-            self.logger.addHandler(handler)
+            record_queue = queue.SimpleQueue()
+            listener = QueueListener(record_queue, handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            self.logger.addHandler(QueueHandler(record_queue))
             self.logger.propagate = False
         
         # System logger for debug info
@@ -232,6 +239,10 @@ class PerformanceLogger:
         }
         
         self.logger.info(f"QUEUE_METRICS: {queue_metrics}")
+    
+    def log_scaling_decision(self, decision: Dict[str, Any]):
+        """Log an autoscaler decision for a timezone queue"""
+        self.logger.info(f"SCALING_DECISION: {decision}")
 
 
 class AuditLogger:
@@ -5,22 +5,46 @@ Manages separate execution queues per timezone with priority scheduling
 
 import asyncio
 import heapq
+import itertools
 import threading
-from datetime import datetime, timezone as dt_timezone
-from typing import Dict, List, Optional, Any, Tuple, Callable
-from dataclasses import dataclass, field
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple, Callable, Set, Union
 from enum import Enum
 import pytz
 import uuid
 import time
 
-from .data_models import JobDefinition, JobExecutionResult, JobStatus, ExecutionContext
+from .data_models import JobDefinition, JobExecutionResult, JobStatus, ExecutionContext, StepExecutionResult, StepStatus
 from .timezone_logger import TimezoneLogger
+from .timing_wheel import HierarchicalTimingWheel
+from .cancellation import CancellationToken
+from .step_graph import StepGraph, StepGraphError, uses_step_dependencies
+from .execution_history_writer import get_execution_history_writer
+from .engine_config import get_engine_config_section
+from .executors import ExecutorCategory, get_executor_pool, get_process_metrics
+from .queue_journal import QueueJournal
+from .concurrency_keys import get_concurrency_key_manager, get_job_concurrency_keys
+from .autoscaler import AdjustableSemaphore
+from .latency_metrics import END_TO_END, QUEUE_WAIT, STEP_DURATION, LatencyMetrics, WindowedLatencyHistogram, get_job_type
+from ..rate_limiter import get_dispatch_rate_limiter, get_job_definition_dimensions
 from .job_logger import JobLogger, create_job_logger
 from .step_framework import StepFactory, ExecutionStep
 from utils.logger import get_logger
 
 
+class QueueFullError(RuntimeError):
+    """Raised when a job is refused because its timezone queue is at max depth"""
+
+
+class OverflowPolicy(Enum):
+    """What a full queue does with a new job"""
+    REJECT = "reject"  # Refuse the new job
+    DROP_OLDEST_LOW_PRIORITY = "drop_oldest_low_priority"  # Shed the oldest lowest-priority waiting job
+    COALESCE = "coalesce"  # Fold into a waiting occurrence of the same job, otherwise refuse
+
+
 class QueueStatus(Enum):
     """Queue status enumeration"""
     STOPPED = "stopped"
@@ -30,53 +54,196 @@ class QueueStatus(Enum):
     ERROR = "error"
 
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime to integer microseconds since the epoch (naive values are taken as UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    """Convert integer microseconds since the epoch to an aware UTC datetime"""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def now_epoch_us() -> int:
+    """Get the current time as integer microseconds since the epoch"""
+    return time.time_ns() // 1000
+
+
 class QueuedJob:
-    """Represents a job in the queue with scheduling information"""
-    job: JobDefinition
-    scheduled_time: datetime
-    priority: int = 0
-    queue_time: datetime = field(default_factory=lambda: datetime.now(dt_timezone.utc))
-    execution_id: Optional[str] = None
-    retry_count: int = 0
-    
-    def __post_init__(self):
-        if not self.execution_id:
+    """
+    Represents a job in the queue with scheduling information.
+    
+    A backlog can hold millions of these, so the class is slotted, times are
+    kept as integer epoch microseconds (datetimes are built on access) and the
+    JobDefinition is shared between occurrences of the same job.
+    """
+    
+    __slots__ = (
+        'job', 'scheduled_ts', 'queue_ts', 'priority', 'retry_count', 'cancelled',
+        'rank', 'coalesced_count', 'completion_future', 'execution_id'
+    )
+    
+    def __init__(self, job: JobDefinition, scheduled_time: Union[datetime, int], priority: int = 0,
+                 queue_time: Union[datetime, int, None] = None, execution_id: Optional[str] = None,
+                 retry_count: int = 0, rank: Optional[float] = None):
+        self.job = job
+        self.scheduled_ts = scheduled_time if isinstance(scheduled_time, int) else to_epoch_us(scheduled_time)
+        if queue_time is None:
+            self.queue_ts = now_epoch_us()
+        else:
+            self.queue_ts = queue_time if isinstance(queue_time, int) else to_epoch_us(queue_time)
+        self.priority = priority
+        self.retry_count = retry_count
+        self.cancelled = False  # Tombstone, the heap entry is discarded lazily when popped
+        self.rank = priority if rank is None else rank  # Aged priority, set when the job becomes due
+        self.coalesced_count = 0  # Later occurrences merged into this one while it waited
+        self.completion_future: Optional[asyncio.Future] = None
+        if execution_id is None:
             timestamp = self.scheduled_time.strftime("%Y%m%d_%H%M%S")
-            self.execution_id = f"exec_{timestamp}_{str(uuid.uuid4())[:8]}"
+            execution_id = f"exec_{timestamp}_{uuid.uuid4().hex[:8]}"
+        self.execution_id = execution_id
+    
+    @property
+    def scheduled_time(self) -> datetime:
+        return from_epoch_us(self.scheduled_ts)
+    
+    @property
+    def queue_time(self) -> datetime:
+        return from_epoch_us(self.queue_ts)
     
     def __lt__(self, other: "QueuedJob") -> bool:
-        """Compare for priority queue (higher priority first, then earlier scheduled time)"""
-        if self.priority != other.priority:
-            return self.priority > other.priority  # Higher priority first
-        return self.scheduled_time < other.scheduled_time  # Earlier time first
+        """Compare for priority queue (higher aged priority first, then earlier scheduled time)"""
+        if self.rank != other.rank:
+            return self.rank > other.rank  # Higher priority first
+        return self.scheduled_ts < other.scheduled_ts  # Earlier time first
+    
+    def __repr__(self) -> str:
+        return (f"QueuedJob(job_id={self.job.job_id!r}, execution_id={self.execution_id!r}, "
+                f"scheduled_time={self.scheduled_time.isoformat()}, priority={self.priority})")
     
     def get_wait_time(self) -> float:
         """Get how long this job has been waiting in queue"""
-        return (datetime.now(dt_timezone.utc) - self.queue_time).total_seconds()
+        return (now_epoch_us() - self.queue_ts) / 1_000_000
+    
+    def get_ready_timestamp(self) -> float:
+        """Get epoch seconds from which the job has been runnable (queued or due, whichever is later)"""
+        return max(self.queue_ts, self.scheduled_ts) / 1_000_000
     
     def is_ready_to_execute(self) -> bool:
         """Check if job is ready to execute based on scheduled time"""
-        return datetime.now(dt_timezone.utc) >= self.scheduled_time
+        return now_epoch_us() >= self.scheduled_ts
+    
+    def get_completion_future(self) -> asyncio.Future:
+        """Get the future resolved with this execution's JobExecutionResult (created on first use)"""
+        if self.completion_future is None:
+            self.completion_future = asyncio.get_running_loop().create_future()
+        return self.completion_future
+    
+    def resolve(self, result: JobExecutionResult):
+        """Resolve the completion future if anyone is waiting on it"""
+        if self.completion_future is not None and not self.completion_future.done():
+            self.completion_future.set_result(result)
+
+
+@dataclass(frozen=True)
+class QueuedJobFilter:
+    """
+    Picklable predicate over waiting jobs, for cancel_jobs_where()
+    
+    Unlike an arbitrary callable it can be sent to shard processes. Criteria
+    left as None match everything, the rest must all match.
+    """
+    job_ids: Optional[FrozenSet[str]] = None
+    timezone: Optional[str] = None
+    max_priority: Optional[int] = None  # Match jobs with priority at or below this
+    
+    def __call__(self, queued_job: QueuedJob) -> bool:
+        job = queued_job.job
+        if self.job_ids is not None and job.job_id not in self.job_ids:
+            return False
+        if self.timezone is not None and job.timezone != self.timezone:
+            return False
+        if self.max_priority is not None and queued_job.priority > self.max_priority:
+            return False
+        return True
 
 
 class TimezoneJobQueue:
     """Timezone-specific job queue with async worker management"""
     
-    def __init__(self, timezone_name: str, max_concurrent_jobs: int = 5):
+    # Steps run concurrently per job when steps declare depends_on (override with metadata max_parallel_steps)
+    DEFAULT_MAX_PARALLEL_STEPS = 4
+    
+    # (band name, minimum priority) checked in order, used for wait time metrics
+    PRIORITY_BANDS: Tuple[Tuple[str, float], ...] = (
+        ("high", 10),
+        ("normal", 1),
+        ("low", float("-inf")),
+    )
+    
+    def __init__(self, timezone_name: str, max_concurrent_jobs: int = 5, wheel_threshold_seconds: float = 60.0,
+                 aging_priority_per_minute: Optional[float] = None, max_queue_depth: Optional[int] = None,
+                 overflow_policy: Optional[Union[OverflowPolicy, str]] = None):
         self.timezone_name = timezone_name
         self.max_concurrent_jobs = max_concurrent_jobs
+        self.wheel_threshold_seconds = wheel_threshold_seconds
+        
+        # Admission control: waiting jobs are capped at max_queue_depth (0 = unbounded)
+        admission_config = get_engine_config_section('admission')
+        if max_queue_depth is None:
+            max_queue_depth = int(admission_config.get('max_queue_depth', 0))
+        self.max_queue_depth = max(max_queue_depth, 0)
+        self.overflow_policy = OverflowPolicy(overflow_policy or admission_config.get('overflow_policy', 'reject'))
+        # Merge a new occurrence into a waiting one of the same job (jobs override with metadata coalesce_pending)
+        self.coalesce_pending = bool(admission_config.get('coalesce_pending', False))
+        
+        # Priority aging: a due job gains this much effective priority per minute it waits
+        if aging_priority_per_minute is None:
+            aging_priority_per_minute = float(get_engine_config_section('aging').get('priority_per_minute', 0.0))
+        self.aging_priority_per_minute = aging_priority_per_minute
+        self._aging_epoch = time.time()
         
         # Queue state
         self.status = QueueStatus.STOPPED
-        self._queue: List[QueuedJob] = []  # Priority queue
+        self._pending: List[Tuple[int, int, QueuedJob]] = []  # Min-heap keyed by ready time (epoch microseconds)
+        self._ready: List[QueuedJob] = []  # Priority heap of jobs that are due
+        self._sequence = itertools.count()  # Tie-breaker for jobs with the same ready time
+        self._timing_wheel = HierarchicalTimingWheel(time.time())  # Far-future jobs, keyed by execution ID
+        self._entries: Dict[str, QueuedJob] = {}  # execution_id -> waiting job (wheel, pending or ready)
+        self._job_index: Dict[str, Set[str]] = {}  # job_id -> execution_ids of waiting jobs
+        self._job_refs: Dict[str, JobDefinition] = {}  # job_id -> definition shared by its waiting occurrences
+        self._tombstones = 0  # Cancelled entries still sitting in the pending/ready heaps
         self._queue_lock = asyncio.Lock()
+        self._queue_condition = asyncio.Condition(self._queue_lock)  # Wakes workers when work becomes due
         self._active_jobs: Dict[str, QueuedJob] = {}  # Currently executing jobs
+        self._execution_tasks: Dict[str, asyncio.Task] = {}  # execution_id -> running execution task
+        self._cancellation_tokens: Dict[str, CancellationToken] = {}  # execution_id -> token shared with steps
+        self._key_blocked: Dict[str, List[QueuedJob]] = {}  # Concurrency key -> priority heap of due jobs waiting for it
+        self._concurrency_keys = get_concurrency_key_manager()
+        self._rate_limiter = get_dispatch_rate_limiter()
+        self._rate_reserved: Set[str] = set()  # Jobs deferred by the rate limiter that already hold their token
+        self._shed_candidates: List[Tuple[int, int, int, QueuedJob]] = []  # Min-heap of (priority, queue time), pruned lazily
         
         # Worker management
         self._workers: List[asyncio.Task] = []
+        self.worker_count = 0  # Target number of queue workers, changed by the engine autoscaler
+        self._live_workers = 0
+        self._next_worker_id = 0
         self._stop_event = asyncio.Event()
-        self._worker_semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._worker_semaphore = AdjustableSemaphore(max_concurrent_jobs)
+        self.work_available_callback: Optional[Callable[[], None]] = None  # Wakes shared engine workers
+        
+        # Execution history is persisted in batches off the event loop
+        self._history_writer = get_execution_history_writer()
+        
+        # Queue state survives restarts through an append-only journal (None if disabled)
+        self._journal = QueueJournal.for_timezone(timezone_name)
         
         # Logging
         self.tz_logger = TimezoneLogger.get_logger(timezone_name)
@@ -93,8 +260,19 @@ class TimezoneJobQueue:
         self._total_jobs_processed = 0
         self._successful_jobs = 0
         self._failed_jobs = 0
+        self._cancelled_jobs = 0
+        self._rate_limited_jobs = 0
+        self._rejected_jobs = 0
+        self._shed_jobs = 0
+        self._coalesced_jobs = 0
         self._total_execution_time = 0.0
         self._queue_start_time = None
+        self._band_wait_stats: Dict[str, Dict[str, float]] = {
+            band: {"dequeued": 0, "total_wait": 0.0, "max_wait": 0.0} for band, _ in self.PRIORITY_BANDS
+        }
+        self._latency = LatencyMetrics()  # Wait, step and end-to-end latency histograms
+        self._recent_waits = WindowedLatencyHistogram(300.0)  # Queue wait over the last minutes, for autoscaling
+        self._queued_ts_sum = 0  # Sum of queue_ts over waiting jobs, gives their average wait in O(1)
         
         self.system_logger.info(f"Timezone queue initialized: {timezone_name}, max concurrent: {max_concurrent_jobs}")
     
@@ -108,10 +286,16 @@ class TimezoneJobQueue:
         self._stop_event.clear()
         self._queue_start_time = datetime.now(dt_timezone.utc)
         
+        # Rebuild jobs that were still queued when the process last stopped
+        await self._restore_from_journal()
+        
+        # Wake jobs parked on a concurrency key when any queue releases it
+        self._concurrency_keys.add_release_listener(self._on_concurrency_keys_released)
+        
         # Start worker tasks
-        for i in range(worker_count):
-            worker_task = asyncio.create_task(self._worker_loop(i))
-            self._workers.append(worker_task)
+        self.worker_count = worker_count
+        for _ in range(worker_count):
+            self._spawn_worker()
         
         # Start monitoring task
         monitor_task = asyncio.create_task(self._monitor_loop())
@@ -119,7 +303,7 @@ class TimezoneJobQueue:
         
         self.status = QueueStatus.RUNNING
         self.system_logger.info(f"Queue started with {worker_count} workers")
-        self.tz_logger.log_queue_status(len(self._queue), len(self._active_jobs), 0.0)
+        self.tz_logger.log_queue_status(self._queue_depth(), len(self._active_jobs), 0.0)
     
     async def stop(self):
         """Stop the queue workers"""
@@ -129,10 +313,15 @@ class TimezoneJobQueue:
         self.status = QueueStatus.STOPPING
         self._stop_event.set()
         
+        # Wake any workers blocked waiting for a due job
+        async with self._queue_condition:
+            self._queue_condition.notify_all()
+        
         # Wait for all workers to complete
         if self._workers:
             await asyncio.gather(*self._workers, return_exceptions=True)
             self._workers.clear()
+        self._live_workers = 0
         
         # Wait for active jobs to complete (with timeout)
         timeout = 30  # 30 seconds timeout
@@ -143,11 +332,25 @@ class TimezoneJobQueue:
         if self._active_jobs:
             self.system_logger.warning(f"Stopped queue with {len(self._active_jobs)} jobs still active")
         
+        self._concurrency_keys.remove_release_listener(self._on_concurrency_keys_released)
+        
+        # Make sure buffered execution history reaches the database
+        await self._history_writer.flush()
+        
+        # Waiting jobs stay in the journal and are restored on the next start
+        if self._journal is not None:
+            await self._journal.close()
+        
         self.status = QueueStatus.STOPPED
         self.system_logger.info("Queue stopped")
     
-    async def add_job(self, job: JobDefinition, scheduled_time: Optional[datetime] = None, priority: int = 0):
-        """Add a job to the queue"""
+    async def add_job(self, job: JobDefinition, scheduled_time: Optional[datetime] = None, priority: int = 0) -> str:
+        """
+        Add a job to the queue, returns the execution ID of the queued occurrence
+        
+        Raises:
+            QueueFullError: If the queue is at max depth and the overflow policy refuses the job
+        """
         if scheduled_time is None:
             scheduled_time = datetime.now(dt_timezone.utc)
         
@@ -155,14 +358,39 @@ class TimezoneJobQueue:
         if scheduled_time.tzinfo is None:
             scheduled_time = scheduled_time.replace(tzinfo=dt_timezone.utc)
         
-        queued_job = QueuedJob(
-            job=job,
-            scheduled_time=scheduled_time,
-            priority=priority
-        )
+        async with self._queue_condition:
+            queued_job = QueuedJob(
+                job=self._intern_job(job),
+                scheduled_time=scheduled_time,
+                priority=priority
+            )
+            
+            if self._should_coalesce(job):
+                existing_job = self._find_waiting_occurrence(job.job_id)
+                if existing_job is not None and existing_job.scheduled_ts <= queued_job.scheduled_ts:
+                    self._coalesce_into(existing_job)
+                    self.system_logger.info(
+                        f"Coalesced {job.job_name} ({job.job_id}) into waiting execution {existing_job.execution_id} "
+                        f"({existing_job.coalesced_count} merged)"
+                    )
+                    return existing_job.execution_id
+            
+            if self.max_queue_depth and self._queue_depth() >= self.max_queue_depth:
+                existing_job = self._admit_overflow(queued_job)
+                if existing_job is not None:
+                    return existing_job.execution_id
+            
+            self._place_job(queued_job)
+            # A waiting worker recalculates its timeout against the new earliest job
+            self._queue_condition.notify()
         
-        async with self._queue_lock:
-            heapq.heappush(self._queue, queued_job)
+        if self._journal is not None:
+            self._journal.record_enqueue(
+                queued_job.execution_id, job.to_dict(), scheduled_time,
+                priority, queued_job.queue_time, queued_job.retry_count
+            )
+        
+        self._signal_work_available()
         
         # Log job queued
         self.tz_logger.log_job_queued(
@@ -173,29 +401,375 @@ class TimezoneJobQueue:
         )
         
         self.system_logger.info(f"Job queued: {job.job_name} ({job.job_id}) for {scheduled_time}")
+        
+        return queued_job.execution_id
     
-    async def get_next_ready_job(self) -> Optional[QueuedJob]:
-        """Get the next job ready for execution"""
-        async with self._queue_lock:
-            ready_jobs = []
-            remaining_jobs = []
-            
-            # Separate ready and not-ready jobs
-            while self._queue:
-                job = heapq.heappop(self._queue)
-                if job.is_ready_to_execute():
-                    ready_jobs.append(job)
-                else:
-                    remaining_jobs.append(job)
+    def _admit_overflow(self, queued_job: QueuedJob) -> Optional[QueuedJob]:
+        """
+        Apply the overflow policy to a job arriving at a full queue (queue lock must be held)
+        
+        Returns:
+            The waiting occurrence the job was coalesced into, or None if room was made for it
+        
+        Raises:
+            QueueFullError: If the job is refused
+        """
+        job = queued_job.job
+        
+        if self.overflow_policy == OverflowPolicy.COALESCE:
+            existing_job = self._find_waiting_occurrence(job.job_id)
+            if existing_job is not None:
+                self._coalesce_into(existing_job)
+                self.system_logger.info(f"Queue full, coalesced {job.job_name} ({job.job_id}) into {existing_job.execution_id}")
+                return existing_job
+        
+        elif self.overflow_policy == OverflowPolicy.DROP_OLDEST_LOW_PRIORITY:
+            victim = self._peek_shed_candidate()
+            if victim is not None and victim.priority <= queued_job.priority:
+                self._cancel_queued_job(victim.execution_id, "Shed by queue overflow")
+                self._shed_jobs += 1
+                self.system_logger.warning(
+                    f"Queue full, shed {victim.job.job_name} ({victim.execution_id}, priority {victim.priority}) "
+                    f"to admit {job.job_name} (priority {queued_job.priority})"
+                )
+                return None
+        
+        self._rejected_jobs += 1
+        self.system_logger.warning(
+            f"Queue full ({self.max_queue_depth} jobs), rejected {job.job_name} ({job.job_id}) "
+            f"under {self.overflow_policy.value} policy"
+        )
+        raise QueueFullError(f"Timezone queue {self.timezone_name} is full ({self.max_queue_depth} jobs)")
+    
+    def _peek_shed_candidate(self) -> Optional[QueuedJob]:
+        """Get the oldest lowest-priority waiting job, dropping heap entries of jobs that already left"""
+        while self._shed_candidates:
+            queued_job = self._shed_candidates[0][3]
+            if self._entries.get(queued_job.execution_id) is queued_job:
+                return queued_job
+            heapq.heappop(self._shed_candidates)
+        return None
+    
+    def _should_coalesce(self, job: JobDefinition) -> bool:
+        """Check if new occurrences of a job are merged into a waiting one"""
+        metadata = getattr(job, 'metadata', None) or {}
+        return bool(metadata.get('coalesce_pending', self.coalesce_pending))
+    
+    def _coalesce_into(self, existing_job: QueuedJob):
+        """Count a new occurrence as merged into a waiting one"""
+        existing_job.coalesced_count += 1
+        self._coalesced_jobs += 1
+    
+    def _find_waiting_occurrence(self, job_id: str) -> Optional[QueuedJob]:
+        """Get the earliest scheduled waiting occurrence of a job through the job index"""
+        execution_ids = self._job_index.get(job_id)
+        if not execution_ids:
+            return None
+        return min((self._entries[execution_id] for execution_id in execution_ids),
+                   key=lambda waiting: waiting.scheduled_ts)
+    
+    def _intern_job(self, job: JobDefinition) -> JobDefinition:
+        """Get the definition already shared by waiting occurrences of the job if it is equal (queue lock must be held)"""
+        interned = self._job_refs.get(job.job_id)
+        if interned is not None and (interned is job or interned == job):
+            return interned
+        return job
+    
+    def _place_job(self, queued_job: QueuedJob, now_us: Optional[int] = None):
+        """Put a job in the timing wheel or pending heap and index it (queue lock must be held)"""
+        scheduled_ts = queued_job.scheduled_ts
+        delay = (scheduled_ts - (now_us or now_epoch_us())) / 1_000_000
+        in_wheel = delay > self.wheel_threshold_seconds and self._timing_wheel.add(
+            queued_job.execution_id, scheduled_ts / 1_000_000, queued_job
+        )
+        if not in_wheel:
+            heapq.heappush(self._pending, (scheduled_ts, next(self._sequence), queued_job))
+        
+        self._entries[queued_job.execution_id] = queued_job
+        self._queued_ts_sum += queued_job.queue_ts
+        self._job_index.setdefault(queued_job.job.job_id, set()).add(queued_job.execution_id)
+        self._job_refs.setdefault(queued_job.job.job_id, queued_job.job)
+        
+        if self.max_queue_depth and self.overflow_policy == OverflowPolicy.DROP_OLDEST_LOW_PRIORITY:
+            heapq.heappush(self._shed_candidates, (queued_job.priority, queued_job.queue_ts, next(self._sequence), queued_job))
+            if len(self._shed_candidates) > 2 * self.max_queue_depth:
+                # Most entries belong to jobs that already ran, rebuild from the live ones
+                self._shed_candidates = [entry for entry in self._shed_candidates if entry[3].execution_id in self._entries]
+                heapq.heapify(self._shed_candidates)
+    
+    async def _restore_from_journal(self):
+        """
+        Re-queue the live entries of the journal
+        
+        Jobs that were already running when the process died may have had
+        side effects, so they are only retried when the journal is configured
+        with rerun_interrupted or the job sets metadata rerun_if_interrupted.
+        Otherwise they are recorded as failed and dropped from the journal.
+        """
+        if self._journal is None:
+            return
+        
+        self._journal.open()
+        try:
+            entries = await self._journal.replay()
+        except Exception as e:
+            self.system_logger.error(f"Error replaying queue journal: {str(e)}")
+            return
+        
+        if not entries:
+            return
+        
+        jobs: Dict[int, JobDefinition] = {}  # Occurrences of one job share a definition
+        restored = 0
+        interrupted = 0
+        abandoned: List[Tuple[JobDefinition, Any]] = []
+        now_us = now_epoch_us()
+        
+        async with self._queue_condition:
+            for entry in entries:
+                if entry.execution_id in self._entries:
+                    continue
+                try:
+                    job = jobs.get(id(entry.job_data))
+                    if job is None:
+                        job = jobs[id(entry.job_data)] = JobDefinition.from_dict(entry.job_data)
+                except Exception as e:
+                    self.system_logger.error(f"Dropping unreadable journal entry {entry.execution_id}: {str(e)}")
+                    self._journal.record_complete(entry.execution_id)
+                    continue
+                
+                if entry.interrupted and not self._should_rerun_interrupted(job):
+                    abandoned.append((job, entry))
+                    self._journal.record_complete(entry.execution_id)
+                    continue
+                
+                queued_job = QueuedJob(
+                    job=self._intern_job(job),
+                    scheduled_time=entry.scheduled_time,
+                    priority=entry.priority,
+                    queue_time=entry.queue_time,
+                    execution_id=entry.execution_id,
+                    retry_count=entry.retry_count + (1 if entry.interrupted else 0)
+                )
+                self._place_job(queued_job, now_us)
+                restored += 1
+                interrupted += entry.interrupted
             
-            # Put not-ready jobs back in queue
-            for job in remaining_jobs:
-                heapq.heappush(self._queue, job)
+            self._queue_condition.notify_all()
+        
+        for job, entry in abandoned:
+            await self._record_interrupted_execution(job, entry.execution_id)
+        
+        self._signal_work_available()
+        self.system_logger.info(
+            f"Restored {restored} queued jobs from journal ({interrupted} interrupted mid-execution re-run, "
+            f"{len(abandoned)} recorded as failed)"
+        )
+    
+    def _should_rerun_interrupted(self, job: JobDefinition) -> bool:
+        """Check if a job that was running when the process died is queued again"""
+        metadata = getattr(job, 'metadata', None) or {}
+        return bool(metadata.get('rerun_if_interrupted', self._journal.rerun_interrupted))
+    
+    async def _record_interrupted_execution(self, job: JobDefinition, execution_id: str):
+        """Record an execution cut off by a restart as failed instead of running it again"""
+        now = datetime.now(dt_timezone.utc)
+        result = JobExecutionResult(
+            execution_id=execution_id,
+            job_id=job.job_id,
+            job_name=job.job_name,
+            status=JobStatus.RUNNING,
+            timezone=self.timezone_name,
+            start_time=now
+        )
+        result.metadata['interrupted'] = True
+        result.mark_completed(JobStatus.FAILED, "Interrupted by a restart while running, not re-run automatically")
+        
+        self.tz_logger.log_error(job.job_id, execution_id, result.error_message)
+        await self._save_execution_to_database(job, execution_id, result)
+        self._failed_jobs += 1
+    
+    def _queue_depth(self) -> int:
+        """Get number of jobs waiting in queue (timing wheel, pending and ready)"""
+        return len(self._entries)
+    
+    def _iter_queued_jobs(self):
+        """Iterate over all waiting jobs without ordering"""
+        return iter(self._entries.values())
+    
+    def _discard_entry(self, queued_job: QueuedJob):
+        """Drop a job from the execution_id and job_id indexes (queue lock must be held)"""
+        if self._entries.pop(queued_job.execution_id, None) is not None:
+            self._queued_ts_sum -= queued_job.queue_ts
+        self._rate_reserved.discard(queued_job.execution_id)
+        execution_ids = self._job_index.get(queued_job.job.job_id)
+        if execution_ids is not None:
+            execution_ids.discard(queued_job.execution_id)
+            if not execution_ids:
+                del self._job_index[queued_job.job.job_id]
+                self._job_refs.pop(queued_job.job.job_id, None)
+    
+    def _pop_ready_job(self) -> Optional[QueuedJob]:
+        """Pop the highest priority live job off the ready heap (queue lock must be held)"""
+        while self._ready:
+            queued_job = heapq.heappop(self._ready)
+            if queued_job.cancelled:
+                self._tombstones -= 1
+                continue
+            
+            if self._rate_limiter.has_limits() and queued_job.execution_id not in self._rate_reserved:
+                delay = self._rate_limiter.reserve(get_job_definition_dimensions(queued_job.job))
+                if delay > 0:
+                    # Defer instead of failing, the job keeps its reserved token and rank
+                    self._rate_reserved.add(queued_job.execution_id)
+                    self._rate_limited_jobs += 1
+                    dispatch_ts = now_epoch_us() + int(delay * 1_000_000)
+                    heapq.heappush(self._pending, (dispatch_ts, next(self._sequence), queued_job))
+                    continue
+            
+            concurrency_keys = get_job_concurrency_keys(queued_job.job)
+            if concurrency_keys:
+                blocking_key = self._concurrency_keys.try_acquire(queued_job.execution_id, concurrency_keys)
+                if blocking_key is not None:
+                    # Park the job off the ready heap so it does not take a worker until the key frees up
+                    heapq.heappush(self._key_blocked.setdefault(blocking_key, []), queued_job)
+                    continue
+            
+            self._discard_entry(queued_job)
+            self._record_band_wait(queued_job)
+            return queued_job
+        return None
+    
+    def _on_concurrency_keys_released(self, keys: List[str]):
+        """Release listener, schedules parked jobs of the freed keys back onto the ready heap"""
+        if any(key in self._key_blocked for key in keys):
+            asyncio.create_task(self._unpark_key_blocked_jobs(keys))
+    
+    async def _unpark_key_blocked_jobs(self, keys: List[str]):
+        """Move as many parked jobs as there are free slots back onto the ready heap"""
+        async with self._queue_condition:
+            unparked = 0
+            for key in keys:
+                parked = self._key_blocked.get(key)
+                available = self._concurrency_keys.get_available(key)
+                while parked and available > 0:
+                    queued_job = heapq.heappop(parked)
+                    heapq.heappush(self._ready, queued_job)
+                    if not queued_job.cancelled:
+                        available -= 1
+                        unparked += 1
+                if not parked:
+                    self._key_blocked.pop(key, None)
             
-            # Return highest priority ready job
-            if ready_jobs:
-                ready_jobs.sort()  # Sort by priority and time
-                return ready_jobs[0]
+            if unparked:
+                self._queue_condition.notify(unparked)
+        
+        if unparked:
+            self._signal_work_available()
+    
+    def _age_job(self, queued_job: QueuedJob):
+        """
+        Set the aged rank of a job entering the ready heap.
+        
+        Effective priority is priority + rate * (now - ready time). Comparing two
+        jobs at any instant, the now terms cancel, so the rank priority - rate *
+        ready time orders them the same way forever and the heap never needs
+        re-heapifying as jobs age.
+        """
+        rate = self.aging_priority_per_minute / 60.0
+        queued_job.rank = queued_job.priority - rate * (queued_job.get_ready_timestamp() - self._aging_epoch)
+    
+    def _get_effective_priority(self, queued_job: QueuedJob) -> float:
+        """Get a job's current aged priority"""
+        rate = self.aging_priority_per_minute / 60.0
+        waited = max(time.time() - queued_job.get_ready_timestamp(), 0.0)
+        return queued_job.priority + rate * waited
+    
+    def _get_priority_band(self, priority: float) -> str:
+        """Get the metrics band for a priority"""
+        for band, minimum_priority in self.PRIORITY_BANDS:
+            if priority >= minimum_priority:
+                return band
+        return self.PRIORITY_BANDS[-1][0]
+    
+    def _record_band_wait(self, queued_job: QueuedJob):
+        """Record how long a dequeued job waited after becoming due"""
+        wait_time = max(time.time() - queued_job.get_ready_timestamp(), 0.0)
+        stats = self._band_wait_stats[self._get_priority_band(queued_job.priority)]
+        stats["dequeued"] += 1
+        stats["total_wait"] += wait_time
+        stats["max_wait"] = max(stats["max_wait"], wait_time)
+        self._recent_waits.record(wait_time)
+        self._latency.record(QUEUE_WAIT, wait_time, get_job_type(queued_job.job))
+    
+    def _compact_heaps(self):
+        """Rebuild the pending and ready heaps without tombstoned entries (queue lock must be held)"""
+        self._pending = [entry for entry in self._pending if not entry[2].cancelled]
+        self._ready = [queued_job for queued_job in self._ready if not queued_job.cancelled]
+        heapq.heapify(self._pending)
+        heapq.heapify(self._ready)
+        for key, parked in list(self._key_blocked.items()):
+            parked = [queued_job for queued_job in parked if not queued_job.cancelled]
+            heapq.heapify(parked)
+            if parked:
+                self._key_blocked[key] = parked
+            else:
+                del self._key_blocked[key]
+        self._tombstones = 0
+    
+    def _promote_due_jobs(self):
+        """Move jobs whose scheduled time has arrived onto the ready heap (queue lock must be held)"""
+        # Jobs whose wheel bucket came due go onto the pending heap for exact ordering
+        for queued_job in self._timing_wheel.advance(time.time()):
+            heapq.heappush(self._pending, (queued_job.scheduled_ts, next(self._sequence), queued_job))
+        
+        now_us = now_epoch_us()
+        while self._pending and self._pending[0][0] <= now_us:
+            _, _, queued_job = heapq.heappop(self._pending)
+            if queued_job.cancelled:
+                self._tombstones -= 1
+                continue
+            self._age_job(queued_job)
+            heapq.heappush(self._ready, queued_job)
+    
+    def _seconds_until_next_due(self) -> Optional[float]:
+        """Get seconds until the earliest pending job or wheel bucket becomes due (None if nothing is waiting)"""
+        delays = []
+        if self._pending:
+            delays.append((self._pending[0][0] - now_epoch_us()) / 1_000_000)
+        
+        wheel_expiry = self._timing_wheel.next_expiry()
+        if wheel_expiry is not None:
+            delays.append(wheel_expiry - time.time())
+        
+        if not delays:
+            return None
+        return max(min(delays), 0.0)
+    
+    async def get_next_ready_job(self) -> Optional[QueuedJob]:
+        """Get the next job ready for execution without waiting"""
+        async with self._queue_lock:
+            self._promote_due_jobs()
+            return self._pop_ready_job()
+    
+    async def _wait_for_ready_job(self) -> Optional[QueuedJob]:
+        """Wait until a job is due for execution, returns None when the queue is stopping or shrinking"""
+        async with self._queue_condition:
+            while not self._stop_event.is_set() and self._live_workers <= self.worker_count:
+                self._promote_due_jobs()
+                
+                queued_job = self._pop_ready_job()
+                if queued_job is not None:
+                    if self._ready:
+                        # Hand remaining due work to another waiting worker
+                        self._queue_condition.notify()
+                    return queued_job
+                
+                # Sleep until the earliest pending job is due or new work arrives
+                try:
+                    await asyncio.wait_for(self._queue_condition.wait(), self._seconds_until_next_due())
+                except asyncio.TimeoutError:
+                    pass
         
         return None
     
@@ -205,38 +779,122 @@ class TimezoneJobQueue:
         worker_logger.info(f"Worker {worker_id} started")
         
         while not self._stop_event.is_set():
+            if self._live_workers > self.worker_count:
+                # The autoscaler shrank the queue, retire this worker
+                self._live_workers -= 1
+                break
+            
             try:
-                # Check for ready jobs
-                queued_job = await self.get_next_ready_job()
+                # Wait for the next due job
+                queued_job = await self._wait_for_ready_job()
                 
                 if queued_job is None:
-                    # No ready jobs, wait a bit
-                    await asyncio.sleep(1)
                     continue
                 
-                # Acquire semaphore to limit concurrent executions
-                async with self._worker_semaphore:
-                    # Add to active jobs
-                    self._active_jobs[queued_job.execution_id] = queued_job
-                    
-                    try:
-                        # Execute the job
-                        await self._execute_job(queued_job, worker_id)
-                    finally:
-                        # Remove from active jobs
-                        if queued_job.execution_id in self._active_jobs:
-                            del self._active_jobs[queued_job.execution_id]
-                
+                await self.run_job(queued_job, worker_id)
+            
             except Exception as e:
                 worker_logger.error(f"Worker {worker_id} error: {str(e)}")
                 await asyncio.sleep(5)  # Wait before retrying
         
         worker_logger.info(f"Worker {worker_id} stopped")
     
-    async def _execute_job(self, queued_job: QueuedJob, worker_id: int):
+    async def run_job(self, queued_job: QueuedJob, worker_id: Union[int, str]):
+        """Run a dequeued job under this queue's concurrency limit (used by queue and shared engine workers)"""
+        # Acquire semaphore to limit concurrent executions
+        async with self._worker_semaphore:
+            execution_id = queued_job.execution_id
+            
+            # Run the execution as its own task so it can be cancelled without killing the worker
+            cancellation_token = CancellationToken()
+            execution_task = asyncio.create_task(
+                self._execute_job(queued_job, worker_id, cancellation_token)
+            )
+            self._active_jobs[execution_id] = queued_job
+            self._cancellation_tokens[execution_id] = cancellation_token
+            self._execution_tasks[execution_id] = execution_task
+            if self._journal is not None:
+                self._journal.record_dequeue(execution_id)
+            
+            try:
+                await asyncio.wait({execution_task})
+            finally:
+                # Remove from active jobs
+                self._active_jobs.pop(execution_id, None)
+                self._cancellation_tokens.pop(execution_id, None)
+                self._execution_tasks.pop(execution_id, None)
+                if self._journal is not None:
+                    self._journal.record_complete(execution_id)
+                self._concurrency_keys.release(execution_id)
+        
+        # A concurrency slot was freed, shared workers may be able to take more work
+        self._signal_work_available()
+    
+    def _spawn_worker(self):
+        """Start one more queue worker"""
+        self._workers = [task for task in self._workers if not task.done()]
+        self._workers.append(asyncio.create_task(self._worker_loop(self._next_worker_id)))
+        self._next_worker_id += 1
+        self._live_workers += 1
+    
+    async def resize(self, worker_count: int, max_concurrent_jobs: int):
+        """Change the number of workers and the concurrency limit while running"""
+        worker_count = max(worker_count, 1)
+        self.worker_count = worker_count
+        self.max_concurrent_jobs = max(max_concurrent_jobs, 1)
+        await self._worker_semaphore.set_limit(self.max_concurrent_jobs)
+        
+        if self.status == QueueStatus.RUNNING:
+            while self._live_workers < worker_count:
+                self._spawn_worker()
+        
+        # Idle surplus workers wake up and retire, busy ones retire after their current job
+        async with self._queue_condition:
+            self._queue_condition.notify_all()
+        self._signal_work_available()
+    
+    def get_wait_percentiles(self) -> Dict[str, float]:
+        """Get percentiles of due-to-start wait times over the last five to ten minutes (seconds)"""
+        return self._recent_waits.snapshot().to_dict()
+    
+    def get_latency_metrics(self) -> LatencyMetrics:
+        """Get the queue's latency histograms (live object, merge rather than modify)"""
+        return self._latency
+    
+    # Work stealing support for shared engine workers
+    def has_free_capacity(self) -> bool:
+        """Check if the queue can start another execution without exceeding max_concurrent_jobs"""
+        return self.status == QueueStatus.RUNNING and not self._worker_semaphore.locked()
+    
+    def get_ready_backlog(self) -> int:
+        """Get number of due jobs waiting for a worker"""
+        self._promote_due_jobs()
+        return len(self._ready)
+    
+    def seconds_until_next_due(self) -> Optional[float]:
+        """Get seconds until the next waiting job becomes due (None if nothing is waiting)"""
+        return self._seconds_until_next_due()
+    
+    async def steal_ready_job(self) -> Optional[QueuedJob]:
+        """Take a due job for a shared engine worker, only while the queue has spare concurrency"""
+        if not self.has_free_capacity():
+            return None
+        
+        async with self._queue_lock:
+            self._promote_due_jobs()
+            return self._pop_ready_job()
+    
+    def _signal_work_available(self):
+        """Notify shared engine workers that this queue may have work they can take"""
+        if self.work_available_callback is not None:
+            self.work_available_callback()
+    
+    async def _execute_job(self, queued_job: QueuedJob, worker_id: Union[int, str],
+                           cancellation_token: Optional[CancellationToken] = None):
         """Execute a single job"""
         job = queued_job.job
         execution_id = queued_job.execution_id
+        cancellation_token = cancellation_token or CancellationToken()
         
         # Create execution context
         context = ExecutionContext(
@@ -245,6 +903,12 @@ class TimezoneJobQueue:
             timezone=self.timezone_name,
             start_time=datetime.now(dt_timezone.utc)
         )
+        # Steps check the token cooperatively and register subprocesses to kill on cancel
+        context.cancellation_token = cancellation_token
+        # Steps run blocking calls through the shared pools instead of on the event loop
+        context.executors = get_executor_pool()
+        # Number of later occurrences this run stands in for
+        context.coalesced_runs = queued_job.coalesced_count
         
         # Create loggers
         job_logger = create_job_logger(job.job_id, execution_id, job.job_name, self.timezone_name)
@@ -258,6 +922,7 @@ class TimezoneJobQueue:
             timezone=self.timezone_name,
             start_time=context.start_time
         )
+        running_steps: List[ExecutionStep] = []
         
         try:
             # Log job start
@@ -266,36 +931,12 @@ class TimezoneJobQueue:
             
             self.system_logger.info(f"Worker {worker_id} executing job: {job.job_name} ({job.job_id})")
             
-            # Execute each step
-            for step_number, step_config in enumerate(job.steps, 1):
-                try:
-                    # Create step instance
-                    step = StepFactory.create_step(step_config)
-                    
-                    # Execute step
-                    step_result = await step.execute(context, job_logger, self.tz_logger)
-                    result.add_step_result(step_result)
-                    
-                    # Check if step failed and should stop execution
-                    if step_result.status.value in ["failed", "timeout", "cancelled"]:
-                        if not step_config.continue_on_failure:
-                            result.mark_completed(
-                                JobStatus.FAILED,
-                                f"Job failed at step {step_number}: {step_config.step_name}"
-                            )
-                            break
-                    
-                except Exception as step_error:
-                    error_msg = f"Step {step_number} ({step_config.step_name}) execution error: {str(step_error)}"
-                    self.system_logger.error(error_msg)
-                    
-                    # Create failed step result
-                    failed_step = result.step_results[-1] if result.step_results else None
-                    if failed_step:
-                        failed_step.mark_completed("failed", error_message=error_msg)
-                    
-                    if not step_config.continue_on_failure:
-                        result.mark_completed(JobStatus.FAILED, error_msg)
+            # Execute steps, as a dependency graph when steps declare depends_on
+            if uses_step_dependencies(job.steps):
+                await self._execute_step_graph(job, context, job_logger, result, running_steps)
+            else:
+                for step_number, step_config in enumerate(job.steps, 1):
+                    if await self._run_step(step_number, step_config, context, job_logger, result, running_steps):
                         break
             
             # Determine final job status
@@ -332,14 +973,37 @@ class TimezoneJobQueue:
             job_logger.log_execution_completion(result)
             
             # Save execution result to database for history
-            self._save_execution_to_database(job, execution_id, result)
+            await self._save_execution_to_database(job, execution_id, result)
             
             self.system_logger.info(
                 f"Job completed: {job.job_name} ({job.job_id}) - "
                 f"Status: {result.status.value}, "
                 f"Duration: {result.duration_seconds:.2f}s"
             )
+        
+        except asyncio.CancelledError:
+            reason = cancellation_token.reason or "Execution cancelled"
+            
+            # Give running steps a chance to release external resources such as subprocesses
+            for step in running_steps:
+                if not hasattr(step, 'cancel'):
+                    continue
+                try:
+                    await step.cancel()
+                except Exception as cancel_error:
+                    self.system_logger.error(f"Step cancel error for {execution_id}: {str(cancel_error)}")
             
+            result.mark_completed(JobStatus.CANCELLED, reason)
+            
+            self.tz_logger.log_warning(job.job_id, execution_id, reason)
+            job_logger.log_execution_completion(result)
+            await self._save_execution_to_database(job, execution_id, result)
+            
+            self._total_jobs_processed += 1
+            self._cancelled_jobs += 1
+            
+            self.system_logger.info(f"Job cancelled: {job.job_name} ({job.job_id}) - {reason}")
+        
         except Exception as e:
             error_msg = f"Job execution error: {str(e)}"
             self.system_logger.error(error_msg)
@@ -351,6 +1015,108 @@ class TimezoneJobQueue:
             
             self._total_jobs_processed += 1
             self._failed_jobs += 1
+        
+        finally:
+            self._latency.record(
+                END_TO_END, max(time.time() - queued_job.get_ready_timestamp(), 0.0), get_job_type(job)
+            )
+            
+            # Wake anyone awaiting this execution
+            queued_job.resolve(result)
+    
+    async def _run_step(self, step_number: int, step_config: Any, context: ExecutionContext,
+                        job_logger: JobLogger, result: JobExecutionResult,
+                        running_steps: List[ExecutionStep]) -> bool:
+        """Execute a single step and record its result, returns True if the job must stop"""
+        step = None
+        step_start_time = datetime.now(dt_timezone.utc)
+        try:
+            # Create step instance
+            step = StepFactory.create_step(step_config)
+            running_steps.append(step)
+            
+            # Execute step
+            step_result = await step.execute(context, job_logger, self.tz_logger)
+            result.add_step_result(step_result)
+            self._latency.record(STEP_DURATION, step_result.duration_seconds or 0.0, step_result.step_type)
+            
+            # Check if step failed and should stop execution
+            if step_result.status.value in ["failed", "timeout", "cancelled"]:
+                if not step_config.continue_on_failure:
+                    if result.status == JobStatus.RUNNING:
+                        result.mark_completed(
+                            JobStatus.FAILED,
+                            f"Job failed at step {step_number}: {step_config.step_name}"
+                        )
+                    return True
+        
+        except Exception as step_error:
+            error_msg = f"Step {step_number} ({step_config.step_name}) execution error: {str(step_error)}"
+            self.system_logger.error(error_msg)
+            
+            # Record a failed result for this step (the last recorded result may belong to a concurrent sibling)
+            failed_step = StepExecutionResult(
+                step_id=step_config.step_id,
+                step_name=step_config.step_name,
+                step_type=step_config.step_type,
+                status=StepStatus.RUNNING,
+                start_time=step_start_time
+            )
+            failed_step.mark_completed("failed", error_message=error_msg)
+            result.add_step_result(failed_step)
+            
+            if not step_config.continue_on_failure:
+                if result.status == JobStatus.RUNNING:
+                    result.mark_completed(JobStatus.FAILED, error_msg)
+                return True
+        
+        # Cancelled steps stay registered so the cancellation handler can call their cancel()
+        if step in running_steps:
+            running_steps.remove(step)
+        return False
+    
+    async def _execute_step_graph(self, job: JobDefinition, context: ExecutionContext, job_logger: JobLogger,
+                                  result: JobExecutionResult, running_steps: List[ExecutionStep]):
+        """Run steps as a dependency graph, independent steps concurrently up to the job's parallelism limit"""
+        try:
+            graph = StepGraph(job.steps)
+        except StepGraphError as e:
+            result.mark_completed(JobStatus.FAILED, f"Invalid step dependencies: {str(e)}")
+            return
+        
+        metadata = getattr(job, 'metadata', None) or {}
+        max_parallel_steps = max(1, int(metadata.get('max_parallel_steps', self.DEFAULT_MAX_PARALLEL_STEPS)))
+        
+        waiting_steps = deque(graph.get_initial_steps())
+        in_flight: Dict[asyncio.Task, str] = {}
+        stop_launching = False
+        
+        try:
+            while waiting_steps or in_flight:
+                # Launch released steps up to the parallelism limit, nothing new after a blocking failure
+                while waiting_steps and not stop_launching and len(in_flight) < max_parallel_steps:
+                    step_id = waiting_steps.popleft()
+                    step_task = asyncio.create_task(self._run_step(
+                        graph.step_numbers[step_id], graph.steps[step_id],
+                        context, job_logger, result, running_steps
+                    ))
+                    in_flight[step_task] = step_id
+                
+                if not in_flight:
+                    break
+                
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for step_task in done:
+                    step_id = in_flight.pop(step_task)
+                    if step_task.result():
+                        stop_launching = True
+                    waiting_steps.extend(graph.mark_completed(step_id))
+        finally:
+            # Execution cancelled, interrupt steps that are still running
+            for step_task in in_flight:
+                step_task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
     
     async def _monitor_loop(self):
         """Monitor queue performance and log metrics"""
@@ -370,28 +1136,35 @@ class TimezoneJobQueue:
                 
                 # Log queue status every minute
                 async with self._queue_lock:
-                    queue_depth = len(self._queue)
+                    queue_depth = self._queue_depth()
                 
                 active_count = len(self._active_jobs)
                 avg_wait_time = self._calculate_average_wait_time()
                 
                 self.tz_logger.log_queue_status(queue_depth, active_count, avg_wait_time)
                 
-                await asyncio.sleep(60)  # Check every minute
-                
+                await self._wait_for_stop(60)  # Check every minute
+            
             except Exception as e:
                 monitor_logger.error(f"Monitor error: {str(e)}")
-                await asyncio.sleep(60)
+                await self._wait_for_stop(60)
         
         monitor_logger.info("Queue monitor stopped")
     
+    async def _wait_for_stop(self, timeout: float):
+        """Sleep for up to timeout seconds, returning early when the queue is stopping"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
     def _calculate_average_wait_time(self) -> float:
         """Calculate average wait time for jobs in queue"""
-        if not self._queue:
+        queue_depth = self._queue_depth()
+        if queue_depth == 0:
             return 0.0
         
-        total_wait_time = sum(job.get_wait_time() for job in self._queue)
-        return total_wait_time / len(self._queue)
+        return (now_epoch_us() - self._queued_ts_sum / queue_depth) / 1_000_000
     
     async def _log_performance_metrics(self):
         """Log performance metrics"""
@@ -410,9 +1183,8 @@ class TimezoneJobQueue:
             jobs_per_hour = 0
         
         # Get memory usage (approximate)
-        import psutil
-        process = psutil.Process()
-        memory_usage = process.memory_info().rss // (1024 * 1024)  # MB
+        process_metrics = await get_executor_pool().run(ExecutorCategory.IO, get_process_metrics)
+        memory_usage = process_metrics["memory_mb"]
         
         self.tz_logger.log_performance_metrics(
             jobs_per_hour=jobs_per_hour,
@@ -435,15 +1207,40 @@ class TimezoneJobQueue:
         return {
             "timezone": self.timezone_name,
             "status": self.status.value,
-            "queue_size": len(self._queue),
+            "queue_size": self._queue_depth(),
             "active_executions": len(self._active_jobs),
-            "worker_count": len([w for w in self._workers if not w.done()]),
+            "worker_count": self._live_workers,
+            "target_worker_count": self.worker_count,
             "max_concurrent_jobs": self.max_concurrent_jobs,
+            "scheduled_in_wheel": len(self._timing_wheel),
+            "waiting_on_concurrency_keys": {key: len(parked) for key, parked in self._key_blocked.items()},
+            "rate_limited_jobs": self._rate_limited_jobs,
+            "deferred_by_rate_limit": len(self._rate_reserved),
+            "max_queue_depth": self.max_queue_depth,
+            "overflow_policy": self.overflow_policy.value,
+            "rejected_jobs": self._rejected_jobs,
+            "shed_jobs": self._shed_jobs,
+            "coalesced_jobs": self._coalesced_jobs,
             "total_processed": self._total_jobs_processed,
             "successful_jobs": self._successful_jobs,
             "failed_jobs": self._failed_jobs,
+            "cancelled_jobs": self._cancelled_jobs,
             "success_rate": (self._successful_jobs / self._total_jobs_processed * 100) if self._total_jobs_processed > 0 else 0,
-            "avg_execution_time": (self._total_execution_time / self._total_jobs_processed) if self._total_jobs_processed > 0 else 0
+            "avg_execution_time": (self._total_execution_time / self._total_jobs_processed) if self._total_jobs_processed > 0 else 0,
+            "aging_priority_per_minute": self.aging_priority_per_minute,
+            "priority_band_wait": self.get_priority_band_wait_stats(),
+            "wait_percentiles": self.get_wait_percentiles()
+        }
+    
+    def get_priority_band_wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get wait time from due to start per priority band (seconds)"""
+        return {
+            band: {
+                "dequeued": stats["dequeued"],
+                "avg_wait": stats["total_wait"] / stats["dequeued"] if stats["dequeued"] else 0.0,
+                "max_wait": stats["max_wait"]
+            }
+            for band, stats in self._band_wait_stats.items()
         }
     
     def get_active_jobs(self) -> List[Dict[str, Any]]:
@@ -459,8 +1256,37 @@ class TimezoneJobQueue:
             for execution_id, queued_job in self._active_jobs.items()
         ]
     
-    def get_queued_jobs(self) -> List[Dict[str, Any]]:
-        """Get list of jobs waiting in queue"""
+    def get_queued_jobs(self, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        Get list of jobs waiting in queue in execution order
+        
+        Args:
+            limit: Maximum number of jobs to return (None for all)
+        """
+        if limit is None:
+            limit = len(self._entries)
+        
+        # Ready jobs run first, then jobs waiting on a concurrency key, then pending and wheel jobs by scheduled time
+        ordered_jobs = heapq.nsmallest(limit, (job for job in self._ready if not job.cancelled))
+        if len(ordered_jobs) < limit:
+            ordered_jobs += heapq.nsmallest(
+                limit - len(ordered_jobs),
+                (job for parked in self._key_blocked.values() for job in parked if not job.cancelled)
+            )
+        if len(ordered_jobs) < limit:
+            ordered_jobs += [
+                entry[2] for entry in heapq.nsmallest(
+                    limit - len(ordered_jobs),
+                    (entry for entry in self._pending if not entry[2].cancelled)
+                )
+            ]
+        if len(ordered_jobs) < limit:
+            ordered_jobs += heapq.nsmallest(
+                limit - len(ordered_jobs),
+                self._timing_wheel.items(),
+                key=lambda queued_job: queued_job.scheduled_ts
+            )
+        
         return [
             {
                 "execution_id": queued_job.execution_id,
@@ -468,32 +1294,121 @@ class TimezoneJobQueue:
                 "job_name": queued_job.job.job_name,
                 "scheduled_time": queued_job.scheduled_time.isoformat(),
                 "priority": queued_job.priority,
+                "effective_priority": self._get_effective_priority(queued_job),
+                "coalesced_count": queued_job.coalesced_count,
                 "wait_time": queued_job.get_wait_time()
             }
-            for queued_job in sorted(self._queue)
+            for queued_job in ordered_jobs
         ]
     
     async def cancel_job(self, execution_id: str) -> bool:
         """Cancel a queued or active job"""
         # Check active jobs first
         if execution_id in self._active_jobs:
-            # For active jobs, we can only mark them for cancellation
-            # The actual cancellation depends on step implementation
-            queued_job = self._active_jobs[execution_id]
-            self.system_logger.warning(f"Attempted to cancel active job: {execution_id}")
-            return False  # Cannot cancel active jobs in this implementation
+            return self._cancel_active_job(execution_id)
         
-        # Remove from queue
         async with self._queue_lock:
-            original_queue = list(self._queue)
-            self._queue = [job for job in original_queue if job.execution_id != execution_id]
-            heapq.heapify(self._queue)
-            
-            if len(self._queue) < len(original_queue):
-                self.system_logger.info(f"Cancelled queued job: {execution_id}")
-                return True
+            cancelled = self._cancel_queued_job(execution_id)
         
-        return False
+        if cancelled:
+            self.system_logger.info(f"Cancelled queued job: {execution_id}")
+        return cancelled
+    
+    def get_completion_future(self, execution_id: str) -> Optional[asyncio.Future]:
+        """Get the completion future of a queued or active execution (None if unknown or finished)"""
+        queued_job = self._entries.get(execution_id) or self._active_jobs.get(execution_id)
+        if queued_job is None:
+            return None
+        return queued_job.get_completion_future()
+    
+    async def wait_for_job(self, execution_id: str, timeout: Optional[float] = None) -> JobExecutionResult:
+        """
+        Wait for a queued or active execution to finish
+        
+        Args:
+            execution_id: Execution to wait for
+            timeout: Seconds to wait (None waits indefinitely)
+        
+        Returns:
+            Job execution result
+        
+        Raises:
+            KeyError: If the execution is not queued or active
+            asyncio.TimeoutError: If the timeout expires first
+        """
+        completion_future = self.get_completion_future(execution_id)
+        if completion_future is None:
+            raise KeyError(f"Execution not found in queue: {execution_id}")
+        
+        # Shield so a timed out waiter does not cancel the future for other waiters
+        return await asyncio.wait_for(asyncio.shield(completion_future), timeout)
+    
+    async def cancel_jobs_by_job_id(self, job_id: str) -> int:
+        """Cancel every queued occurrence of a job, returns the number cancelled"""
+        async with self._queue_lock:
+            execution_ids = list(self._job_index.get(job_id, ()))
+            cancelled_count = sum(1 for execution_id in execution_ids if self._cancel_queued_job(execution_id))
+        
+        if cancelled_count:
+            self.system_logger.info(f"Cancelled {cancelled_count} queued executions of job {job_id}")
+        return cancelled_count
+    
+    async def cancel_jobs_where(self, predicate: Callable[[QueuedJob], bool]) -> int:
+        """Cancel every queued job matching the predicate, returns the number cancelled"""
+        async with self._queue_lock:
+            execution_ids = [
+                execution_id for execution_id, queued_job in self._entries.items()
+                if predicate(queued_job)
+            ]
+            cancelled_count = sum(1 for execution_id in execution_ids if self._cancel_queued_job(execution_id))
+        
+        if cancelled_count:
+            self.system_logger.info(f"Cancelled {cancelled_count} queued executions matching predicate")
+        return cancelled_count
+    
+    def _cancel_active_job(self, execution_id: str, reason: str = "Cancelled by operator") -> bool:
+        """Signal the execution's token and cancel its task so the worker slot is freed"""
+        cancellation_token = self._cancellation_tokens.get(execution_id)
+        execution_task = self._execution_tasks.get(execution_id)
+        if cancellation_token is None or execution_task is None or execution_task.done():
+            return False
+        
+        # The token kills registered subprocesses, the task cancel interrupts the awaiting step
+        cancellation_token.cancel(reason)
+        execution_task.cancel()
+        
+        self.system_logger.warning(f"Cancelling active job: {execution_id} ({reason})")
+        return True
+    
+    def _cancel_queued_job(self, execution_id: str, reason: str = "Cancelled before execution started") -> bool:
+        """Cancel a waiting job in O(1) (queue lock must be held)"""
+        queued_job = self._entries.get(execution_id)
+        if queued_job is None:
+            return False
+        
+        self._discard_entry(queued_job)
+        if self._journal is not None:
+            self._journal.record_complete(execution_id)
+        if queued_job.completion_future is not None:
+            cancelled_result = JobExecutionResult(
+                execution_id=execution_id,
+                job_id=queued_job.job.job_id,
+                job_name=queued_job.job.job_name,
+                status=JobStatus.RUNNING,
+                timezone=self.timezone_name,
+                start_time=datetime.now(dt_timezone.utc)
+            )
+            cancelled_result.mark_completed(JobStatus.CANCELLED, reason)
+            queued_job.resolve(cancelled_result)
+        
+        if self._timing_wheel.remove(execution_id) is None:
+            # Job sits in the pending or ready heap, leave a tombstone for lazy removal
+            queued_job.cancelled = True
+            self._tombstones += 1
+            if self._tombstones > 64 and self._tombstones * 2 > len(self._pending) + len(self._ready):
+                self._compact_heaps()
+        
+        return True
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get detailed performance summary"""
@@ -507,20 +1422,21 @@ class TimezoneJobQueue:
             "total_jobs_processed": self._total_jobs_processed,
             "successful_jobs": self._successful_jobs,
             "failed_jobs": self._failed_jobs,
+            "cancelled_jobs": self._cancelled_jobs,
             "success_rate": (self._successful_jobs / self._total_jobs_processed * 100) if self._total_jobs_processed > 0 else 0,
             "total_execution_time": self._total_execution_time,
             "average_execution_time": (self._total_execution_time / self._total_jobs_processed) if self._total_jobs_processed > 0 else 0,
             "jobs_per_hour": (self._total_jobs_processed / (runtime / 3600)) if runtime > 0 else 0,
-            "current_queue_size": len(self._queue),
+            "current_queue_size": self._queue_depth(),
             "current_active_jobs": len(self._active_jobs),
-            "max_concurrent_jobs": self.max_concurrent_jobs
+            "max_concurrent_jobs": self.max_concurrent_jobs,
+            "journal": self._journal.get_stats() if self._journal is not None else None,
+            "latency": self._latency.get_summary()
         }
     
-    def _save_execution_to_database(self, job: JobDefinition, execution_id: str, result: JobExecutionResult):
-        """Save execution result to database for history tracking"""
+    async def _save_execution_to_database(self, job: JobDefinition, execution_id: str, result: JobExecutionResult):
+        """Queue execution result for batched database write (history tracking)"""
         try:
-            self.system_logger.info(f"Starting database save for execution: {execution_id}")
-            from database.sqlalchemy_models import JobExecutionHistory, get_db_session
             import json
             
             # Prepare execution metadata
@@ -555,31 +1471,26 @@ class TimezoneJobQueue:
             
             output_summary = "\n".join(output_lines)[:1000]  # Limit to 1000 chars
             
-            # Create database record
-            self.system_logger.info(f"Creating database record for: {job.job_name} ({job.job_id})")
-            with get_db_session() as session:
-                execution_record = JobExecutionHistory(
-                    job_id=job.job_id,
-                    job_name=job.job_name,
-                    status=result.status.value.upper(),
-                    start_time=result.start_time,
-                    end_time=result.end_time,
-                    duration_seconds=result.duration_seconds,
-                    output=output_summary,
-                    error_message=result.error_message,
-                    return_code=0 if result.status.value == "success" else 1,
-                    retry_count=0,  # V2 doesn't support retries at job level yet
-                    max_retries=job.max_retries,
-                    execution_metadata=json.dumps(metadata)
-                )
-                
-                session.add(execution_record)
-                session.commit()
-                
-                self.system_logger.info(f"Saved execution history to database: {execution_id}")
-                
+            # Hand the record to the write-behind buffer, waits only when the buffer is full
+            await self._history_writer.submit({
+                "job_id": job.job_id,
+                "job_name": job.job_name,
+                "status": result.status.value.upper(),
+                "start_time": result.start_time,
+                "end_time": result.end_time,
+                "duration_seconds": result.duration_seconds,
+                "output": output_summary,
+                "error_message": result.error_message,
+                "return_code": 0 if result.status.value == "success" else 1,
+                "retry_count": 0,  # V2 doesn't support retries at job level yet
+                "max_retries": job.max_retries,
+                "execution_metadata": json.dumps(metadata)
+            })
+            
+            self.system_logger.debug(f"Queued execution history for database: {execution_id}")
+        
         except Exception as e:
-            self.system_logger.error(f"Failed to save execution history to database: {str(e)}")
+            self.system_logger.error(f"Failed to queue execution history for database: {str(e)}")
             import traceback
             self.system_logger.error(f"Database save traceback: {traceback.format_exc()}")
             # Don't raise the exception - database logging is not critical for job execution
\ No newline at end of file
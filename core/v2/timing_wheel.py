@@ -0,0 +1,196 @@
+"""
+Hierarchical timing wheel for Job Scheduler V2
+Holds far-future job occurrences in second/minute/hour/day buckets so they stay out of the hot queue heap
+"""
+
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class HierarchicalTimingWheel:
+    """
+    Hashed hierarchical timing wheel with O(1) insert and cancel.
+    
+    Entries are placed in the coarsest level needed to hold their due time and
+    cascade down to finer levels as their bucket comes due. Entries due beyond
+    the day level span are parked in an overflow bucket that is revisited on
+    every day boundary.
+    """
+    
+    # (name, tick resolution in seconds, slot count)
+    LEVELS: Tuple[Tuple[str, int, int], ...] = (
+        ("seconds", 1, 60),
+        ("minutes", 60, 60),
+        ("hours", 3600, 24),
+        ("days", 86400, 366),
+    )
+    
+    def __init__(self, start_time: float):
+        self._current_tick = int(start_time)
+        self._slots: List[List[Dict[Hashable, Tuple[float, Any]]]] = [
+            [{} for _ in range(slot_count)] for _, _, slot_count in self.LEVELS
+        ]
+        self._level_counts = [0] * len(self.LEVELS)
+        self._overflow: Dict[Hashable, Tuple[float, Any]] = {}
+        
+        # key -> (level index, slot index); level index len(LEVELS) means overflow
+        self._locations: Dict[Hashable, Tuple[int, int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._locations)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locations
+    
+    def add(self, key: Hashable, due_time: float, item: Any) -> bool:
+        """
+        Add an entry to the wheel
+        
+        Args:
+            key: Unique key used for cancellation
+            due_time: Epoch seconds when the entry becomes due
+            item: Payload returned by advance()
+        
+        Returns:
+            False if the entry is already due and was not added
+        """
+        if key in self._locations:
+            self.remove(key)
+        return self._place(key, due_time, item)
+    
+    def remove(self, key: Hashable) -> Optional[Any]:
+        """Remove an entry by key, returns its payload or None if not present"""
+        location = self._locations.pop(key, None)
+        if location is None:
+            return None
+        
+        level, slot = location
+        if level == len(self.LEVELS):
+            _, item = self._overflow.pop(key)
+        else:
+            _, item = self._slots[level][slot].pop(key)
+            self._level_counts[level] -= 1
+        return item
+    
+    def advance(self, now: float) -> List[Any]:
+        """
+        Advance the wheel to the given time
+        
+        Returns:
+            Payloads of all entries whose second bucket has come due
+        """
+        target_tick = int(now)
+        expired: List[Any] = []
+        
+        while self._current_tick < target_tick:
+            lowest_level = self._lowest_occupied_level()
+            if lowest_level is None:
+                # Nothing scheduled, jump straight to the target
+                self._current_tick = target_tick
+                break
+            
+            # Finer levels are empty so skip straight to the next boundary that matters
+            resolution = self._resolution(lowest_level)
+            next_boundary = (self._current_tick // resolution + 1) * resolution
+            self._current_tick = min(next_boundary, target_tick)
+            self._process_tick(self._current_tick, expired)
+        
+        return expired
+    
+    def next_expiry(self) -> Optional[float]:
+        """Get epoch seconds of the next bucket that needs processing (None if empty)"""
+        earliest: Optional[int] = None
+        
+        for level, (_, resolution, slot_count) in enumerate(self.LEVELS):
+            if self._level_counts[level] == 0:
+                continue
+            base = self._current_tick // resolution
+            for offset in range(1, slot_count + 1):
+                if self._slots[level][(base + offset) % slot_count]:
+                    boundary = (base + offset) * resolution
+                    if earliest is None or boundary < earliest:
+                        earliest = boundary
+                    break
+        
+        if self._overflow:
+            day_resolution = self._resolution(len(self.LEVELS) - 1)
+            boundary = (self._current_tick // day_resolution + 1) * day_resolution
+            if earliest is None or boundary < earliest:
+                earliest = boundary
+        
+        return float(earliest) if earliest is not None else None
+    
+    def items(self) -> Iterator[Any]:
+        """Iterate over all payloads in the wheel without ordering"""
+        for level_slots in self._slots:
+            for slot in level_slots:
+                for _, item in slot.values():
+                    yield item
+        for _, item in self._overflow.values():
+            yield item
+    
+    def get_level_sizes(self) -> Dict[str, int]:
+        """Get number of entries held at each level"""
+        sizes = {name: self._level_counts[level] for level, (name, _, _) in enumerate(self.LEVELS)}
+        sizes["overflow"] = len(self._overflow)
+        return sizes
+    
+    def _resolution(self, level: int) -> int:
+        """Get tick resolution of a level (overflow uses the day resolution)"""
+        return self.LEVELS[min(level, len(self.LEVELS) - 1)][1]
+    
+    def _lowest_occupied_level(self) -> Optional[int]:
+        """Get index of the finest level holding entries"""
+        for level, count in enumerate(self._level_counts):
+            if count:
+                return level
+        if self._overflow:
+            return len(self.LEVELS)
+        return None
+    
+    def _place(self, key: Hashable, due_time: float, item: Any) -> bool:
+        """Place an entry relative to the current tick"""
+        due_tick = int(due_time)
+        if due_tick <= self._current_tick:
+            return False
+        
+        for level, (_, resolution, slot_count) in enumerate(self.LEVELS):
+            if due_tick // resolution - self._current_tick // resolution < slot_count:
+                slot = (due_tick // resolution) % slot_count
+                self._slots[level][slot][key] = (due_time, item)
+                self._level_counts[level] += 1
+                self._locations[key] = (level, slot)
+                return True
+        
+        self._overflow[key] = (due_time, item)
+        self._locations[key] = (len(self.LEVELS), 0)
+        return True
+    
+    def _process_tick(self, tick: int, expired: List[Any]):
+        """Cascade coarse buckets whose boundary is this tick and expire the current second bucket"""
+        day_resolution = self._resolution(len(self.LEVELS) - 1)
+        if self._overflow and tick % day_resolution == 0:
+            self._cascade(self._overflow, expired)
+        
+        for level in range(len(self.LEVELS) - 1, 0, -1):
+            _, resolution, slot_count = self.LEVELS[level]
+            if tick % resolution == 0 and self._level_counts[level]:
+                slot = self._slots[level][(tick // resolution) % slot_count]
+                self._level_counts[level] -= len(slot)
+                self._cascade(slot, expired)
+        
+        second_slot = self._slots[0][tick % self.LEVELS[0][2]]
+        if second_slot:
+            self._level_counts[0] -= len(second_slot)
+            for key, (_, item) in second_slot.items():
+                del self._locations[key]
+                expired.append(item)
+            second_slot.clear()
+    
+    def _cascade(self, bucket: Dict[Hashable, Tuple[float, Any]], expired: List[Any]):
+        """Re-place entries of a bucket into finer levels"""
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, (due_time, item) in entries:
+            del self._locations[key]
+            if not self._place(key, due_time, item):
+                expired.append(item)
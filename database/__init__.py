@@ -3,6 +3,6 @@ Database package for Windows Job Scheduler
 SQLAlchemy-based implementation
 """
 
-from .sqlalchemy_models import JobConfigurationV2, JobExecutionHistoryV2, DatabaseEngine, init_database, get_db_session
+from .sqlalchemy_models import JobConfigurationV2, JobExecutionHistoryV2, SchedulerLease, DatabaseEngine, init_database, get_db_session
 
-__all__ = ['JobConfigurationV2', 'JobExecutionHistoryV2', 'DatabaseEngine', 'init_database', 'get_db_session']
\ No newline at end of file
+__all__ = ['JobConfigurationV2', 'JobExecutionHistoryV2', 'SchedulerLease', 'DatabaseEngine', 'init_database', 'get_db_session']
\ No newline at end of file
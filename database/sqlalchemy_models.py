@@ -10,7 +10,7 @@ from sqlalchemy import (
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
 
@@ -20,6 +20,11 @@ load_dotenv()
 Base = declarative_base()
 
 
+def utc_now() -> datetime:
+    """Current time as naive UTC, the one clock modified_date is stamped with (the scheduler syncs by it)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 
 
 
@@ -125,7 +130,7 @@ class JobConfigurationV2(Base):
     # Metadata
     enabled = Column(Boolean, default=True)
     created_date = Column(DateTime, default=func.now())
-    modified_date = Column(DateTime, default=func.now(), onupdate=func.now())
+    modified_date = Column(DateTime, default=utc_now, onupdate=utc_now)
     created_by = Column(String(255), default='system')
     
     # Execution tracking
@@ -147,6 +152,7 @@ class JobConfigurationV2(Base):
         Index('ix_job_configurations_v2_created_date', 'created_date'),
         Index('ix_job_configurations_v2_last_execution_status', 'last_execution_status'),
         Index('ix_job_configurations_v2_next_scheduled_time', 'next_scheduled_time'),
+        Index('ix_job_configurations_v2_modified_date', 'modified_date'),
     )
     
     def to_dict(self):
@@ -247,6 +253,36 @@ class JobExecutionHistoryV2(Base):
         }
 
 
+
+class SchedulerLease(Base):
+    """Time-bound ownership of a scheduler resource, shared by all scheduler nodes"""
+    __tablename__ = 'scheduler_leases'
+    
+    # node:<node_id> (membership heartbeat), shard:<n> (job_id hash bucket) or leader:<group> (active SchedulerManager)
+    lease_name = Column(String(100), primary_key=True)
+    
+    # Ownership, times come from the database clock (UTC) so nodes never compare their own clocks
+    owner_id = Column(String(100))  # Node holding the lease, NULL when released
+    expires_at = Column(DateTime)
+    acquired_at = Column(DateTime)
+    renewed_at = Column(DateTime)
+    fencing_token = Column(Integer, default=0)  # Incremented every time the lease changes owner
+    
+    __table_args__ = (
+        Index('ix_scheduler_leases_owner_id', 'owner_id'),
+    )
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'lease_name': self.lease_name,
+            'owner_id': self.owner_id,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None,
+            'renewed_at': self.renewed_at.isoformat() if self.renewed_at else None,
+            'fencing_token': self.fencing_token
+        }
+
 # Global database engine instance
 database_engine = DatabaseEngine()
 
@@ -50,6 +50,12 @@ BEGIN
     PRINT '  - Dropped existing agent_registry'
 END
 
+IF EXISTS (SELECT * FROM sysobjects WHERE name='scheduler_leases' AND xtype='U')
+BEGIN
+    DROP TABLE [dbo].[scheduler_leases]
+    PRINT '  - Dropped existing scheduler_leases'
+END
+
 IF EXISTS (SELECT * FROM sysobjects WHERE name='user_connections' AND xtype='U')
 BEGIN
     DROP TABLE [dbo].[user_connections]
@@ -272,8 +278,9 @@ CREATE INDEX IX_job_configurations_v2_last_execution_status ON [dbo].[job_config
 CREATE INDEX IX_job_configurations_v2_next_scheduled_time ON [dbo].[job_configurations_v2]([next_scheduled_time])
 CREATE INDEX IX_job_configurations_v2_version ON [dbo].[job_configurations_v2]([version])
 CREATE INDEX IX_job_configurations_v2_last_execution_time ON [dbo].[job_configurations_v2]([last_execution_time])
+CREATE INDEX IX_job_configurations_v2_modified_date ON [dbo].[job_configurations_v2]([modified_date])
 
-PRINT '  - job_configurations_v2 table created with 7 performance indexes'
+PRINT '  - job_configurations_v2 table created with 8 performance indexes'
 GO
 
 -- =============================================
@@ -355,6 +362,29 @@ ON DELETE NO ACTION
 PRINT '  - job_execution_history_v2 table created with 11 indexes and 3 foreign keys'
 GO
 
+-- =============================================
+-- STEP 4.5: Create scheduler_leases table (Multi-node Scheduling)
+-- =============================================
+PRINT 'Step 4.5: Creating scheduler_leases table...'
+
+CREATE TABLE [dbo].[scheduler_leases] (
+    -- Lease identification: node:<node_id> (membership), shard:<n> (job_id hash shard) or leader:<group> (active scheduler)
+    [lease_name] NVARCHAR(100) PRIMARY KEY,
+    
+    -- Ownership (times from the database clock, UTC)
+    [owner_id] NVARCHAR(100) NULL,           -- Scheduler node holding the lease, NULL when released
+    [expires_at] DATETIME NULL,
+    [acquired_at] DATETIME NULL,
+    [renewed_at] DATETIME NULL,
+    [fencing_token] INT DEFAULT 0            -- Incremented every time the lease changes owner
+)
+
+-- Create indexes for scheduler_leases
+CREATE INDEX IX_scheduler_leases_owner_id ON [dbo].[scheduler_leases]([owner_id])
+
+PRINT '  - scheduler_leases table created with 1 index'
+GO
+
 -- =============================================
 -- STEP 5: Insert default connection configurations
 -- =============================================
@@ -707,12 +737,14 @@ GO
 GRANT SELECT ON [dbo].[job_configurations_v2] TO job_scheduler_readers
 GRANT SELECT ON [dbo].[job_execution_history_v2] TO job_scheduler_readers
 GRANT SELECT ON [dbo].[user_connections] TO job_scheduler_readers
+GRANT SELECT ON [dbo].[scheduler_leases] TO job_scheduler_readers
 GRANT SELECT ON [dbo].[vw_job_summary] TO job_scheduler_readers
 GRANT SELECT ON [dbo].[vw_execution_history] TO job_scheduler_readers
 
 GRANT SELECT, INSERT, UPDATE, DELETE ON [dbo].[job_configurations_v2] TO job_scheduler_writers
 GRANT SELECT, INSERT, UPDATE, DELETE ON [dbo].[job_execution_history_v2] TO job_scheduler_writers
 GRANT SELECT, INSERT, UPDATE, DELETE ON [dbo].[user_connections] TO job_scheduler_writers
+GRANT SELECT, INSERT, UPDATE, DELETE ON [dbo].[scheduler_leases] TO job_scheduler_writers
 GRANT EXECUTE ON [dbo].[sp_cleanup_execution_history] TO job_scheduler_writers
 GRANT EXECUTE ON [dbo].[sp_update_job_statistics] TO job_scheduler_writers
 
@@ -729,15 +761,15 @@ DECLARE @table_count INT
 SELECT @table_count = COUNT(*)
 FROM INFORMATION_SCHEMA.TABLES 
 WHERE TABLE_TYPE = 'BASE TABLE' 
-AND TABLE_NAME IN ('user_connections', 'agent_registry', 'agent_job_assignments', 'job_configurations_v2', 'job_execution_history_v2')
+AND TABLE_NAME IN ('user_connections', 'agent_registry', 'agent_job_assignments', 'job_configurations_v2', 'job_execution_history_v2', 'scheduler_leases')
 
-IF @table_count = 5
+IF @table_count = 6
 BEGIN
-    PRINT '  ✓ All 5 required tables created successfully'
+    PRINT '  ✓ All 6 required tables created successfully'
 END
 ELSE
 BEGIN
-    PRINT '  ✗ ERROR: Missing tables! Expected 5, found ' + CAST(@table_count AS NVARCHAR(10))
+    PRINT '  ✗ ERROR: Missing tables! Expected 6, found ' + CAST(@table_count AS NVARCHAR(10))
 END
 
 -- Check indexes
@@ -762,6 +794,8 @@ UNION ALL
 SELECT 'job_configurations_v2', COUNT(*) FROM [dbo].[job_configurations_v2]
 UNION ALL
 SELECT 'job_execution_history_v2', COUNT(*) FROM [dbo].[job_execution_history_v2]
+UNION ALL
+SELECT 'scheduler_leases', COUNT(*) FROM [dbo].[scheduler_leases]
 
 -- Display final summary
 PRINT ''
@@ -780,6 +814,7 @@ PRINT '  ✓ agent_registry (8 indexes) [Agent Management]'
 PRINT '  ✓ agent_job_assignments (6 indexes + 1 FK) [Job Assignment Tracking]'
 PRINT '  ✓ job_configurations_v2 (7 indexes) [V2 Schema]'
 PRINT '  ✓ job_execution_history_v2 (11 indexes + 3 FKs) [V2 Schema + Agent Support]'
+PRINT '  ✓ scheduler_leases (1 index) [Multi-node Scheduling]'
 PRINT ''
 PRINT 'INITIAL DATA:'
 PRINT '  ✓ 3 default database connections'
@@ -0,0 +1,84 @@
+"""
+Memory benchmark for waiting entries of a TimezoneJobQueue
+
+Places N occurrences of a fixed set of job definitions directly with
+_place_job() (no workers, journal or history) and reports the memory traced
+by tracemalloc per waiting entry, covering the QueuedJob, its execution ID,
+the heap or timing wheel slot and the entry and job indexes.
+
+Usage:
+    python scripts/benchmark_queue_memory.py [--entries 1000000] [--distinct-jobs 1000] [--placement pending]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.v2 import engine_config
+from core.v2.data_models import JobDefinition, create_simple_sql_job
+from core.v2.timezone_queue import QueuedJob, TimezoneJobQueue, now_epoch_us
+
+
+# No journal files, admission limits or aging while measuring
+BENCHMARK_ENGINE_CONFIG = {
+    'journal': {'enabled': False},
+    'admission': {'max_queue_depth': 0},
+    'aging': {'priority_per_minute': 0}
+}
+
+# Delay of the placed entries, below or above the queue's wheel threshold
+PLACEMENT_DELAYS = {
+    'pending': 10.0,
+    'wheel': 3600.0
+}
+
+
+async def measure(entry_count: int, distinct_jobs: int, placement: str, fresh_definitions: bool):
+    """Place entry_count entries and return the traced bytes per entry"""
+    queue = TimezoneJobQueue('UTC')
+    jobs = [create_simple_sql_job(f"bench-{index}", "SELECT 1") for index in range(distinct_jobs)]
+    job_data = [job.to_dict() for job in jobs]
+    
+    scheduled_us = now_epoch_us() + int(PLACEMENT_DELAYS[placement] * 1_000_000)
+    
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for index in range(entry_count):
+        if fresh_definitions:
+            # Every occurrence arrives with its own equal definition, like jobs loaded from the database
+            job = JobDefinition.from_dict(job_data[index % distinct_jobs])
+        else:
+            job = jobs[index % distinct_jobs]
+        queue._place_job(QueuedJob(queue._intern_job(job), scheduled_us + index))
+    traced = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    
+    return traced / entry_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--distinct-jobs', type=int, default=1000, help='Job definitions the entries are occurrences of')
+    parser.add_argument('--placement', choices=sorted(PLACEMENT_DELAYS), default='pending',
+                        help='Place entries on the pending heap or in the timing wheel')
+    parser.add_argument('--fresh-definitions', action='store_true',
+                        help='Give every entry its own copy of the definition (tests interning)')
+    args = parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    engine_config._config_cache = BENCHMARK_ENGINE_CONFIG
+    
+    bytes_per_entry = asyncio.run(measure(args.entries, args.distinct_jobs, args.placement, args.fresh_definitions))
+    print(f"{args.entries} entries of {args.distinct_jobs} jobs ({args.placement}"
+          f"{', fresh definitions' if args.fresh_definitions else ''})")
+    print(f"{bytes_per_entry:.0f} bytes per entry, {bytes_per_entry * args.entries / 1024 ** 2:.0f} MiB in total")
+
+
+if __name__ == '__main__':
+    main()
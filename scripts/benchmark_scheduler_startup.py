@@ -0,0 +1,108 @@
+"""
+Startup benchmark for IntegratedScheduler bulk job loading
+
+Generates synthetic enabled jobs and times:
+  - YAML parsing of the streamed rows, inline and in the process pool
+  - a full IntegratedScheduler startup load (parse, trigger creation, registration)
+
+Usage:
+    python scripts/benchmark_scheduler_startup.py [--jobs 10000 100000] [--chunk-size 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bulk_job_loader import BulkJobLoader
+
+
+SCHEDULES = [
+    "schedule:\n  type: cron\n  cron: '0 */5 * * * *'\n  timezone: UTC\n",
+    "schedule:\n  type: cron\n  cron: '0 0 2 * * *'\n  timezone: America/New_York\n  jitter_window: 300\n",
+    "schedule:\n  type: interval\n  interval:\n    minutes: 15\n  timezone: Europe/London\n",
+    "",
+]
+
+
+def make_rows(count: int):
+    """Build (job_id, name, yaml_configuration, modified_date, next_scheduled_time) rows"""
+    now = datetime.utcnow().replace(microsecond=0)
+    rows = []
+    for index in range(count):
+        yaml_configuration = (
+            f"name: Benchmark job {index}\n"
+            f"type: powershell\n"
+            f"inlineScript: |\n  Write-Output 'job {index}'\n"
+            f"timeout: 300\n"
+            + SCHEDULES[index % len(SCHEDULES)]
+        )
+        rows.append((f"bench-{index:08d}", f"Benchmark job {index}", yaml_configuration,
+                     now - timedelta(minutes=index % 1000), None))
+    return rows
+
+
+def chunked(rows, chunk_size: int):
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+class SyntheticJobManager:
+    """Stands in for JobManager, streams the generated rows"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def iter_enabled_job_rows(self, chunk_size: int = 1000):
+        return chunked(self.rows, chunk_size)
+
+
+def benchmark_parsing(rows, chunk_size: int):
+    inline = BulkJobLoader(None, chunk_size=chunk_size, process_threshold=len(rows) + 1)
+    inline.parse_chunks(chunked(rows, chunk_size))
+    
+    pooled = BulkJobLoader(None, chunk_size=chunk_size, process_threshold=0, max_workers=max(os.cpu_count() or 1, 2))
+    pooled.parse_chunks(chunked(rows, chunk_size))
+    
+    return inline.stats['seconds'], pooled.stats['seconds']
+
+
+def benchmark_startup(rows):
+    from core.integrated_scheduler import IntegratedScheduler
+    
+    started = time.perf_counter()
+    scheduler = IntegratedScheduler(disconnected_components={
+        'job_manager': SyntheticJobManager(rows),
+        'job_executor': None
+    })
+    elapsed = time.perf_counter() - started
+    return elapsed, len(scheduler.scheduler.get_jobs(jobstore='default'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--skip-startup', action='store_true', help='Only benchmark YAML parsing')
+    args = parser.parse_args()
+    
+    print(f"{'jobs':>8} {'parse inline':>13} {'parse pool':>11} {'startup':>9} {'scheduled':>10}")
+    for count in args.jobs:
+        rows = make_rows(count)
+        inline_seconds, pool_seconds = benchmark_parsing(rows, args.chunk_size)
+        
+        startup = "-"
+        scheduled = "-"
+        if not args.skip_startup:
+            startup_seconds, scheduled_count = benchmark_startup(rows)
+            startup = f"{startup_seconds:.2f}s"
+            scheduled = str(scheduled_count)
+        
+        print(f"{count:>8} {inline_seconds:>12.2f}s {pool_seconds:>10.2f}s {startup:>9} {scheduled:>10}")
+
+
+if __name__ == '__main__':
+    main()
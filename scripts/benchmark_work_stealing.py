@@ -0,0 +1,91 @@
+"""
+Throughput benchmark for work stealing in ModernExecutionEngine
+
+Queues a burst of simulated jobs (a fixed sleep instead of real steps) into
+one timezone queue while the other queues sit idle, and measures completed
+jobs per second for several shared worker counts. Without stealing the burst
+is limited by the busy queue's own workers; with it, throughput grows with
+the total number of workers up to the queue's max_concurrent_jobs.
+
+Usage:
+    python scripts/benchmark_work_stealing.py [--jobs 200] [--job-ms 50] [--shared-workers 0 2 6]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone as dt_timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.v2 import engine_config
+from core.v2.data_models import create_simple_sql_job
+from core.v2.execution_engine import ModernExecutionEngine
+from core.v2.timezone_queue import TimezoneJobQueue
+
+
+# No journal files, autoscaling or aging while measuring
+BENCHMARK_ENGINE_CONFIG = {
+    'journal': {'enabled': False},
+    'autoscaling': {'enabled': False},
+    'aging': {'priority_per_minute': 0},
+    'loop_lag': {'interval_seconds': 60}
+}
+
+
+def simulate_jobs(job_seconds: float):
+    """Replace step execution with a fixed sleep, queueing and dispatch stay unchanged"""
+    async def execute_job(self, queued_job, worker_id, cancellation_token=None):
+        await asyncio.sleep(job_seconds)
+        self._total_jobs_processed += 1
+        self._successful_jobs += 1
+        queued_job.resolve(None)
+    
+    TimezoneJobQueue._execute_job = execute_job
+
+
+async def run_burst(job_count: int, shared_workers: int, max_concurrent_jobs: int, busy_timezone: str):
+    """Queue job_count jobs into one timezone queue and time until all have completed"""
+    engine = ModernExecutionEngine(default_max_concurrent_jobs=max_concurrent_jobs, shared_worker_count=shared_workers)
+    await engine.start()
+    try:
+        jobs = [create_simple_sql_job(f"bench-{index}", "SELECT 1", "default", busy_timezone) for index in range(job_count)]
+        
+        # All jobs fall due at the same instant, like a burst on a cron boundary
+        due = time.time() + 1.0
+        due_time = datetime.fromtimestamp(due, dt_timezone.utc)
+        execution_ids = [await engine.schedule_job(job, due_time) for job in jobs]
+        await asyncio.gather(*(engine.wait_for_execution(execution_id, timeout=600) for execution_id in execution_ids))
+        elapsed = time.time() - due
+        
+        return elapsed, engine.get_engine_status().get('stolen_jobs', 0)
+    finally:
+        await engine.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--job-ms', type=int, default=50, help='Simulated duration of each job')
+    parser.add_argument('--max-concurrent', type=int, default=8, help='max_concurrent_jobs of every queue')
+    parser.add_argument('--shared-workers', type=int, nargs='+', default=[0, 2, 6])
+    parser.add_argument('--timezone', default='America/New_York', help='Queue receiving the burst')
+    args = parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    engine_config._config_cache = BENCHMARK_ENGINE_CONFIG
+    simulate_jobs(args.job_ms / 1000.0)
+    
+    print(f"{args.jobs} x {args.job_ms}ms jobs into {args.timezone}, max_concurrent_jobs {args.max_concurrent}, "
+          f"2 workers per queue")
+    print(f"{'shared':>7} {'seconds':>8} {'jobs/s':>8} {'stolen':>7}")
+    for shared_workers in args.shared_workers:
+        elapsed, stolen = asyncio.run(run_burst(args.jobs, shared_workers, args.max_concurrent, args.timezone))
+        print(f"{shared_workers:>7} {elapsed:>8.2f} {args.jobs / elapsed:>8.1f} {stolen:>7}")
+
+
+if __name__ == '__main__':
+    main()
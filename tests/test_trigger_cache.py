@@ -0,0 +1,108 @@
+"""
+Equivalence of compiled cron fire times with APScheduler's CronTrigger
+Randomized expressions and start times, plus searches across DST transitions
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.trigger_cache import compute_next_fire_times, get_compiled_cron, get_cron_trigger, get_timezone
+
+
+TIMEZONES = (
+    'UTC', 'America/New_York', 'Europe/London', 'Europe/Berlin', 'Australia/Sydney',
+    'Australia/Lord_Howe', 'America/Sao_Paulo', 'Asia/Kolkata', 'Asia/Tokyo'
+)
+
+# Expressions that fire within the hours a DST shift skips or repeats
+DST_EXPRESSIONS = (
+    '0 0 * * * *', '0 */15 * * * *', '0 30 1 * * *', '0 30 2 * * *', '0 0 2 * * *',
+    '*/20 * 1-3 * * *', '0 0,30 0-4 * * *', '0 45 2 * * sun'
+)
+
+RANDOM_CASES = 400
+FIRE_TIMES_PER_CASE = 6
+
+
+def _random_field(rng: random.Random, first: int, last: int) -> str:
+    kind = rng.randrange(5)
+    if kind == 0:
+        return '*'
+    if kind == 1:
+        return f"*/{rng.randint(2, max(2, (last - first) // 2))}"
+    if kind == 2:
+        start = rng.randint(first, last)
+        return f"{start}-{rng.randint(start, last)}"
+    if kind == 3:
+        return ','.join(str(value) for value in sorted(rng.sample(range(first, last + 1), 3)))
+    return str(rng.randint(first, last))
+
+
+def _random_expression(rng: random.Random) -> str:
+    return ' '.join((
+        rng.choice(('0', '0', '30', _random_field(rng, 0, 59))),
+        _random_field(rng, 0, 59),
+        _random_field(rng, 0, 23),
+        rng.choice(('*', '*', _random_field(rng, 1, 28))),
+        rng.choice(('*', '*', _random_field(rng, 1, 12))),
+        rng.choice(('*', '*', 'mon-fri', 'sat,sun', _random_field(rng, 0, 6)))
+    ))
+
+
+def _expected_fire_times(trigger, now: datetime, count: int):
+    """Fire times as the scheduler would see them, one get_next_fire_time() call after another"""
+    fire_times = []
+    fire_time = trigger.get_next_fire_time(None, now)
+    while fire_time is not None and len(fire_times) < count:
+        fire_times.append(fire_time)
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time)
+    return fire_times
+
+
+def _assert_equivalent(cron_expr: str, timezone_name: str, now: datetime, count: int = FIRE_TIMES_PER_CASE):
+    trigger = get_cron_trigger(cron_expr, timezone_name)
+    expected = _expected_fire_times(trigger, now, count)
+    actual = compute_next_fire_times([(cron_expr, trigger)], now, count)[cron_expr]
+    
+    # Compare instants and UTC offsets, an equal instant with another offset would be displayed differently
+    assert [(t, t.utcoffset()) for t in actual] == [(t, t.utcoffset()) for t in expected], \
+        f"{cron_expr!r} in {timezone_name} from {now.isoformat()}"
+
+
+def _transitions(timezone_name: str, first_year: int, last_year: int):
+    """UTC offset changes of a zone between the years (aware UTC)"""
+    utc = get_timezone('UTC')
+    for transition in getattr(get_timezone(timezone_name), '_utc_transition_times', None) or []:
+        if first_year <= transition.year <= last_year:
+            yield utc.localize(transition)
+
+
+def test_random_expressions_match_cron_trigger():
+    rng = random.Random(20260101)
+    utc = get_timezone('UTC')
+    window_start = utc.localize(datetime(2020, 1, 1))
+    window_seconds = int(timedelta(days=365 * 10).total_seconds())
+    
+    for _ in range(RANDOM_CASES):
+        cron_expr = _random_expression(rng)
+        timezone_name = rng.choice(TIMEZONES)
+        now = window_start + timedelta(seconds=rng.randrange(window_seconds), microseconds=rng.choice((0, 250000)))
+        _assert_equivalent(cron_expr, timezone_name, now)
+
+
+@pytest.mark.parametrize('timezone_name', [name for name in TIMEZONES if name not in ('UTC', 'Asia/Kolkata', 'Asia/Tokyo')])
+def test_dst_transitions_match_cron_trigger(timezone_name):
+    for transition in _transitions(timezone_name, 2024, 2027):
+        # Searches that start well before, just before, at and just after the offset change
+        for lead in (timedelta(hours=26), timedelta(hours=4), timedelta(hours=1), timedelta(minutes=1), timedelta(0), -timedelta(minutes=30)):
+            for cron_expr in DST_EXPRESSIONS:
+                _assert_equivalent(cron_expr, timezone_name, transition - lead)
+
+
+def test_simple_expressions_are_compiled():
+    # Guards against the equivalence tests passing only because every search fell back to the trigger
+    for cron_expr in ('0 */5 * * * *', '0 0 9 * * mon-fri', '30 15 2 1,15 * *'):
+        assert get_compiled_cron(get_cron_trigger(cron_expr, 'Europe/Berlin')) is not None
+    assert get_compiled_cron(get_cron_trigger('0 0 12 last * *', 'UTC')) is None
@@ -2426,6 +2426,7 @@ def create_routes(app):
             # Get all scheduled jobs
             import pytz
             from datetime import datetime
+            from core.trigger_cache import get_timezone
             
             # Define timezones to show
             timezones_to_show = [
@@ -2445,31 +2446,46 @@ def create_routes(app):
             # Get scheduled jobs from APScheduler
             scheduled_jobs = integrated_scheduler.scheduler.get_jobs()
             
+            # Optional upcoming fire times per job, computed for all jobs in one batch
+            upcoming_count = min(max(request.args.get('count', 1, type=int), 1), 100)
+            upcoming_runs = {}
+            if upcoming_count > 1:
+                upcoming_runs = integrated_scheduler.get_upcoming_fire_times(upcoming_count)
+            
+            # Job details from one query instead of one lookup per scheduled job
+            job_manager = getattr(app, 'job_manager', None)
+            job_details_by_id = {}
+            if job_manager and scheduled_jobs:
+                job_details_by_id = {job['job_id']: job for job in job_manager.list_jobs()}
+            
+            # Timezone objects are cached, resolve them once per request
+            display_timezones = []
+            for tz_name, tz_display in timezones_to_show:
+                try:
+                    display_timezones.append((tz_name, tz_display, get_timezone(tz_name)))
+                except Exception as e:
+                    logger.warning(f"[API_TIMEZONE_VIEW] Unknown timezone {tz_name}: {e}")
+                    display_timezones.append((tz_name, tz_display, None))
+            
             # Process each job
             job_schedules = []
             for scheduled_job in scheduled_jobs:
                 if scheduled_job.next_run_time:
-                    # Get job details from database
-                    job_manager = getattr(app, 'job_manager', None)
-                    job_details = None
+                    job_details = job_details_by_id.get(scheduled_job.id)
                     job_timezone = 'UTC'
                     
-                    if job_manager:
-                        job_config = job_manager.get_job(scheduled_job.id)
-                        if job_config:
-                            job_details = job_config
-                            # Extract timezone from job configuration
-                            configuration = job_config.get('configuration', {})
-                            schedule_config = configuration.get('schedule', {})
-                            job_timezone = schedule_config.get('timezone', 'UTC')
+                    if job_details:
+                        # Extract timezone from job configuration
+                        parsed_config = job_details.get('parsed_config') or {}
+                        schedule_config = parsed_config.get('schedule') or {}
+                        job_timezone = schedule_config.get('timezone', 'UTC')
                     
                     # Convert next run time to different timezones
                     timezone_times = []
                     next_run_utc = scheduled_job.next_run_time
                     
-                    for tz_name, tz_display in timezones_to_show:
+                    for tz_name, tz_display, tz in display_timezones:
                         try:
-                            tz = pytz.timezone(tz_name)
                             local_time = next_run_utc.astimezone(tz)
                             
                             timezone_times.append({
@@ -2487,7 +2503,7 @@ def create_routes(app):
                                 'is_job_timezone': False
                             })
                     
-                    job_schedules.append({
+                    job_schedule = {
                         'job_id': scheduled_job.id,
                         'job_name': scheduled_job.name,
                         'job_type': job_details.get('job_type', 'unknown') if job_details else 'unknown',
@@ -2495,7 +2511,13 @@ def create_routes(app):
                         'next_run_utc': next_run_utc.strftime('%Y-%m-%d %H:%M:%S UTC'),
                         'timezone_times': timezone_times,
                         'enabled': job_details.get('enabled', True) if job_details else True
-                    })
+                    }
+                    if upcoming_count > 1:
+                        job_schedule['upcoming_runs_utc'] = [
+                            fire_time.astimezone(pytz.UTC).strftime('%Y-%m-%d %H:%M:%S UTC')
+                            for fire_time in upcoming_runs.get(scheduled_job.id, [])
+                        ]
+                    job_schedules.append(job_schedule)
             
             # Sort by next run time
             job_schedules.sort(key=lambda x: x['next_run_utc'])
@@ -2512,6 +2534,28 @@ def create_routes(app):
             logger.error(f"[API_TIMEZONE_VIEW] Error getting timezone schedules: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/scheduler/fire-density', methods=['GET'])
+    def api_scheduler_fire_density():
+        """API endpoint to get per-second fire density of scheduled jobs before and after jitter"""
+        try:
+            integrated_scheduler = getattr(app, 'integrated_scheduler', None)
+            if not integrated_scheduler:
+                logger.warning("[API_FIRE_DENSITY] Integrated scheduler not available")
+                return jsonify({'success': False, 'error': 'Scheduler not available'}), 503
+
+            horizon_seconds = min(max(request.args.get('horizon', 3600, type=int), 1), 7 * 86400)
+            top = min(max(request.args.get('top', 10, type=int), 1), 100)
+
+            report = integrated_scheduler.get_fire_density_report(horizon_seconds=horizon_seconds, top=top)
+            if 'error' in report:
+                return jsonify({'success': False, 'error': report['error']}), 500
+
+            return jsonify({'success': True, **report})
+
+        except Exception as e:
+            logger.error(f"[API_FIRE_DENSITY] Error getting fire density report: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @app.route('/api/admin/system-stats')
     def api_admin_system_stats():
         """Get system statistics for admin panel"""
@@ -2839,6 +2883,8 @@ def create_routes(app):
             total_queued = sum(status.get('queue_size', 0) for status in queue_status.values())
             total_active = sum(status.get('active_executions', 0) for status in queue_status.values())
             total_processed = sum(status.get('total_processed', 0) for status in queue_status.values())
+            total_rejected = sum(status.get('rejected_jobs', 0) for status in queue_status.values())
+            total_shed = sum(status.get('shed_jobs', 0) for status in queue_status.values())
             
             return jsonify({
                 'success': True,
@@ -2847,6 +2893,8 @@ def create_routes(app):
                     'total_queued': total_queued,
                     'total_active': total_active,
                     'total_processed': total_processed,
+                    'total_rejected': total_rejected,
+                    'total_shed': total_shed,
                     'engine_status': engine.status.value
                 },
                 'timezone_queues': queue_status,